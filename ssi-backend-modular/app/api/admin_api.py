@@ -9,6 +9,7 @@ from app.api.deps import require_admin
 from app.db.session import get_db
 from app.models import User
 from app.schemas import (
+    KnowledgeSourceCitationOut,
     KnowledgeSourceCreate,
     KnowledgeSourceOut,
     KnowledgeSourceReindexOut,
@@ -22,6 +23,9 @@ from app.services.knowledge_source_service import (
     reindex_knowledge_sources_service,
     update_knowledge_source_service,
 )
+from app.services.background_job_service import get_background_job_stats
+from app.services.evidence_service import list_source_citations
+from app.services.llm_runtime_service import get_llm_runtime_stats
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -33,6 +37,16 @@ async def admin_knowledge_sources_runtime(
     return get_vector_store_runtime_config()
 
 
+@router.get("/knowledge-sources/citations", response_model=List[KnowledgeSourceCitationOut])
+async def admin_knowledge_source_citations(
+    file_id: str = Query(..., min_length=1, description="Vector store file id (knowledge source ref)."),
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return await list_source_citations(db, file_id=file_id, limit=limit)
+
+
 @router.get("/knowledge-sources", response_model=List[KnowledgeSourceOut])
 async def admin_list_knowledge_sources(
     sync: bool = Query(default=True, description="Sync from vector store before listing."),
@@ -103,3 +117,19 @@ async def admin_delete_knowledge_source(
         source_id=source_id,
     )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/llm/stats")
+async def admin_llm_stats(
+    current_admin: User = Depends(require_admin),
+):
+    return get_llm_runtime_stats()
+
+
+@router.get("/jobs/stats")
+async def admin_background_job_stats(
+    current_admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_background_job_stats(db)
+
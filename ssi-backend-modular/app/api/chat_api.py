@@ -1,12 +1,15 @@
 # app/api/chat_api.py
 from __future__ import annotations
 
-from typing import List
+import json
+from typing import AsyncIterator, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_path_user
+from app.core.timing import StageTimings
 from app.db.session import get_db
 from app.schemas import (
     ChatSessionCreate,
@@ -14,6 +17,7 @@ from app.schemas import (
     ChatSessionOut,
     MessageCreate,
     MessageOut,
+    MessageEvidenceOut,
     SendMessageOut,
 )
 from app.services.chat_service import (
@@ -22,7 +26,9 @@ from app.services.chat_service import (
     rename_chat_session_for_user,
     delete_chat_session_for_user,
     list_messages_in_chat,
+    get_message_evidence_for_user,
     send_message_and_get_reply,
+    stream_message_and_get_reply,
 )
 
 router = APIRouter(
@@ -115,9 +121,47 @@ async def delete_chat_session_post(
 async def get_messages(
     user_id: int,
     chat_id: int,
+    before_id: int | None = Query(
+        default=None,
+        description="Return messages older than this message id.",
+    ),
+    after_id: int | None = Query(
+        default=None,
+        description="Return messages newer than this message id.",
+    ),
+    limit: int | None = Query(
+        default=None,
+        ge=1,
+        le=200,
+        description="Page size. Without limit or a cursor the full history is returned.",
+    ),
+    include_evidence: bool = Query(
+        default=False,
+        description="Inline each message's evidence_source; otherwise use the evidence endpoint.",
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    return await list_messages_in_chat(db, user_id, chat_id)
+    return await list_messages_in_chat(
+        db,
+        user_id,
+        chat_id,
+        before_id=before_id,
+        after_id=after_id,
+        limit=limit,
+        include_evidence=include_evidence,
+    )
+
+
+@router.get(
+    "/messages/{message_id}/evidence",
+    response_model=MessageEvidenceOut,
+)
+async def get_message_evidence(
+    user_id: int,
+    message_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_message_evidence_for_user(db, user_id, message_id)
 
 
 @router.post(
@@ -126,9 +170,48 @@ async def get_messages(
 )
 
 async def send_message(
+    user_id: int,
+    chat_id: int,
+    payload: MessageCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    timings = StageTimings()
+    result = await send_message_and_get_reply(db, user_id, chat_id, payload, timings)
+    response.headers["Server-Timing"] = timings.server_timing_header()
+    return result
+
+
+def _to_sse(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async def _encode() -> AsyncIterator[str]:
+        async for item in events:
+            data = json.dumps(item["data"], ensure_ascii=True)
+            yield f"event: {item['event']}\ndata: {data}\n\n"
+
+    return _encode()
+
+
+@router.post("/chat-sessions/{chat_id}/messages/stream")
+async def send_message_stream(
     user_id: int,
     chat_id: int,
     payload: MessageCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    return await send_message_and_get_reply(db, user_id, chat_id, payload)
+    """
+    Server-Sent Events variant of send_message:
+    `delta` events carry assistant_text tokens, then one `final` event carries the
+    persisted messages, flashcards and evidence.
+    """
+    timings = StageTimings()
+    events = await stream_message_and_get_reply(db, user_id, chat_id, payload, timings)
+    return StreamingResponse(
+        _to_sse(events),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Pre-LLM stages only; headers go out before the model starts streaming.
+            "Server-Timing": timings.server_timing_header(),
+        },
+    )
@@ -8,9 +8,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_path_user
 from app.db.session import get_db
-from app.schemas import FlashcardCreate, FlashcardOut
+from app.schemas import FlashcardBulkCreate, FlashcardCreate, FlashcardOut
 from app.services.flashcard_service import (
     create_flashcard_for_user,
+    create_flashcards_bulk_for_user,
     list_flashcards_for_user_service,
     update_flashcard_service,
     set_flashcard_active_service,
@@ -34,6 +35,15 @@ async def create_flashcard(
     return await create_flashcard_for_user(db, user_id, payload)
 
 
+@router.post("/flashcards/bulk", response_model=List[FlashcardOut], status_code=201)
+async def create_flashcards_bulk(
+    user_id: int,
+    payload: FlashcardBulkCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    return await create_flashcards_bulk_for_user(db, user_id, payload)
+
+
 @router.get("/flashcards", response_model=List[FlashcardOut])
 async def list_flashcards(
     user_id: int,
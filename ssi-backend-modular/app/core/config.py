@@ -17,12 +17,108 @@ def _env_bool(name: str, default: bool = False) -> bool:
     return str(raw).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not str(raw).strip():
+        return default
+    try:
+        return int(str(raw).strip())
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not str(raw).strip():
+        return default
+    try:
+        return float(str(raw).strip())
+    except ValueError:
+        return default
+
+
 class Settings:
     PROJECT_NAME: str = "SSI Learning Backend (Structured Outputs Enabled)"
     OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
     OPENAI_VECTOR_STORE_ID: str | None = os.getenv("OPENAI_VECTOR_STORE_ID")
     DATABASE_URL: str | None = os.getenv("DATABASE_URL")
     STRICT_VERIFIED_ONLY: bool = _env_bool("STRICT_VERIFIED_ONLY", default=False)
+    # Compiled knowledge-source filter policy: how often a worker compares its cached
+    # policy with the registry version row (changes made by this worker apply at once).
+    SOURCE_POLICY_VERSION_CHECK_SECONDS: float = _env_float("SOURCE_POLICY_VERSION_CHECK_SECONDS", 2.0)
+
+    # LLM response cache (openai_client). Only calls at or below the temperature
+    # ceiling are cached; the DB tier shares entries across workers.
+    LLM_CACHE_ENABLED: bool = _env_bool("LLM_CACHE_ENABLED", default=True)
+    LLM_CACHE_TTL_SECONDS: int = _env_int("LLM_CACHE_TTL_SECONDS", 3600)
+    LLM_CACHE_MAX_ENTRIES: int = _env_int("LLM_CACHE_MAX_ENTRIES", 1024)
+    LLM_CACHE_MAX_TEMPERATURE: float = _env_float("LLM_CACHE_MAX_TEMPERATURE", 0.2)
+    LLM_CACHE_DB_TIER: bool = _env_bool("LLM_CACHE_DB_TIER", default=False)
+
+    # Upstream resilience (openai_client): request timeout, retries with jittered
+    # exponential backoff, and per-endpoint circuit breakers.
+    OPENAI_TIMEOUT_SECONDS: float = _env_float("OPENAI_TIMEOUT_SECONDS", 60.0)
+    OPENAI_MAX_RETRIES: int = _env_int("OPENAI_MAX_RETRIES", 3)
+    OPENAI_RETRY_BASE_SECONDS: float = _env_float("OPENAI_RETRY_BASE_SECONDS", 0.5)
+    OPENAI_RETRY_MAX_SECONDS: float = _env_float("OPENAI_RETRY_MAX_SECONDS", 20.0)
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = _env_int("OPENAI_CIRCUIT_FAILURE_THRESHOLD", 5)
+    OPENAI_CIRCUIT_RESET_SECONDS: float = _env_float("OPENAI_CIRCUIT_RESET_SECONDS", 30.0)
+
+    # Coalesce identical in-flight vector searches and deterministic completions.
+    SINGLE_FLIGHT_ENABLED: bool = _env_bool("SINGLE_FLIGHT_ENABLED", default=True)
+
+    # Outbound model-call admission (openai_client scheduler). 0 disables a budget.
+    LLM_MAX_CONCURRENCY: int = _env_int("LLM_MAX_CONCURRENCY", 16)
+    LLM_REQUESTS_PER_MINUTE: int = _env_int("LLM_REQUESTS_PER_MINUTE", 0)
+    LLM_TOKENS_PER_MINUTE: int = _env_int("LLM_TOKENS_PER_MINUTE", 0)
+
+    # Chat prompt budget (chat_context_service). Turns that no longer fit are folded
+    # into ChatSession.summary, CHAT_SUMMARY_CHUNK_MESSAGES at a time.
+    CHAT_CONTEXT_TOKEN_BUDGET: int = _env_int("CHAT_CONTEXT_TOKEN_BUDGET", 6000)
+    CHAT_HISTORY_SUMMARY_TRIGGER: float = _env_float("CHAT_HISTORY_SUMMARY_TRIGGER", 0.6)
+    CHAT_SUMMARY_CHUNK_MESSAGES: int = _env_int("CHAT_SUMMARY_CHUNK_MESSAGES", 6)
+    # "prefix_cache": system prompt, summary and prior turns first (stable across turns,
+    # so the provider's prompt-prefix cache hits), retrieved context and the new question
+    # last. "legacy": retrieved context right after the system prompt.
+    CHAT_PROMPT_LAYOUT: str = os.getenv("CHAT_PROMPT_LAYOUT", "prefix_cache").strip().lower()
+    # Message history pages (GET .../messages with before_id/after_id/limit).
+    CHAT_MESSAGES_PAGE_SIZE: int = _env_int("CHAT_MESSAGES_PAGE_SIZE", 50)
+
+    # In-process background job runner (app/core/job_runner.py).
+    JOB_RUNNER_CONCURRENCY: int = _env_int("JOB_RUNNER_CONCURRENCY", 4)
+    JOB_MAX_ATTEMPTS: int = _env_int("JOB_MAX_ATTEMPTS", 3)
+    JOB_RETRY_BASE_SECONDS: float = _env_float("JOB_RETRY_BASE_SECONDS", 2.0)
+    JOB_STALE_RUNNING_SECONDS: int = _env_int("JOB_STALE_RUNNING_SECONDS", 300)
+
+    # Raw vector-store search results, cached before knowledge-source filtering.
+    VECTOR_SEARCH_CACHE_ENABLED: bool = _env_bool("VECTOR_SEARCH_CACHE_ENABLED", default=True)
+    VECTOR_SEARCH_CACHE_TTL_SECONDS: int = _env_int("VECTOR_SEARCH_CACHE_TTL_SECONDS", 900)
+    VECTOR_SEARCH_CACHE_MAX_ENTRIES: int = _env_int("VECTOR_SEARCH_CACHE_MAX_ENTRIES", 512)
+    # Push the enabled/verified policy into the search call as file-attribute filters
+    # (ssi_enabled/ssi_verified, written by the knowledge-source sync). Turn on after a
+    # reindex so every file carries the attributes; results are still re-checked locally.
+    VECTOR_SEARCH_ATTRIBUTE_FILTERS: bool = _env_bool("VECTOR_SEARCH_ATTRIBUTE_FILTERS", default=False)
+
+    # Retrieval engine for chat turns: "remote" (vector store search only),
+    # "lexical_first" (local BM25 index; the remote search runs only when the best local
+    # match is below the confidence bar), "dense_local" (local vector index, numpy
+    # required) or "hybrid" (remote + BM25 concurrently, fused by reciprocal rank).
+    # Build the indexes with scripts/build_retrieval_index.py.
+    RETRIEVAL_MODE: str = os.getenv("RETRIEVAL_MODE", "remote").strip().lower()
+    LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", str(BASE_DIR / "data" / "lexical_index"))
+    # Confidence bar: the top chunk must match this share of the query's IDF mass
+    # and reach this BM25 score.
+    LEXICAL_MIN_COVERAGE: float = _env_float("LEXICAL_MIN_COVERAGE", 0.8)
+    LEXICAL_MIN_SCORE: float = _env_float("LEXICAL_MIN_SCORE", 2.0)
+    DENSE_INDEX_PATH: str = os.getenv("DENSE_INDEX_PATH", str(BASE_DIR / "data" / "dense_index"))
+    # Inverted lists scanned per query when the dense index has an IVF layer.
+    DENSE_IVF_NPROBE: int = _env_int("DENSE_IVF_NPROBE", 8)
+    # Cosine similarity the best dense match must reach; below it the remote search answers.
+    DENSE_MIN_SCORE: float = _env_float("DENSE_MIN_SCORE", 0.0)
+    # Hybrid mode: total time the remote search may take before the turn continues with
+    # the local results alone, and the reciprocal-rank-fusion constant.
+    HYBRID_DEADLINE_SECONDS: float = _env_float("HYBRID_DEADLINE_SECONDS", 1.5)
+    HYBRID_RRF_K: int = _env_int("HYBRID_RRF_K", 60)
 
     def ensure(self) -> "Settings":
         if not self.DATABASE_URL:
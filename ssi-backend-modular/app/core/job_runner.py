@@ -0,0 +1,264 @@
+# app/core/job_runner.py
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+
+class JobRunner:
+    """
+    In-process runner for non-critical post-response work.
+
+    Jobs are persisted (background_jobs) before they are queued, executed by a
+    bounded pool of worker tasks, retried with jittered backoff, and re-queued
+    from the table on startup. Each attempt gets its own DB session.
+
+    When the runner has not been started (CLI scripts that call services
+    directly), enqueue() runs the job inline so side effects still happen.
+    """
+
+    def __init__(self, *, concurrency: int, max_attempts: int, retry_base_seconds: float) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_base_seconds = max(0.0, float(retry_base_seconds))
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional["asyncio.Queue[int]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._retry_timers: Set[asyncio.TimerHandle] = set()
+        self._in_flight = 0
+
+        self._metrics: Dict[str, float] = {
+            "succeeded": 0,
+            "failed": 0,
+            "retried": 0,
+            "total_latency_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+            "total_queue_wait_seconds": 0.0,
+            "first_attempts": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    # ---------- lifecycle ----------
+
+    async def start(self) -> int:
+        """Starts the workers and re-queues persisted jobs; returns how many were recovered."""
+        if self._queue is not None:
+            return 0
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+        from app.db.session import AsyncSessionLocal
+        from app.db.unit_of_work import unit_of_work
+        from app.repositories.background_job_repository import list_recoverable_job_ids
+
+        async with AsyncSessionLocal() as db, unit_of_work(db):
+            job_ids = await list_recoverable_job_ids(
+                db,
+                stale_running_seconds=settings.JOB_STALE_RUNNING_SECONDS,
+            )
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        return len(job_ids)
+
+    async def stop(self) -> None:
+        for timer in self._retry_timers:
+            timer.cancel()
+        self._retry_timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    # ---------- enqueue / execute ----------
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        unique: bool = False,
+    ) -> Optional[int]:
+        """
+        Inserts the job row in the caller's transaction; the job is only handed
+        to a worker after that transaction commits, so the row is visible to the
+        worker's session and a rolled-back request never runs its jobs.
+
+        With `unique`, nothing is inserted (and None is returned) while a job of
+        the same kind and payload is still queued or running.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No background job handler registered for '{kind}'")
+
+        from app.db.unit_of_work import run_after_commit, unit_of_work
+        from app.repositories.background_job_repository import (
+            create_background_job,
+            has_pending_background_job,
+        )
+
+        encoded = json.dumps(payload, ensure_ascii=True)
+        async with unit_of_work(db):
+            if unique and await has_pending_background_job(db, kind=kind, payload=encoded):
+                return None
+            job = await create_background_job(
+                db,
+                kind=kind,
+                payload=encoded,
+                max_attempts=self.max_attempts,
+            )
+            job_id = job.id
+            await run_after_commit(db, lambda: self._dispatch(job_id))
+        return job_id
+
+    async def _dispatch(self, job_id: int) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+        else:
+            await self._run_inline(job_id)
+
+    async def _run_inline(self, job_id: int) -> None:
+        while True:
+            retry_in = await self._execute(job_id)
+            if retry_in is None:
+                return
+            await asyncio.sleep(retry_in)
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                retry_in = await self._execute(job_id)
+                if retry_in is not None:
+                    self._schedule_retry(job_id, retry_in)
+            except Exception:
+                # Bookkeeping failed (DB down); the job stays persisted and is recovered on restart.
+                pass
+            finally:
+                queue.task_done()
+
+    def _schedule_retry(self, job_id: int, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        def _requeue() -> None:
+            self._retry_timers.discard(timer)
+            if self._queue is not None:
+                self._queue.put_nowait(job_id)
+
+        timer = loop.call_later(delay, _requeue)
+        self._retry_timers.add(timer)
+
+    async def _execute(self, job_id: int) -> Optional[float]:
+        """Runs one attempt; returns a retry delay when the job should run again."""
+        from app.db.session import AsyncSessionLocal
+        from app.db.unit_of_work import unit_of_work
+        from app.repositories.background_job_repository import (
+            claim_background_job,
+            finish_background_job,
+        )
+
+        async with AsyncSessionLocal() as db:
+            async with unit_of_work(db):
+                job = await claim_background_job(db, job_id)
+            if job is None:
+                # Already taken, finished or deleted.
+                return None
+
+            # Plain values: a rollback inside the handler expires the ORM instance.
+            kind, attempts, max_attempts = job.kind, job.attempts, job.max_attempts
+            created_at, payload = job.created_at, json.loads(job.payload or "{}")
+
+            handler = self._handlers.get(kind)
+            if handler is None:
+                async with unit_of_work(db):
+                    await finish_background_job(
+                        db, job_id, status="failed", error=f"Unknown job kind '{kind}'"
+                    )
+                self._metrics["failed"] += 1
+                return None
+
+            if attempts == 1 and job.started_at is not None:
+                self._metrics["first_attempts"] += 1
+                self._metrics["total_queue_wait_seconds"] += max(
+                    0.0, (job.started_at - created_at).total_seconds()
+                )
+
+            self._in_flight += 1
+            try:
+                # The handler's writes and the 'succeeded' mark commit together.
+                async with unit_of_work(db):
+                    await handler(db, payload)
+                    await finish_background_job(db, job_id, status="succeeded")
+            except Exception as exc:
+                error = f"{exc.__class__.__name__}: {exc}"[:2000]
+                if attempts >= max_attempts:
+                    async with unit_of_work(db):
+                        await finish_background_job(db, job_id, status="failed", error=error)
+                    self._metrics["failed"] += 1
+                    self._record_latency(created_at)
+                    return None
+                async with unit_of_work(db):
+                    await finish_background_job(db, job_id, status="queued", error=error)
+                self._metrics["retried"] += 1
+                ceiling = self.retry_base_seconds * (2 ** (attempts - 1))
+                return random.uniform(ceiling / 2, ceiling)
+            finally:
+                self._in_flight -= 1
+
+            self._metrics["succeeded"] += 1
+            self._record_latency(created_at)
+            return None
+
+    def _record_latency(self, created_at: datetime) -> None:
+        latency = max(0.0, (datetime.utcnow() - created_at).total_seconds())
+        self._metrics["total_latency_seconds"] += latency
+        self._metrics["max_latency_seconds"] = max(self._metrics["max_latency_seconds"], latency)
+
+    def stats(self) -> Dict[str, Any]:
+        finished = int(self._metrics["succeeded"] + self._metrics["failed"])
+        first_attempts = int(self._metrics["first_attempts"])
+        return {
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "scheduled_retries": len(self._retry_timers),
+            "in_flight": self._in_flight,
+            "succeeded": int(self._metrics["succeeded"]),
+            "failed": int(self._metrics["failed"]),
+            "retried": int(self._metrics["retried"]),
+            "avg_latency_seconds": (
+                round(self._metrics["total_latency_seconds"] / finished, 3) if finished else None
+            ),
+            "max_latency_seconds": round(self._metrics["max_latency_seconds"], 3),
+            "avg_queue_wait_seconds": (
+                round(self._metrics["total_queue_wait_seconds"] / first_attempts, 3)
+                if first_attempts
+                else None
+            ),
+            "handlers": sorted(self._handlers),
+        }
+
+
+job_runner = JobRunner(
+    concurrency=settings.JOB_RUNNER_CONCURRENCY,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+)
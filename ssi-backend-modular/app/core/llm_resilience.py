@@ -0,0 +1,202 @@
+# app/core/llm_resilience.py
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+R = TypeVar("R")
+
+_RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """
+    Raised without calling OpenAI while the circuit for an endpoint is open,
+    so a degraded upstream fails fast instead of tying up workers.
+    """
+
+    def __init__(self, endpoint: str, retry_after_seconds: float) -> None:
+        super().__init__(f"Upstream endpoint '{endpoint}' is temporarily unavailable")
+        self.endpoint = endpoint
+        self.retry_after_seconds = max(0.0, float(retry_after_seconds))
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return int(getattr(exc, "status_code", 0) or 0) in _RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Reads Retry-After / retry-after-ms from an OpenAI error response, if present."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    raw_ms = headers.get("retry-after-ms")
+    if raw_ms:
+        try:
+            return max(0.0, float(raw_ms) / 1000.0)
+        except ValueError:
+            pass
+
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(raw).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker for one upstream endpoint.
+    Only retryable (transient) failures count; a 400 is the caller's problem.
+    """
+
+    def __init__(self, *, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_seconds = max(0.0, float(reset_timeout_seconds))
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._half_open_probe_in_flight = False
+
+    def before_call(self, endpoint: str) -> bool:
+        """Raises while open; returns True when this call is the half-open probe."""
+        if self.state == "closed":
+            return False
+        now = time.monotonic()
+        if self.state == "open":
+            remaining = self.reset_timeout_seconds - (now - self.opened_at)
+            if remaining > 0:
+                self.rejected_calls += 1
+                raise UpstreamUnavailableError(endpoint, remaining)
+            self.state = "half_open"
+        # half-open: allow a single probe through.
+        if self._half_open_probe_in_flight:
+            self.rejected_calls += 1
+            raise UpstreamUnavailableError(endpoint, self.reset_timeout_seconds)
+        self._half_open_probe_in_flight = True
+        return True
+
+    def abandon_call(self, probe: bool) -> None:
+        """
+        The call ended without an outcome (cancelled, stream closed by the client).
+        A probe gives its slot back so the next call can probe; the state is unchanged.
+        """
+        if probe:
+            self._half_open_probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._half_open_probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._half_open_probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+        }
+
+
+class ResilientCaller:
+    """
+    Retry with jittered exponential backoff (honoring Retry-After) plus one
+    circuit breaker per upstream endpoint name.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int,
+        base_delay_seconds: float,
+        max_delay_seconds: float,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+    ) -> None:
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay_seconds = max(0.0, float(base_delay_seconds))
+        self.max_delay_seconds = max(self.base_delay_seconds, float(max_delay_seconds))
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_seconds = reset_timeout_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self._failure_threshold,
+                reset_timeout_seconds=self._reset_timeout_seconds,
+            )
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def backoff_seconds(self, attempt: int, exc: BaseException) -> float:
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return min(hinted, self.max_delay_seconds)
+        # "Full jitter": uniform in [0, base * 2^attempt], capped.
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt))
+        return random.uniform(0.0, ceiling)
+
+    async def call(self, endpoint: str, factory: Callable[[], Awaitable[R]]) -> R:
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            probe = breaker.before_call(endpoint)
+            try:
+                result = await factory()
+            except Exception as exc:
+                if not is_retryable_error(exc):
+                    # The upstream answered; it is healthy even if the request was bad.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt >= self.max_retries or breaker.state == "open":
+                    raise
+                delay = self.backoff_seconds(attempt, exc)
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (client disconnect, search deadline): no verdict on the upstream.
+                breaker.abandon_call(probe)
+                raise
+            breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_retries": self.max_retries,
+            "retries": self.retries,
+            "circuits": {endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()},
+        }
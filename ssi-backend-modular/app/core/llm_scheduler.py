@@ -0,0 +1,211 @@
+# app/core/llm_scheduler.py
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence
+
+# Lower value = served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_QUIZ = 1
+PRIORITY_EXPLANATION = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES: Dict[int, str] = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_QUIZ: "quiz",
+    PRIORITY_EXPLANATION: "explanation",
+    PRIORITY_BACKGROUND: "background",
+}
+
+_WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(messages: Sequence[Dict[str, Any]], *, expected_output_tokens: int = 512) -> int:
+    """
+    Cheap pre-flight estimate (~4 characters per token) used to charge the TPM
+    budget before the call; the real usage replaces it once the call returns.
+    """
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 4 + 4 * len(messages) + expected_output_tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "enqueued_at", "future")
+
+    def __init__(self, priority: int, tokens: int, future: "asyncio.Future[List[float]]") -> None:
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.future = future
+
+
+class LLMScheduler:
+    """
+    Admission control for outbound model calls.
+
+    - At most `max_concurrency` calls in flight.
+    - Requests-per-minute and tokens-per-minute budgets over a sliding 60s window
+      (0 disables a budget).
+    - Waiting calls are admitted strictly by priority class, FIFO within a class,
+      so background work never delays an interactive answer.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_minute = max(0, int(requests_per_minute))
+        self.tokens_per_minute = max(0, int(tokens_per_minute))
+
+        self._queue: List[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        # Each entry is [granted_at, tokens]; tokens is corrected after the call.
+        self._window: Deque[List[float]] = deque()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self._metrics: Dict[int, Dict[str, float]] = {
+            priority: {"admitted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for priority in PRIORITY_NAMES
+        }
+        self.budget_throttled = 0
+
+    # ---------- budget bookkeeping ----------
+
+    def _prune_window(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= _WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _window_tokens(self) -> int:
+        return int(sum(entry[1] for entry in self._window))
+
+    def _budget_allows(self, tokens: int, now: float) -> bool:
+        self._prune_window(now)
+        if not self._window:
+            # Always admit into an empty window, even if one call exceeds the budget.
+            return True
+        if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+            return False
+        if self.tokens_per_minute and self._window_tokens() + tokens > self.tokens_per_minute:
+            return False
+        return True
+
+    def _schedule_wakeup(self, now: float) -> None:
+        if self._wakeup is not None or not self._window:
+            return
+        delay = max(0.01, _WINDOW_SECONDS - (now - self._window[0][0]))
+        loop = asyncio.get_running_loop()
+
+        def _wake() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = loop.call_later(delay, _wake)
+
+    def _dispatch(self) -> None:
+        while self._queue and self._in_flight < self.max_concurrency:
+            _, _, waiter = self._queue[0]
+            if waiter.future.done():
+                # Caller gave up while queued.
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            if not self._budget_allows(waiter.tokens, now):
+                self.budget_throttled += 1
+                self._schedule_wakeup(now)
+                return
+            heapq.heappop(self._queue)
+            entry = [now, float(waiter.tokens)]
+            self._window.append(entry)
+            self._in_flight += 1
+
+            waited = now - waiter.enqueued_at
+            stats = self._metrics.setdefault(
+                waiter.priority,
+                {"admitted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0},
+            )
+            stats["admitted"] += 1
+            stats["total_wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            waiter.future.set_result(entry)
+
+    # ---------- public API ----------
+
+    async def acquire(self, priority: int, tokens: int) -> List[float]:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, max(0, int(tokens)), loop.create_future())
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self._dispatch()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted at the same moment we were cancelled: hand the slot back.
+                self.release(waiter.future.result(), actual_tokens=None)
+            raise
+
+    def release(self, entry: List[float], *, actual_tokens: Optional[int]) -> None:
+        if actual_tokens is not None:
+            entry[1] = float(max(0, int(actual_tokens)))
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Holds one admission for the duration of the block. Set
+        `usage["total_tokens"]` inside the block to charge the real token count.
+        """
+        entry = await self.acquire(priority, tokens)
+        usage: Dict[str, Any] = {"total_tokens": None}
+        try:
+            yield usage
+        finally:
+            self.release(entry, actual_tokens=usage.get("total_tokens"))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._prune_window(now)
+        queued: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        oldest_wait: Dict[str, float] = {name: 0.0 for name in PRIORITY_NAMES.values()}
+        for priority, _, waiter in self._queue:
+            if waiter.future.done():
+                continue
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            queued[name] = queued.get(name, 0) + 1
+            oldest_wait[name] = max(oldest_wait.get(name, 0.0), now - waiter.enqueued_at)
+
+        per_priority: Dict[str, Any] = {}
+        for priority, stats in self._metrics.items():
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            admitted = int(stats["admitted"])
+            per_priority[name] = {
+                "queued": queued.get(name, 0),
+                "oldest_queued_seconds": round(oldest_wait.get(name, 0.0), 3),
+                "admitted": admitted,
+                "avg_wait_seconds": (
+                    round(stats["total_wait_seconds"] / admitted, 4) if admitted else None
+                ),
+                "max_wait_seconds": round(stats["max_wait_seconds"], 4),
+            }
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queue_depth": sum(queued.values()),
+            "requests_per_minute_limit": self.requests_per_minute or None,
+            "tokens_per_minute_limit": self.tokens_per_minute or None,
+            "requests_last_minute": len(self._window),
+            "tokens_last_minute": self._window_tokens(),
+            "budget_throttled": self.budget_throttled,
+            "priorities": per_priority,
+        }
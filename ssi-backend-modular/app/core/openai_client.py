@@ -1,16 +1,119 @@
 # app/core/openai_client.py
 from __future__ import annotations
 
+import asyncio
+import json
+import re
 import sys
-from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-client = OpenAI()
+from app.core.cache import TTLCache, canonical_hash
+from app.core.config import settings
+from app.core.llm_resilience import ResilientCaller, is_retryable_error
+from app.core.singleflight import SingleFlight
+from app.core.source_policy import (
+    SourceFilterPolicy,
+    normalize_source_key,
+    vector_store_search_filters,
+)
+from app.core.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_EXPLANATION,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_QUIZ,
+    LLMScheduler,
+    estimate_tokens,
+)
+from app.retrieval.dense_index import DenseIndex, load_dense_index
+from app.retrieval.embedding import HASHING_EMBEDDER, OPENAI_EMBEDDER, HashingEmbedder
+from app.retrieval.fusion import reciprocal_rank_fusion
+from app.retrieval.lexical_index import LexicalHit, load_lexical_index
+
+# Async client: every gateway call awaits the network instead of blocking the event loop.
+# SDK retries are disabled; _resilient owns retry/backoff so it can also drive the breakers.
+client = AsyncOpenAI(max_retries=0, timeout=settings.OPENAI_TIMEOUT_SECONDS)
 
 T = TypeVar("T", bound=BaseModel)
 
+# Jittered exponential backoff (honoring Retry-After) and one circuit breaker per endpoint.
+_resilient = ResilientCaller(
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    base_delay_seconds=settings.OPENAI_RETRY_BASE_SECONDS,
+    max_delay_seconds=settings.OPENAI_RETRY_MAX_SECONDS,
+    failure_threshold=settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout_seconds=settings.OPENAI_CIRCUIT_RESET_SECONDS,
+)
+
+# Every model call goes through one scheduler per worker: bounded concurrency,
+# RPM/TPM budgets and strict priority between interactive and background traffic.
+_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+)
+
+# Response cache for deterministic generations: in-process LRU (per worker) in front
+# of an optional DB tier shared by all workers.
+_response_cache: TTLCache[str] = TTLCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+)
+_response_cache_counters: Dict[str, int] = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "bypassed": 0,
+    "db_errors": 0,
+}
+
+# Raw vector-store search results keyed on (vector_store_id, normalized query, max_results).
+# Knowledge-source filtering runs after the cache, so enable/verify toggles never invalidate it;
+# only a change of the store's file set does (see invalidate_vector_store_search_cache).
+_search_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_entries=settings.VECTOR_SEARCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.VECTOR_SEARCH_CACHE_TTL_SECONDS,
+)
+_search_cache_invalidations = 0
+
+# OpenAI filenames never change for a file_id, so this cache needs no expiry.
+_filename_cache: Dict[str, str] = {}
+
+# Identical concurrent requests (a class starting the same quiz, the same question sent at
+# once) share one upstream call. Keys are the same as the cache keys above.
+_llm_flights: SingleFlight[Any] = SingleFlight()
+_search_flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+
+# Which engine answered each knowledge search (RETRIEVAL_MODE) and why the local index was passed over.
+_retrieval_counters: Dict[str, int] = {
+    "lexical_answered": 0,
+    "lexical_low_confidence": 0,
+    "lexical_unavailable": 0,
+    "dense_answered": 0,
+    "dense_low_confidence": 0,
+    "dense_unavailable": 0,
+    "hybrid_searches": 0,
+    "hybrid_remote_deadline": 0,
+    "hybrid_remote_failed": 0,
+    "hybrid_lexical_unavailable": 0,
+    "remote_searches": 0,
+}
+
+# Remote searches cut off by the hybrid deadline keep running so their results still reach
+# the search cache; held here so they are not garbage-collected mid-flight.
+_late_remote_searches: set["asyncio.Task[Dict[str, Any]]"] = set()
+
+# Upstream token usage since process start; cached_prompt_tokens shows prompt-prefix cache reuse.
+_token_usage_totals: Dict[str, int] = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "cached_prompt_tokens": 0,
+    "completion_tokens": 0,
+}
+
 
 def _safe_console_print(text: Any) -> None:
     """
@@ -40,6 +143,208 @@ def _normalize_messages(messages: Sequence[Dict[str, Any]]) -> List[Dict[str, An
     return normalized
 
 
+def _is_deterministic_temperature(temperature: float | None) -> bool:
+    if temperature is None:
+        return False
+    return float(temperature) <= settings.LLM_CACHE_MAX_TEMPERATURE
+
+
+def _is_cacheable_temperature(temperature: float | None) -> bool:
+    return settings.LLM_CACHE_ENABLED and _is_deterministic_temperature(temperature)
+
+
+def _single_flight_key(
+    *,
+    kind: str,
+    model_name: str,
+    messages: Sequence[Dict[str, Any]],
+    temperature: float | None,
+    response_model: Type[BaseModel] | None = None,
+) -> str | None:
+    """
+    Only deterministic calls are coalesced: with sampling, callers expect
+    independent answers.
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED or not _is_deterministic_temperature(temperature):
+        return None
+    return _response_cache_key(
+        kind=kind,
+        model_name=model_name,
+        messages=messages,
+        temperature=temperature,
+        response_model=response_model,
+    )
+
+
+def _response_cache_key(
+    *,
+    kind: str,
+    model_name: str,
+    messages: Sequence[Dict[str, Any]],
+    temperature: float | None,
+    response_model: Type[BaseModel] | None = None,
+) -> str:
+    return canonical_hash(
+        {
+            "kind": kind,
+            "model": model_name,
+            "messages": list(messages),
+            "temperature": temperature,
+            "schema": response_model.model_json_schema() if response_model is not None else None,
+        }
+    )
+
+
+async def _response_cache_get(cache_key: str) -> Optional[str]:
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        _response_cache_counters["memory_hits"] += 1
+        return cached
+
+    if settings.LLM_CACHE_DB_TIER:
+        # Imported lazily so the gateway has no import-time dependency on the DB layer.
+        from app.db.session import AsyncSessionLocal
+        from app.repositories.llm_cache_repository import get_cached_llm_response
+
+        try:
+            async with AsyncSessionLocal() as db:
+                cached = await get_cached_llm_response(db, cache_key)
+        except Exception:
+            _response_cache_counters["db_errors"] += 1
+            cached = None
+        if cached is not None:
+            _response_cache.set(cache_key, cached)
+            _response_cache_counters["db_hits"] += 1
+            return cached
+
+    _response_cache_counters["misses"] += 1
+    return None
+
+
+async def _response_cache_set(
+    cache_key: str,
+    *,
+    kind: str,
+    model_name: str,
+    payload: str,
+) -> None:
+    _response_cache.set(cache_key, payload)
+    _response_cache_counters["stores"] += 1
+
+    if settings.LLM_CACHE_DB_TIER:
+        from app.db.session import AsyncSessionLocal
+        from app.db.unit_of_work import unit_of_work
+        from app.repositories.llm_cache_repository import upsert_cached_llm_response
+
+        try:
+            async with AsyncSessionLocal() as db, unit_of_work(db):
+                await upsert_cached_llm_response(
+                    db,
+                    cache_key=cache_key,
+                    kind=kind,
+                    model_name=model_name,
+                    payload=payload,
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                )
+        except Exception:
+            # A failed shared-tier write only costs a future miss.
+            _response_cache_counters["db_errors"] += 1
+
+
+def _usage_total_tokens(resp: Any) -> Optional[int]:
+    usage = _get_attr(resp, "usage", None)
+    total = _get_attr(usage, "total_tokens", None)
+    return int(total) if total is not None else None
+
+
+def _usage_breakdown(resp: Any) -> Dict[str, Optional[int]]:
+    """
+    Prompt / cached-prompt / completion tokens from either a Responses API
+    usage (input_tokens, input_tokens_details) or a Chat Completions usage.
+    """
+    usage = _get_attr(resp, "usage", None)
+    prompt = _get_attr(usage, "input_tokens", None)
+    if prompt is None:
+        prompt = _get_attr(usage, "prompt_tokens", None)
+    details = _get_attr(usage, "input_tokens_details", None) or _get_attr(
+        usage, "prompt_tokens_details", None
+    )
+    cached = _get_attr(details, "cached_tokens", None)
+    completion = _get_attr(usage, "output_tokens", None)
+    if completion is None:
+        completion = _get_attr(usage, "completion_tokens", None)
+    return {
+        "prompt_tokens": int(prompt) if prompt is not None else None,
+        "cached_prompt_tokens": int(cached) if cached is not None else None,
+        "completion_tokens": int(completion) if completion is not None else None,
+    }
+
+
+def _record_usage(resp: Any, usage_out: Optional[Dict[str, Any]]) -> None:
+    breakdown = _usage_breakdown(resp)
+    _token_usage_totals["calls"] += 1
+    for key, value in breakdown.items():
+        _token_usage_totals[key] += value or 0
+    if usage_out is not None:
+        usage_out.update(breakdown)
+
+
+async def _model_call(
+    endpoint: str,
+    *,
+    priority: int,
+    msgs: Sequence[Dict[str, Any]],
+    factory: Callable[[], Awaitable[Any]],
+    usage_out: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    One model request: each attempt waits for a scheduler slot, and failed
+    attempts release the slot before backing off.
+    """
+
+    async def _attempt() -> Any:
+        async with _scheduler.slot(priority, estimate_tokens(msgs)) as usage:
+            resp = await factory()
+            usage["total_tokens"] = _usage_total_tokens(resp)
+            return resp
+
+    resp = await _resilient.call(endpoint, _attempt)
+    _record_usage(resp, usage_out)
+    return resp
+
+
+def get_token_usage_stats() -> Dict[str, Any]:
+    prompt = _token_usage_totals["prompt_tokens"]
+    return {
+        **_token_usage_totals,
+        "cached_prompt_ratio": (
+            round(_token_usage_totals["cached_prompt_tokens"] / prompt, 4) if prompt else None
+        ),
+    }
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    return _resilient.stats()
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    return _scheduler.stats()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.LLM_CACHE_ENABLED,
+        "db_tier_enabled": settings.LLM_CACHE_DB_TIER,
+        "max_temperature": settings.LLM_CACHE_MAX_TEMPERATURE,
+        **_response_cache_counters,
+        "memory": _response_cache.stats(),
+    }
+
+
+def clear_response_cache() -> None:
+    _response_cache.clear()
+
+
 def _get_attr(obj: Any, key: str, default: Any = None) -> Any:
     if isinstance(obj, dict):
         return obj.get(key, default)
@@ -61,87 +366,186 @@ def _extract_text_from_result(result: Any) -> str:
     return "\n".join(texts).strip()
 
 
-def _normalize_source_key(value: Any) -> str:
-    if value is None:
-        return ""
-    return str(value).strip().lower()
+class _JsonStringFieldStreamer:
+    """
+    Incrementally decodes one top-level JSON string field (e.g. "assistant_text")
+    out of a structured-output document that arrives in arbitrary text deltas.
+    """
+
+    def __init__(self, field_name: str) -> None:
+        self._marker = json.dumps(field_name)
+        self._buffer = ""
+        self._pos = 0
+        self._state = "search"  # search -> open -> value -> done
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk or ""
+        if self._state == "done":
+            return ""
+
+        if self._state == "search":
+            idx = self._buffer.find(self._marker)
+            if idx < 0:
+                return ""
+            self._pos = idx + len(self._marker)
+            self._state = "open"
+
+        buf = self._buffer
+        if self._state == "open":
+            while self._pos < len(buf) and buf[self._pos] in " \t\r\n:":
+                self._pos += 1
+            if self._pos >= len(buf):
+                return ""
+            if buf[self._pos] != '"':
+                # Not a string value; nothing to stream.
+                self._state = "done"
+                return ""
+            self._pos += 1
+            self._state = "value"
+
+        out: List[str] = []
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            if ch == '"':
+                self._state = "done"
+                break
+            if ch != "\\":
+                out.append(ch)
+                self._pos += 1
+                continue
+            # Escape sequence: wait until it is complete before decoding it.
+            if self._pos + 1 >= len(buf):
+                break
+            if buf[self._pos + 1] == "u":
+                end = self._pos + 6
+                if end > len(buf):
+                    break
+                try:
+                    code = int(buf[self._pos + 2 : end], 16)
+                except ValueError:
+                    code = 0
+                if 0xD800 <= code <= 0xDBFF:
+                    # High surrogate: decode together with its low surrogate.
+                    end = self._pos + 12
+                    if end > len(buf):
+                        break
+                escape = buf[self._pos : end]
+            else:
+                end = self._pos + 2
+                escape = buf[self._pos : end]
+            try:
+                out.append(json.loads(f'"{escape}"'))
+            except ValueError:
+                out.append(escape)
+            self._pos = end
+        return "".join(out)
 
 
-def list_vector_store_files(
+async def _retrieve_filename(file_id: str, semaphore: asyncio.Semaphore) -> Optional[str]:
+    cached = _filename_cache.get(file_id)
+    if cached is not None:
+        return cached
+    async with semaphore:
+        try:
+            file_obj = await _resilient.call("files.retrieve", lambda: client.files.retrieve(file_id))
+        except Exception:
+            return None
+    filename = _get_attr(file_obj, "filename", None)
+    if filename:
+        _filename_cache[file_id] = str(filename)
+    return filename
+
+
+async def list_vector_store_files(
     *,
     vector_store_id: str,
+    known_filenames: Optional[Dict[str, str]] = None,
+    max_concurrency: int = 8,
 ) -> List[Dict[str, Any]]:
-    status_filters: List[Optional[str]] = [
-        None,
-        "in_progress",
-        "completed",
-        "failed",
-        "cancelled",
-    ]
+    """
+    Lists every file attached to a vector store in a single pagination pass
+    (the unfiltered listing already covers all statuses).
+
+    Filenames are immutable, so they come from `known_filenames` (e.g. the
+    persistent file-metadata cache) or the in-process cache first; only unknown
+    file_ids hit files.retrieve, concurrently with at most `max_concurrency`
+    requests in flight.
+    """
     collected_by_file_id: Dict[str, Dict[str, Any]] = {}
+    after_cursor: str | None = None
+    seen_cursors: set[str] = set()
 
-    for status_filter in status_filters:
-        after_cursor: str | None = None
-        seen_cursors: set[str] = set()
-        while True:
-            list_kwargs: Dict[str, Any] = {
-                "vector_store_id": vector_store_id,
-                "limit": 100,
-                "order": "desc",
-            }
-            if status_filter is not None:
-                list_kwargs["filter"] = status_filter
-            if after_cursor:
-                list_kwargs["after"] = after_cursor
-
-            page = client.vector_stores.files.list(**list_kwargs)
-            page_items = list(_get_attr(page, "data", None) or [])
-            if not page_items:
-                break
+    while True:
+        list_kwargs: Dict[str, Any] = {
+            "vector_store_id": vector_store_id,
+            "limit": 100,
+            "order": "desc",
+        }
+        if after_cursor:
+            list_kwargs["after"] = after_cursor
 
-            for vector_store_file in page_items:
-                vector_store_file_id = _get_attr(vector_store_file, "id", None)
-                file_id = _get_attr(vector_store_file, "file_id", None) or vector_store_file_id
-                if not file_id:
-                    continue
+        page = await _resilient.call(
+            "vector_stores.files.list",
+            lambda: client.vector_stores.files.list(**list_kwargs),
+        )
+        page_items = list(_get_attr(page, "data", None) or [])
+        if not page_items:
+            break
 
-                filename = None
-                file_status = _get_attr(vector_store_file, "status", None)
-                file_error = _get_attr(vector_store_file, "last_error", None)
-                usage_bytes = _get_attr(vector_store_file, "usage_bytes", None)
-                created_at = _get_attr(vector_store_file, "created_at", None)
+        for vector_store_file in page_items:
+            vector_store_file_id = _get_attr(vector_store_file, "id", None)
+            file_id = _get_attr(vector_store_file, "file_id", None) or vector_store_file_id
+            if not file_id:
+                continue
 
-                try:
-                    file_obj = client.files.retrieve(file_id)
-                    filename = _get_attr(file_obj, "filename", None)
-                except Exception:
-                    filename = None
+            file_error = _get_attr(vector_store_file, "last_error", None)
+            collected_by_file_id[str(file_id)] = {
+                "file_id": file_id,
+                "vector_store_file_id": vector_store_file_id,
+                "filename": None,
+                "status": _get_attr(vector_store_file, "status", None),
+                "usage_bytes": _get_attr(vector_store_file, "usage_bytes", None),
+                "created_at": _get_attr(vector_store_file, "created_at", None),
+                "attributes": dict(_get_attr(vector_store_file, "attributes", None) or {}),
+                "last_error": (
+                    {
+                        "code": _get_attr(file_error, "code", None),
+                        "message": _get_attr(file_error, "message", None),
+                    }
+                    if file_error is not None
+                    else None
+                ),
+            }
 
-                collected_by_file_id[str(file_id)] = {
-                    "file_id": file_id,
-                    "vector_store_file_id": vector_store_file_id,
-                    "filename": filename or file_id or "unknown",
-                    "status": file_status,
-                    "usage_bytes": usage_bytes,
-                    "created_at": created_at,
-                    "last_error": (
-                        {
-                            "code": _get_attr(file_error, "code", None),
-                            "message": _get_attr(file_error, "message", None),
-                        }
-                        if file_error is not None
-                        else None
-                    ),
-                }
+        if len(page_items) < 100:
+            break
 
-            if len(page_items) < 100:
-                break
+        next_cursor = str(_get_attr(page_items[-1], "id", "")).strip()
+        if not next_cursor or next_cursor in seen_cursors:
+            break
+        seen_cursors.add(next_cursor)
+        after_cursor = next_cursor
 
-            next_cursor = str(_get_attr(page_items[-1], "id", "")).strip()
-            if not next_cursor or next_cursor in seen_cursors:
-                break
-            seen_cursors.add(next_cursor)
-            after_cursor = next_cursor
+    known = known_filenames or {}
+    unresolved: List[str] = []
+    for file_id, item in collected_by_file_id.items():
+        filename = known.get(file_id) or _filename_cache.get(file_id)
+        if filename:
+            item["filename"] = filename
+            _filename_cache.setdefault(file_id, filename)
+        else:
+            unresolved.append(file_id)
+
+    if unresolved:
+        semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        resolved = await asyncio.gather(
+            *[_retrieve_filename(file_id, semaphore) for file_id in unresolved]
+        )
+        for file_id, filename in zip(unresolved, resolved):
+            collected_by_file_id[file_id]["filename"] = filename
+
+    for file_id, item in collected_by_file_id.items():
+        item["filename"] = item["filename"] or file_id or "unknown"
 
     files = list(collected_by_file_id.values())
     files.sort(
@@ -153,7 +557,7 @@ def list_vector_store_files(
     return files
 
 
-def list_processed_account_files(
+async def list_processed_account_files(
     *,
     purpose: str | None = None,
 ) -> List[Dict[str, Any]]:
@@ -170,7 +574,7 @@ def list_processed_account_files(
         if after_cursor:
             list_kwargs["after"] = after_cursor
 
-        page = client.files.list(**list_kwargs)
+        page = await _resilient.call("files.list", lambda: client.files.list(**list_kwargs))
         page_items = list(_get_attr(page, "data", None) or [])
         if not page_items:
             break
@@ -205,75 +609,658 @@ def list_processed_account_files(
     return files
 
 
-def attach_files_to_vector_store(
+async def _wait_for_file_batch(
+    *,
+    vector_store_id: str,
+    batch_id: str,
+    poll_interval_seconds: float,
+    deadline: float,
+) -> Any:
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await _resilient.call(
+            "vector_stores.file_batches.retrieve",
+            lambda: client.vector_stores.file_batches.retrieve(
+                batch_id,
+                vector_store_id=vector_store_id,
+            ),
+        )
+        status = str(_get_attr(batch, "status", "") or "").lower()
+        if status != "in_progress" or loop.time() >= deadline:
+            return batch
+        await asyncio.sleep(poll_interval_seconds)
+
+
+async def _list_file_batch_statuses(
+    *,
+    vector_store_id: str,
+    batch_id: str,
+) -> Dict[str, Dict[str, Any]]:
+    statuses: Dict[str, Dict[str, Any]] = {}
+    after_cursor: str | None = None
+    seen_cursors: set[str] = set()
+    while True:
+        list_kwargs: Dict[str, Any] = {"vector_store_id": vector_store_id, "limit": 100}
+        if after_cursor:
+            list_kwargs["after"] = after_cursor
+        page = await _resilient.call(
+            "vector_stores.file_batches.list_files",
+            lambda: client.vector_stores.file_batches.list_files(batch_id, **list_kwargs),
+        )
+        page_items = list(_get_attr(page, "data", None) or [])
+        if not page_items:
+            break
+        for item in page_items:
+            file_id = _get_attr(item, "file_id", None) or _get_attr(item, "id", None)
+            if not file_id:
+                continue
+            file_error = _get_attr(item, "last_error", None)
+            statuses[str(file_id)] = {
+                "status": _get_attr(item, "status", None),
+                "last_error": (
+                    {
+                        "code": _get_attr(file_error, "code", None),
+                        "message": _get_attr(file_error, "message", None),
+                    }
+                    if file_error is not None
+                    else None
+                ),
+            }
+        if len(page_items) < 100:
+            break
+        next_cursor = str(_get_attr(page_items[-1], "id", "")).strip()
+        if not next_cursor or next_cursor in seen_cursors:
+            break
+        seen_cursors.add(next_cursor)
+        after_cursor = next_cursor
+    return statuses
+
+
+async def attach_files_to_vector_store(
     *,
     vector_store_id: str,
     file_ids: Sequence[str],
-) -> int:
-    attached_count = 0
-    for file_id in file_ids:
-        normalized = str(file_id or "").strip()
-        if not normalized:
-            continue
-        client.vector_stores.files.create(
+    batch_size: int = 500,
+    poll_interval_seconds: float = 1.0,
+    timeout_seconds: float = 60.0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Attaches files with file-batch operations (up to `batch_size` files per batch)
+    instead of one files.create per file, then polls all batches concurrently.
+
+    Returns {file_id: {"status": ..., "last_error": ...}}. Files still processing
+    when `timeout_seconds` elapses are reported as "in_progress"; a later sync
+    picks up their final status.
+    """
+    normalized_ids = list(
+        dict.fromkeys(str(file_id or "").strip() for file_id in file_ids if str(file_id or "").strip())
+    )
+    if not normalized_ids:
+        return {}
+
+    chunks = [
+        normalized_ids[i : i + max(1, int(batch_size))]
+        for i in range(0, len(normalized_ids), max(1, int(batch_size)))
+    ]
+    batches = await asyncio.gather(
+        *[
+            _resilient.call(
+                "vector_stores.file_batches.create",
+                lambda chunk=chunk: client.vector_stores.file_batches.create(
+                    vector_store_id=vector_store_id,
+                    file_ids=chunk,
+                ),
+            )
+            for chunk in chunks
+        ]
+    )
+
+    deadline = asyncio.get_running_loop().time() + max(0.0, float(timeout_seconds))
+    finished = await asyncio.gather(
+        *[
+            _wait_for_file_batch(
+                vector_store_id=vector_store_id,
+                batch_id=str(_get_attr(batch, "id", "")),
+                poll_interval_seconds=poll_interval_seconds,
+                deadline=deadline,
+            )
+            for batch in batches
+        ]
+    )
+    per_batch_statuses = await asyncio.gather(
+        *[
+            _list_file_batch_statuses(
+                vector_store_id=vector_store_id,
+                batch_id=str(_get_attr(batch, "id", "")),
+            )
+            for batch in finished
+        ]
+    )
+
+    statuses: Dict[str, Dict[str, Any]] = {}
+    for chunk, batch, batch_statuses in zip(chunks, finished, per_batch_statuses):
+        batch_status = _get_attr(batch, "status", None)
+        for file_id in chunk:
+            statuses[file_id] = batch_statuses.get(
+                file_id,
+                {"status": batch_status or "in_progress", "last_error": None},
+            )
+    return statuses
+
+
+def _normalize_search_query(query: str) -> str:
+    normalized = re.sub(r"\s+", " ", (query or "").strip().lower())
+    return normalized.rstrip(" ?!.")
+
+
+async def search_vector_store(
+    *,
+    query: str,
+    vector_store_id: str,
+    max_results: int = 6,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Raw vector-store search. `filters` (see vector_store_search_filters) lets the
+    store drop disabled/unverified files server-side; the knowledge-source policy
+    is still applied afterwards by select_vector_store_context.
+    Returns {"search_query": ..., "results": [{file_id, filename, score, text}, ...]}.
+    """
+    cache_key = (
+        vector_store_id,
+        _normalize_search_query(query),
+        int(max_results),
+        canonical_hash(filters) if filters else None,
+    )
+    if settings.VECTOR_SEARCH_CACHE_ENABLED:
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    if settings.SINGLE_FLIGHT_ENABLED:
+        raw, _ = await _search_flights.do(
+            cache_key,
+            lambda: _search_vector_store_uncached(
+                query=query,
+                vector_store_id=vector_store_id,
+                max_results=max_results,
+                filters=filters,
+            ),
+        )
+    else:
+        raw = await _search_vector_store_uncached(
+            query=query,
             vector_store_id=vector_store_id,
-            file_id=normalized,
+            max_results=max_results,
+            filters=filters,
         )
-        attached_count += 1
-    return attached_count
+
+    if settings.VECTOR_SEARCH_CACHE_ENABLED:
+        _search_cache.set(cache_key, raw)
+    return raw
 
 
-def build_vector_store_context(
+async def _search_vector_store_uncached(
+    *,
+    query: str,
+    vector_store_id: str,
+    max_results: int,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    search_kwargs: Dict[str, Any] = {
+        "vector_store_id": vector_store_id,
+        "query": query,
+        "max_num_results": max_results,
+    }
+    if filters:
+        search_kwargs["filters"] = filters
+    results = await _resilient.call(
+        "vector_stores.search",
+        lambda: client.vector_stores.search(**search_kwargs),
+    )
+
+    raw_results: List[Dict[str, Any]] = []
+    for result in _get_attr(results, "data", []) or []:
+        file_id = _get_attr(result, "file_id", None)
+        raw_results.append(
+            {
+                "file_id": file_id,
+                "filename": (
+                    _get_attr(result, "filename", None)
+                    or _get_attr(result, "file_name", None)
+                    or file_id
+                    or "unknown"
+                ),
+                "score": _get_attr(result, "score", None),
+                "text": _extract_text_from_result(result),
+            }
+        )
+
+    return {
+        "search_query": _get_attr(results, "search_query", None),
+        "results": raw_results,
+    }
+
+
+async def update_vector_store_file_attributes(
+    *,
+    vector_store_id: str,
+    attributes_by_file_id: Dict[str, Dict[str, Any]],
+    max_concurrency: int = 8,
+) -> Dict[str, bool]:
+    """
+    Replaces the attributes of each listed vector-store file (callers pass the
+    merged set), concurrently with at most `max_concurrency` requests in flight.
+    Returns {file_id: succeeded}; failures are left for the next sync.
+    """
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def _update(file_id: str, attributes: Dict[str, Any]) -> bool:
+        async with semaphore:
+            try:
+                await _resilient.call(
+                    "vector_stores.files.update",
+                    lambda: client.vector_stores.files.update(
+                        file_id,
+                        vector_store_id=vector_store_id,
+                        attributes=attributes,
+                    ),
+                )
+                return True
+            except Exception as exc:
+                _safe_console_print(f"Vector store attribute update failed for {file_id}: {exc}")
+                return False
+
+    file_ids = list(attributes_by_file_id)
+    results = await asyncio.gather(
+        *[_update(file_id, attributes_by_file_id[file_id]) for file_id in file_ids]
+    )
+    return dict(zip(file_ids, results))
+
+
+async def get_vector_store_file_attributes(*, vector_store_id: str, file_id: str) -> Dict[str, Any]:
+    vector_store_file = await _resilient.call(
+        "vector_stores.files.retrieve",
+        lambda: client.vector_stores.files.retrieve(file_id, vector_store_id=vector_store_id),
+    )
+    return dict(_get_attr(vector_store_file, "attributes", None) or {})
+
+
+async def read_vector_store_file_text(*, vector_store_id: str, file_id: str) -> str:
+    """The parsed text the vector store indexed for one file (used to build local indexes)."""
+    page = await _resilient.call(
+        "vector_stores.files.content",
+        lambda: client.vector_stores.files.content(file_id, vector_store_id=vector_store_id),
+    )
+    parts = [str(_get_attr(item, "text", "") or "") for item in (_get_attr(page, "data", None) or [])]
+    return "\n\n".join(part for part in parts if part.strip())
+
+
+async def embed_texts(
+    texts: Sequence[str],
+    *,
+    model: str,
+    dimensions: Optional[int] = None,
+    batch_size: int = 256,
+) -> List[List[float]]:
+    vectors: List[List[float]] = []
+    for start in range(0, len(texts), max(1, batch_size)):
+        batch = list(texts[start : start + batch_size])
+        create_kwargs: Dict[str, Any] = {"model": model, "input": batch}
+        if dimensions:
+            create_kwargs["dimensions"] = int(dimensions)
+        response = await _resilient.call(
+            "embeddings.create",
+            lambda: client.embeddings.create(**create_kwargs),
+        )
+        rows = sorted(_get_attr(response, "data", None) or [], key=lambda row: _get_attr(row, "index", 0))
+        vectors.extend(list(_get_attr(row, "embedding", None) or []) for row in rows)
+    return vectors
+
+
+async def _embed_query_for_index(index: DenseIndex, query: str) -> List[float]:
+    # Queries are embedded the way the index was built (recorded in its manifest).
+    name = index.embedder.get("name")
+    if name == HASHING_EMBEDDER:
+        return HashingEmbedder(index.dimensions).embed_one(query)
+    if name == OPENAI_EMBEDDER:
+        vectors = await embed_texts(
+            [query],
+            model=str(index.embedder.get("model")),
+            dimensions=index.embedder.get("dimensions"),
+        )
+        return vectors[0]
+    raise RuntimeError(f"Dense index built with unknown embedder {name!r}")
+
+
+def _hit_results(hits: Sequence[Any]) -> List[Dict[str, Any]]:
+    return [
+        {"file_id": hit.file_id, "filename": hit.filename, "score": hit.score, "text": hit.text}
+        for hit in hits
+    ]
+
+
+def _raw_search_from_hits(query: str, hits: Sequence[Any], retrieval: Dict[str, Any]) -> Dict[str, Any]:
+    return {"search_query": query, "results": _hit_results(hits), "retrieval": retrieval}
+
+
+async def _search_dense_index(
+    *,
+    query: str,
+    max_results: int,
+    source_filter_policy: Optional[SourceFilterPolicy],
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    try:
+        index = load_dense_index(settings.DENSE_INDEX_PATH)
+    except Exception as exc:
+        _safe_console_print(f"Dense index unavailable: {exc}")
+        index = None
+    if index is None:
+        return None, "dense_unavailable"
+
+    try:
+        query_vector = await _embed_query_for_index(index, query)
+        # The NumPy scan runs in a worker thread, like the local search in hybrid mode.
+        hits = await asyncio.to_thread(
+            index.search,
+            query_vector,
+            limit=max_results,
+            nprobe=settings.DENSE_IVF_NPROBE,
+            source_filter_policy=source_filter_policy,
+        )
+    except Exception as exc:
+        # An embedding outage or a mismatched index must not fail the turn.
+        _safe_console_print(f"Dense search failed: {exc}")
+        return None, "dense_unavailable"
+    if not hits or hits[0].score < settings.DENSE_MIN_SCORE:
+        return None, "dense_low_confidence"
+    return _raw_search_from_hits(query, hits, {"engine": "dense", "top_score": hits[0].score}), "dense_answered"
+
+
+async def _lexical_hits(
+    *,
+    query: str,
+    max_results: int,
+    source_filter_policy: Optional[SourceFilterPolicy],
+) -> Optional[List[LexicalHit]]:
+    """
+    BM25 hits from the local index, or None when it is missing or unreadable.
+    The scan runs in a worker thread so it never blocks the event loop.
+    """
+    try:
+        index = load_lexical_index(settings.LEXICAL_INDEX_PATH)
+        if index is None:
+            return None
+        return await asyncio.to_thread(
+            index.search,
+            query,
+            limit=max_results,
+            source_filter_policy=source_filter_policy,
+        )
+    except Exception as exc:
+        _safe_console_print(f"Lexical index unavailable: {exc}")
+        return None
+
+
+async def _search_lexical_index(
+    *,
+    query: str,
+    max_results: int,
+    source_filter_policy: Optional[SourceFilterPolicy],
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Local BM25 search in the raw-search shape, or (None, reason) when the index is
+    missing/unreadable or its best match is below the confidence bar.
+    """
+    hits = await _lexical_hits(query=query, max_results=max_results, source_filter_policy=source_filter_policy)
+    if hits is None:
+        return None, "lexical_unavailable"
+    top = hits[0] if hits else None
+    if top is None or top.coverage < settings.LEXICAL_MIN_COVERAGE or top.score < settings.LEXICAL_MIN_SCORE:
+        return None, "lexical_low_confidence"
+    return _raw_search_from_hits(
+        query,
+        hits,
+        {"engine": "lexical", "top_score": top.score, "top_coverage": top.coverage},
+    ), "lexical_answered"
+
+
+async def search_knowledge_sources(
     *,
     query: str,
     vector_store_id: str,
     max_results: int = 6,
-    max_chars_per_result: int = 1200,
-    source_filter_policy: Optional[Dict[str, Any]] = None,
-) -> tuple[List[str], Dict[str, Any]]:
-    if not query or not query.strip():
-        return [], {"vector_store_id": vector_store_id, "query": query, "sources": []}
+    source_filter_policy: Optional[SourceFilterPolicy] = None,
+) -> Dict[str, Any]:
+    """
+    Raw knowledge search through the configured RETRIEVAL_MODE. "lexical_first"
+    and "dense_local" answer from a local index when its best match clears the
+    confidence bar and fall back to search_vector_store otherwise; "hybrid" runs
+    the remote and BM25 searches together and fuses them. Every path returns the
+    same shape.
+    """
+    if settings.RETRIEVAL_MODE == "hybrid":
+        return await _hybrid_search(
+            query=query,
+            vector_store_id=vector_store_id,
+            max_results=max_results,
+            source_filter_policy=source_filter_policy,
+        )
 
-    results = client.vector_stores.search(
+    fallback_reason: Optional[str] = None
+    if settings.RETRIEVAL_MODE in {"lexical_first", "dense_local"}:
+        if settings.RETRIEVAL_MODE == "lexical_first":
+            local, outcome = await _search_lexical_index(
+                query=query,
+                max_results=max_results,
+                source_filter_policy=source_filter_policy,
+            )
+        else:
+            local, outcome = await _search_dense_index(
+                query=query,
+                max_results=max_results,
+                source_filter_policy=source_filter_policy,
+            )
+        _retrieval_counters[outcome] += 1
+        if local is not None:
+            return local
+        fallback_reason = outcome
+
+    raw_search = await _remote_search(
+        query=query,
         vector_store_id=vector_store_id,
+        max_results=max_results,
+        source_filter_policy=source_filter_policy,
+    )
+    if fallback_reason is None:
+        return raw_search
+    # Cached results are shared; annotate a copy.
+    return {**raw_search, "retrieval": {"engine": "remote", "fallback_reason": fallback_reason}}
+
+
+async def _remote_search(
+    *,
+    query: str,
+    vector_store_id: str,
+    max_results: int,
+    source_filter_policy: Optional[SourceFilterPolicy],
+) -> Dict[str, Any]:
+    _retrieval_counters["remote_searches"] += 1
+    return await search_vector_store(
         query=query,
-        max_num_results=max_results,
+        vector_store_id=vector_store_id,
+        max_results=max_results,
+        filters=(
+            vector_store_search_filters(source_filter_policy)
+            if settings.VECTOR_SEARCH_ATTRIBUTE_FILTERS
+            else None
+        ),
     )
 
-    data = _get_attr(results, "data", []) or []
-    sources: List[Dict[str, Any]] = []
-    context_chunks: List[str] = []
 
-    policy = source_filter_policy or {}
-    has_registry_rows = bool(policy.get("has_registry_rows"))
-    enabled_refs = {
-        _normalize_source_key(v) for v in (policy.get("enabled_refs") or set()) if _normalize_source_key(v)
+def _forget_late_search(task: "asyncio.Task[Dict[str, Any]]") -> None:
+    _late_remote_searches.discard(task)
+    if not task.cancelled():
+        # Mark the exception retrieved; nobody is waiting for this result any more.
+        task.exception()
+
+
+def _fusion_key(result: Dict[str, Any]) -> Tuple[str, str]:
+    # The store and the local index chunk independently: results are the same item
+    # only when they come from the same file and open with the same text.
+    text = " ".join(str(result.get("text") or "").lower().split())
+    return normalize_source_key(result.get("file_id")), text[:200]
+
+
+async def _hybrid_search(
+    *,
+    query: str,
+    vector_store_id: str,
+    max_results: int,
+    source_filter_policy: Optional[SourceFilterPolicy],
+) -> Dict[str, Any]:
+    """
+    Fans out to the vector store and the local BM25 index at once and fuses the two
+    rankings with reciprocal rank fusion. When the local index has results, the
+    remote search gets HYBRID_DEADLINE_SECONDS in total; past that the turn goes on
+    with the local results alone. Without local results it is awaited as usual.
+    """
+    _retrieval_counters["hybrid_searches"] += 1
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, settings.HYBRID_DEADLINE_SECONDS)
+    remote_task = asyncio.ensure_future(
+        _remote_search(
+            query=query,
+            vector_store_id=vector_store_id,
+            max_results=max_results,
+            source_filter_policy=source_filter_policy,
+        )
+    )
+    try:
+        # The BM25 scan runs in a worker thread, so it overlaps the remote round-trip.
+        local_hits = await _lexical_hits(
+            query=query,
+            max_results=max_results,
+            source_filter_policy=source_filter_policy,
+        )
+        await asyncio.wait({remote_task}, timeout=max(0.0, deadline - loop.time()) if local_hits else None)
+    except asyncio.CancelledError:
+        remote_task.cancel()
+        raise
+
+    if local_hits is None:
+        _retrieval_counters["hybrid_lexical_unavailable"] += 1
+    remote_status = "ok"
+    remote_raw: Dict[str, Any] = {}
+    if not remote_task.done():
+        remote_status = "deadline"
+        _retrieval_counters["hybrid_remote_deadline"] += 1
+        _late_remote_searches.add(remote_task)
+        remote_task.add_done_callback(_forget_late_search)
+    elif remote_task.exception() is not None:
+        if not local_hits:
+            raise remote_task.exception()
+        remote_status = "failed"
+        _retrieval_counters["hybrid_remote_failed"] += 1
+        _safe_console_print(f"Vector store search failed, using local results: {remote_task.exception()}")
+    else:
+        remote_raw = remote_task.result()
+
+    remote_results = list(remote_raw.get("results") or [])
+    local_results = _hit_results(local_hits or [])
+    fused = reciprocal_rank_fusion(
+        [remote_results, local_results],
+        key=_fusion_key,
+        k=settings.HYBRID_RRF_K,
+        limit=max_results,
+    )
+    return {
+        "search_query": remote_raw.get("search_query") or query,
+        # Scores are RRF scores; the engines' own scores are not comparable.
+        "results": [{**result, "score": score} for result, score in fused],
+        "retrieval": {
+            "engine": "hybrid",
+            "remote": remote_status,
+            "lexical": "unavailable" if local_hits is None else "ok",
+            "remote_results": len(remote_results),
+            "lexical_results": len(local_results),
+            "rrf_k": settings.HYBRID_RRF_K,
+        },
     }
-    verified_refs = {
-        _normalize_source_key(v) for v in (policy.get("verified_refs") or set()) if _normalize_source_key(v)
+
+
+def get_retrieval_stats() -> Dict[str, Any]:
+    return {"mode": settings.RETRIEVAL_MODE, **_retrieval_counters}
+
+
+def invalidate_vector_store_search_cache(vector_store_id: str | None = None) -> int:
+    """
+    Drop cached search results for one vector store (or all when None).
+    Call whenever the store's file set changes.
+    """
+    global _search_cache_invalidations
+    removed = 0
+    for key in _search_cache.keys():
+        if vector_store_id is None or key[0] == vector_store_id:
+            _search_cache.pop(key)
+            removed += 1
+    _search_cache_invalidations += 1
+    return removed
+
+
+def get_single_flight_stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.SINGLE_FLIGHT_ENABLED,
+        "llm": _llm_flights.stats(),
+        "vector_search": _search_flights.stats(),
     }
-    strict_verified_only = bool(policy.get("strict_verified_only"))
+
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.VECTOR_SEARCH_CACHE_ENABLED,
+        "invalidations": _search_cache_invalidations,
+        **_search_cache.stats(),
+    }
+
+
+def select_vector_store_context(
+    raw_search: Dict[str, Any],
+    *,
+    query: str,
+    vector_store_id: str,
+    max_chars_per_result: int = 1200,
+    source_filter_policy: Optional[SourceFilterPolicy] = None,
+) -> tuple[List[str], Dict[str, Any]]:
+    """
+    Applies the knowledge-source policy to raw search results and builds
+    the prompt chunks plus the evidence payload.
+    """
+    sources: List[Dict[str, Any]] = []
+    context_chunks: List[str] = []
+
+    # Compiled once per registry version: the ref sets are already normalized.
+    policy = source_filter_policy or SourceFilterPolicy(version=0)
+    has_registry_rows = policy.has_registry_rows
+    enabled_refs = policy.enabled_refs
+    verified_refs = policy.verified_refs
+    strict_verified_only = policy.strict_verified_only
     filtered_out_disabled = 0
     filtered_out_unverified = 0
 
     selected_rows: List[Dict[str, Any]] = []
 
-    for idx, result in enumerate(data):
-        text = _extract_text_from_result(result)
+    for idx, result in enumerate(raw_search.get("results") or []):
+        text = result.get("text") or ""
         if not text:
             continue
         if len(text) > max_chars_per_result:
             text = text[:max_chars_per_result].rstrip() + "..."
-        file_id = _get_attr(result, "file_id", None)
-        filename = (
-            _get_attr(result, "filename", None)
-            or _get_attr(result, "file_name", None)
-            or file_id
-            or "unknown"
-        )
+        file_id = result.get("file_id")
+        filename = result.get("filename") or file_id or "unknown"
         candidate_keys = {
-            _normalize_source_key(file_id),
-            _normalize_source_key(filename),
+            normalize_source_key(file_id),
+            normalize_source_key(filename),
         }
         candidate_keys.discard("")
 
@@ -294,7 +1281,7 @@ def build_vector_store_context(
                 "source": {
                     "file_id": file_id,
                     "filename": filename,
-                    "score": _get_attr(result, "score", None),
+                    "score": result.get("score"),
                     "snippet": text,
                 },
             }
@@ -314,7 +1301,7 @@ def build_vector_store_context(
     evidence = {
         "vector_store_id": vector_store_id,
         "query": query,
-        "search_query": _get_attr(results, "search_query", None),
+        "search_query": raw_search.get("search_query"),
         "sources": sources,
         "source_filter": {
             "registry_enforced": has_registry_rows,
@@ -323,6 +1310,8 @@ def build_vector_store_context(
             "filtered_out_unverified": filtered_out_unverified,
         },
     }
+    if raw_search.get("retrieval"):
+        evidence["retrieval"] = raw_search["retrieval"]
     _safe_console_print("\nRetrieved Chunk Snippets:")
     for src in sources:
         _safe_console_print(f"\n--- {src['filename']} ---")
@@ -331,22 +1320,86 @@ def build_vector_store_context(
     return context_chunks, evidence
 
 
+async def build_vector_store_context(
+    *,
+    query: str,
+    vector_store_id: str,
+    max_results: int = 6,
+    max_chars_per_result: int = 1200,
+    source_filter_policy: Optional[SourceFilterPolicy] = None,
+) -> tuple[List[str], Dict[str, Any]]:
+    if not query or not query.strip():
+        return [], {"vector_store_id": vector_store_id, "query": query, "sources": []}
+
+    raw_search = await search_knowledge_sources(
+        query=query,
+        vector_store_id=vector_store_id,
+        max_results=max_results,
+        source_filter_policy=source_filter_policy,
+    )
+    return select_vector_store_context(
+        raw_search,
+        query=query,
+        vector_store_id=vector_store_id,
+        max_chars_per_result=max_chars_per_result,
+        source_filter_policy=source_filter_policy,
+    )
+
+
 async def generate_chat_reply(
     *,
     messages_for_model: Sequence[Dict[str, Any]],
     model_name: str = "gpt-4o-mini",
     temperature: float = 0.2,
+    priority: int = PRIORITY_INTERACTIVE,
 ) -> str:
     """
     Plain text generation (non-structured).
+    Deterministic calls (temperature <= LLM_CACHE_MAX_TEMPERATURE) are served from the response cache.
     """
     msgs = _normalize_messages(messages_for_model)
-    resp = client.chat.completions.create(
-        model=model_name,
+
+    cache_key: str | None = None
+    if _is_cacheable_temperature(temperature):
+        cache_key = _response_cache_key(
+            kind="chat",
+            model_name=model_name,
+            messages=msgs,
+            temperature=temperature,
+        )
+        cached = await _response_cache_get(cache_key)
+        if cached is not None:
+            return cached
+    else:
+        _response_cache_counters["bypassed"] += 1
+
+    async def _generate() -> str:
+        resp = await _model_call(
+            "chat.completions.create",
+            priority=priority,
+            msgs=msgs,
+            factory=lambda: client.chat.completions.create(
+                model=model_name,
+                messages=msgs,
+                temperature=temperature,
+            ),
+        )
+        text = resp.choices[0].message.content or ""
+
+        if cache_key is not None and text:
+            await _response_cache_set(cache_key, kind="chat", model_name=model_name, payload=text)
+        return text
+
+    flight_key = cache_key or _single_flight_key(
+        kind="chat",
+        model_name=model_name,
         messages=msgs,
         temperature=temperature,
     )
-    return resp.choices[0].message.content or ""
+    if flight_key is None or not settings.SINGLE_FLIGHT_ENABLED:
+        return await _generate()
+    text, _ = await _llm_flights.do(flight_key, _generate)
+    return text
 
 
 async def generate_structured_text(
@@ -354,25 +1407,147 @@ async def generate_structured_text(
     messages_for_model: Sequence[Dict[str, Any]],
     response_model: Type[T],
     model_name: str = "gpt-4o-mini",
+    temperature: float | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    usage_out: Dict[str, Any] | None = None,
 ) -> T:
     """
     TRUE Structured Outputs:
     Uses OpenAI SDK structured parsing. Model is forced to match `response_model`.
+    `temperature=None` keeps the provider default (never cached).
+    `usage_out`, when given, receives prompt/cached/completion token counts
+    (left untouched when the answer comes from a cache or a shared call).
     """
     msgs = _normalize_messages(messages_for_model)
 
-    resp = client.responses.parse(
-        model=model_name,
-        input=msgs,
-        text_format=response_model,
+    cache_key: str | None = None
+    if _is_cacheable_temperature(temperature):
+        cache_key = _response_cache_key(
+            kind="structured",
+            model_name=model_name,
+            messages=msgs,
+            temperature=temperature,
+            response_model=response_model,
+        )
+        cached = await _response_cache_get(cache_key)
+        if cached is not None:
+            try:
+                return response_model.model_validate_json(cached)
+            except ValueError:
+                # Schema drifted since the entry was written; regenerate.
+                _response_cache.pop(cache_key)
+    else:
+        _response_cache_counters["bypassed"] += 1
+
+    parse_kwargs: Dict[str, Any] = {}
+    if temperature is not None:
+        parse_kwargs["temperature"] = temperature
+
+    async def _generate() -> T:
+        resp = await _model_call(
+            "responses.parse",
+            priority=priority,
+            msgs=msgs,
+            usage_out=usage_out,
+            factory=lambda: client.responses.parse(
+                model=model_name,
+                input=msgs,
+                text_format=response_model,
+                **parse_kwargs,
+            ),
+        )
+
+        parsed = resp.output_parsed
+        if parsed is None:
+            # Covers refusal / incomplete cases.
+            raise RuntimeError("No structured output parsed (refusal or incomplete response).")
+
+        if cache_key is not None:
+            await _response_cache_set(
+                cache_key,
+                kind="structured",
+                model_name=model_name,
+                payload=parsed.model_dump_json(),
+            )
+        return parsed
+
+    flight_key = cache_key or _single_flight_key(
+        kind="structured",
+        model_name=model_name,
+        messages=msgs,
+        temperature=temperature,
+        response_model=response_model,
     )
+    if flight_key is None or not settings.SINGLE_FLIGHT_ENABLED:
+        return await _generate()
+    parsed, shared = await _llm_flights.do(flight_key, _generate)
+    # Callers may mutate their result; followers get their own copy.
+    return parsed.model_copy(deep=True) if shared else parsed
+
+
+async def stream_structured_text(
+    *,
+    messages_for_model: Sequence[Dict[str, Any]],
+    response_model: Type[T],
+    stream_field: str,
+    model_name: str = "gpt-4o-mini",
+    priority: int = PRIORITY_INTERACTIVE,
+    usage_out: Dict[str, Any] | None = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming Structured Outputs.
+    Yields ("delta", text) for the decoded `stream_field` string while the model
+    is still generating, then ("final", parsed_model) once the response is complete.
+    """
+    msgs = _normalize_messages(messages_for_model)
+    breaker = _resilient.breaker("responses.stream")
+    attempt = 0
 
+    while True:
+        probe = breaker.before_call("responses.stream")
+        streamer = _JsonStringFieldStreamer(stream_field)
+        emitted = False
+        try:
+            async with _scheduler.slot(priority, estimate_tokens(msgs)) as usage:
+                async with client.responses.stream(
+                    model=model_name,
+                    input=msgs,
+                    text_format=response_model,
+                ) as stream:
+                    async for event in stream:
+                        if getattr(event, "type", None) != "response.output_text.delta":
+                            continue
+                        text = streamer.feed(getattr(event, "delta", "") or "")
+                        if text:
+                            emitted = True
+                            yield "delta", text
+                    resp = await stream.get_final_response()
+                usage["total_tokens"] = _usage_total_tokens(resp)
+        except Exception as exc:
+            if not is_retryable_error(exc):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            # Tokens already reached the client cannot be taken back, so only
+            # retry failures that happened before the first delta.
+            if emitted or attempt >= _resilient.max_retries or breaker.state == "open":
+                raise
+            await asyncio.sleep(_resilient.backoff_seconds(attempt, exc))
+            attempt += 1
+            continue
+        except BaseException:
+            # Client disconnect: aclose() raises GeneratorExit at the yield.
+            breaker.abandon_call(probe)
+            raise
+        breaker.record_success()
+        break
+
+    _record_usage(resp, usage_out)
     parsed = resp.output_parsed
     if parsed is None:
-        # Covers refusal / incomplete cases.
         raise RuntimeError("No structured output parsed (refusal or incomplete response).")
 
-    return parsed
+    yield "final", parsed
 
 
 # Backwards-compatible alias (your code was importing this name)
@@ -381,9 +1556,13 @@ async def generate_structured_output(
     messages_for_model: Sequence[Dict[str, Any]],
     response_model: Type[T],
     model_name: str = "gpt-4o-mini",
+    temperature: float | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
 ) -> T:
     return await generate_structured_text(
         messages_for_model=messages_for_model,
         response_model=response_model,
         model_name=model_name,
+        temperature=temperature,
+        priority=priority,
     )
@@ -0,0 +1,54 @@
+# app/core/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+R = TypeVar("R")
+
+
+class SingleFlight(Generic[R]):
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work, later callers await the same in-flight task instead of repeating it.
+
+    The work runs as its own task, so a caller that is cancelled (client
+    disconnect) does not cancel the result the other callers are waiting on.
+    The key is forgotten as soon as the task finishes; caching the result is
+    the caller's job.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, "asyncio.Task[R]"] = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[R]]) -> Tuple[R, bool]:
+        """
+        Returns (result, shared); `shared` is True when this caller joined a
+        call started by someone else and therefore holds the same object.
+        """
+        task = self._flights.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[R]") -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away.
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+        }
@@ -0,0 +1,63 @@
+# app/core/source_policy.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+
+
+def normalize_source_key(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+@dataclass(frozen=True)
+class SourceFilterPolicy:
+    """
+    Knowledge-source registry compiled for retrieval filtering. The ref sets are
+    already normalized (normalize_source_key); one instance is built per registry
+    version and shared by every chat turn in the process.
+    """
+
+    version: int
+    has_registry_rows: bool = False
+    enabled_refs: FrozenSet[str] = field(default_factory=frozenset)
+    verified_refs: FrozenSet[str] = field(default_factory=frozenset)
+    strict_verified_only: bool = False
+    source_scope: str = "all_knowledge_sources"
+
+    def allows(self, file_id: Any, filename: Any) -> bool:
+        """Same decision select_vector_store_context makes for one search result."""
+        if not self.has_registry_rows:
+            return True
+        keys = {normalize_source_key(file_id), normalize_source_key(filename)}
+        keys.discard("")
+        if not keys or self.enabled_refs.isdisjoint(keys):
+            return False
+        return not self.strict_verified_only or not self.verified_refs.isdisjoint(keys)
+
+
+# Vector-store file attributes mirroring the registry flags, so the search call can
+# filter server-side (VECTOR_SEARCH_ATTRIBUTE_FILTERS).
+ENABLED_ATTRIBUTE = "ssi_enabled"
+VERIFIED_ATTRIBUTE = "ssi_verified"
+
+
+def source_file_attributes(*, enabled: bool, verified: bool) -> Dict[str, bool]:
+    return {ENABLED_ATTRIBUTE: bool(enabled), VERIFIED_ATTRIBUTE: bool(verified)}
+
+
+def vector_store_search_filters(policy: SourceFilterPolicy | None) -> Optional[Dict[str, Any]]:
+    """
+    The policy as a vector-store attribute filter, or None when it cannot be pushed
+    down: no registry (nothing is filtered) or a legacy/manual registry whose refs
+    are matched by filename rather than by vector-store file.
+    """
+    if policy is None or not policy.has_registry_rows or policy.source_scope != "vector_store_file_only":
+        return None
+    conditions: List[Dict[str, Any]] = [{"type": "eq", "key": ENABLED_ATTRIBUTE, "value": True}]
+    if policy.strict_verified_only:
+        conditions.append({"type": "eq", "key": VERIFIED_ATTRIBUTE, "value": True})
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"type": "and", "filters": conditions}
@@ -0,0 +1,37 @@
+# app/core/timing.py
+from __future__ import annotations
+
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+_METRIC_NAME = re.compile(r"[^A-Za-z0-9_\-]")
+
+
+class StageTimings:
+    """
+    Wall-clock duration per named stage of one request, rendered as a
+    Server-Timing header. Stages that overlap (concurrent I/O) each report
+    their own duration; a wrapping stage reports the combined wall time.
+    """
+
+    def __init__(self) -> None:
+        self._stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self._stages.append((_METRIC_NAME.sub("_", name), max(0.0, seconds)))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000.0, 1) for name, seconds in self._stages}
+
+    def server_timing_header(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in self._stages)
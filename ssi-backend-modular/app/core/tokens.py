@@ -0,0 +1,46 @@
+# app/core/tokens.py
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+
+# Chat-format framing per message (role, separators) and reply priming, as
+# documented for OpenAI chat models.
+_TOKENS_PER_MESSAGE = 4
+_TOKENS_REPLY_PRIMING = 2
+
+
+@lru_cache(maxsize=16)
+def _encoding_for_model(model_name: str) -> Optional[Any]:
+    """
+    tiktoken is optional: without it (or for unknown models without a
+    fallback encoding) counts fall back to ~4 characters per token.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o-mini") -> int:
+    if not text:
+        return 0
+    encoding = _encoding_for_model(model_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: Dict[str, Any], model_name: str = "gpt-4o-mini") -> int:
+    return _TOKENS_PER_MESSAGE + count_tokens(str(message.get("content") or ""), model_name)
+
+
+def count_messages_tokens(messages: Sequence[Dict[str, Any]], model_name: str = "gpt-4o-mini") -> int:
+    return _TOKENS_REPLY_PRIMING + sum(count_message_tokens(m, model_name) for m in messages)
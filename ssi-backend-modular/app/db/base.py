@@ -1,4 +1,11 @@
 # app/db/base.py
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
+
+class _ModelDefaults:
+    # Server-generated column values come back on the INSERT/UPDATE ... RETURNING
+    # itself, so repositories never need a follow-up refresh() SELECT after a write.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=_ModelDefaults)
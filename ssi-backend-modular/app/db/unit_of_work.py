@@ -0,0 +1,58 @@
+# app/db/unit_of_work.py
+from __future__ import annotations
+
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_DEPTH_KEY = "unit_of_work_depth"
+_AFTER_COMMIT_KEY = "unit_of_work_after_commit"
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    One transaction per service call. Repositories only flush; the outermost
+    unit_of_work commits once on success and rolls back on error. Nested blocks
+    (a service calling another service) join the outer transaction.
+    """
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            await db.commit()
+    except BaseException:
+        if depth == 0:
+            db.info.pop(_AFTER_COMMIT_KEY, None)
+            await db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
+
+    if depth == 0:
+        callbacks: List[Callable[[], Any]] = db.info.pop(_AFTER_COMMIT_KEY, [])
+        for callback in callbacks:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+
+def in_unit_of_work(db: AsyncSession) -> bool:
+    return db.info.get(_DEPTH_KEY, 0) > 0
+
+
+async def run_after_commit(db: AsyncSession, callback: Callable[[], Any]) -> None:
+    """
+    Defers `callback` (sync or async) until the enclosing unit of work has
+    committed, e.g. handing a freshly inserted job row to a worker that reads it
+    from another session. Outside a unit of work it runs immediately.
+    """
+    if in_unit_of_work(db):
+        db.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+        return
+    result = callback()
+    if inspect.isawaitable(result):
+        await result
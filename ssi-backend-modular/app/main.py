@@ -1,10 +1,15 @@
 # app/main.py
 from __future__ import annotations
 
-from fastapi import FastAPI
+import math
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.job_runner import job_runner
+from app.core.llm_resilience import UpstreamUnavailableError
 from app.db.session import engine
 from app.db.base import Base
 
@@ -30,15 +35,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    # Open circuit: tell clients when to come back instead of returning a generic 500.
+    retry_after = max(1, math.ceil(exc.retry_after_seconds))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "retry_after_seconds": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 @app.on_event("startup")
 async def on_startup():
     # Create tables on startup (like auto-migrations)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # Handlers are registered at import time by the services the routers pull in;
+    # jobs persisted by a previous process are re-queued here.
+    await job_runner.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await job_runner.stop()
+
 
 @app.get("/")
 async def root():
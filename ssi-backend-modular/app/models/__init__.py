@@ -8,6 +8,12 @@ from .models import (
     QuizQuestion,
     KnowledgeSource,
     KnowledgeSourceAudit,
+    KnowledgeSourcePolicyVersion,
+    LLMResponseCacheEntry,
+    OpenAIFileMetadata,
+    BackgroundJob,
+    EvidenceSnippet,
+    MessageEvidenceLink,
 )
 
 __all__ = [
@@ -19,4 +25,10 @@ __all__ = [
     "QuizQuestion",
     "KnowledgeSource",
     "KnowledgeSourceAudit",
+    "KnowledgeSourcePolicyVersion",
+    "LLMResponseCacheEntry",
+    "OpenAIFileMetadata",
+    "BackgroundJob",
+    "EvidenceSnippet",
+    "MessageEvidenceLink",
 ]
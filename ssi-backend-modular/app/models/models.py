@@ -7,14 +7,17 @@ from typing import Optional, List
 from sqlalchemy import (
     String,
     Integer,
+    BigInteger,
     Text,
     Boolean,
     Numeric,
+    Float,
     ForeignKey,
+    Index,
     JSON,
     TIMESTAMP,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 from app.db.base import Base  # <-- updated import
 
@@ -60,6 +63,10 @@ class ChatSession(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     title: Mapped[Optional[str]] = mapped_column(String(255))
     model_name: Mapped[Optional[str]] = mapped_column(String(255))
+    # Rolling summary of every message with id <= summary_message_id; only newer
+    # messages are sent to the model verbatim.
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, default=datetime.utcnow, nullable=False
     )
@@ -75,6 +82,10 @@ class ChatSession(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination of a chat's history: (created_at, id) within one session.
+        Index("ix_messages_chat_session_created_id", "chat_session_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     chat_session_id: Mapped[int] = mapped_column(
@@ -83,7 +94,16 @@ class Message(Base):
     sender_role: Mapped[str] = mapped_column(String(20))  # 'user' or 'assistant'
     content: Mapped[str] = mapped_column(Text, nullable=False)
     model_name: Mapped[Optional[str]] = mapped_column(String(255))
-    evidence_source: Mapped[Optional[str]] = mapped_column(Text)
+    # Serialized retrieval evidence (snippets + filter stats), often several KB. Deferred:
+    # history and listing queries skip it unless asked; has_evidence is the cheap flag
+    # those queries select instead (None when the query did not request it).
+    evidence_source: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
+    has_evidence: Mapped[Optional[bool]] = query_expression()
+    # Upstream usage for assistant messages; cached_prompt_tokens is the provider's
+    # prompt-prefix cache hit count for that turn.
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    cached_prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, default=datetime.utcnow, nullable=False
     )
@@ -180,6 +200,9 @@ class KnowledgeSource(Base):
     source_ref: Mapped[str] = mapped_column(Text, nullable=False, index=True)
     enabled: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true", nullable=False)
     verified: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
+    # Vector-store ingestion status reported by the sync ("in_progress", "completed", "failed", ...).
+    index_status: Mapped[Optional[str]] = mapped_column(String(20))
+    index_error: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, default=datetime.utcnow, nullable=False
     )
@@ -214,3 +237,95 @@ class KnowledgeSourceAudit(Base):
 
     admin_user: Mapped["User"] = relationship(back_populates="knowledge_source_audit_entries")
     source: Mapped[Optional["KnowledgeSource"]] = relationship(back_populates="audit_entries")
+
+
+class KnowledgeSourcePolicyVersion(Base):
+    """
+    Single row (id=1) bumped in the same transaction as every knowledge source
+    change; workers compare it to their compiled filter policy's version.
+    """
+    __tablename__ = "knowledge_source_policy_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, default=datetime.utcnow, nullable=False
+    )
+
+
+class LLMResponseCacheEntry(Base):
+    __tablename__ = "llm_response_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    model_name: Mapped[Optional[str]] = mapped_column(String(255))
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, default=datetime.utcnow, nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, index=True)
+
+
+class OpenAIFileMetadata(Base):
+    __tablename__ = "openai_file_metadata"
+
+    file_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    filename: Mapped[str] = mapped_column(Text, nullable=False)
+    purpose: Mapped[Optional[str]] = mapped_column(String(50))
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, default=datetime.utcnow, nullable=False
+    )
+
+
+class BackgroundJob(Base):
+    """
+    Post-response work (chat titles, flashcard inserts, summaries) handed to the
+    in-process job runner; persisted so queued jobs survive a restart.
+    """
+    __tablename__ = "background_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    # queued | running | succeeded | failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, default=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
+
+
+class EvidenceSnippet(Base):
+    """
+    Retrieved snippet text, stored once per (file_id, text) and shared by every
+    assistant message that cited it.
+    """
+    __tablename__ = "evidence_snippets"
+
+    # sha256 hex of file_id + NUL + snippet text.
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_id: Mapped[Optional[str]] = mapped_column(String(255), index=True)
+    filename: Mapped[Optional[str]] = mapped_column(Text)
+    snippet: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, default=datetime.utcnow, nullable=False
+    )
+
+
+class MessageEvidenceLink(Base):
+    """One cited snippet of an assistant message, in prompt order (rank)."""
+    __tablename__ = "message_evidence_links"
+
+    message_id: Mapped[int] = mapped_column(
+        ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(
+        ForeignKey("evidence_snippets.content_hash"), nullable=False, index=True
+    )
+    score: Mapped[Optional[float]] = mapped_column(Float)
+    verified_match: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
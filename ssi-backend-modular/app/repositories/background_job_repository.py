@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import BackgroundJob
+
+
+async def create_background_job(
+    db: AsyncSession,
+    *,
+    kind: str,
+    payload: str,
+    max_attempts: int,
+) -> BackgroundJob:
+    job = BackgroundJob(
+        kind=kind,
+        payload=payload,
+        status="queued",
+        attempts=0,
+        max_attempts=max(1, int(max_attempts)),
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def has_pending_background_job(
+    db: AsyncSession,
+    *,
+    kind: str,
+    payload: str,
+) -> bool:
+    """True when a job of `kind` with the same payload is queued or running."""
+    res = await db.execute(
+        select(BackgroundJob.id)
+        .where(
+            BackgroundJob.kind == kind,
+            BackgroundJob.payload == payload,
+            BackgroundJob.status.in_(("queued", "running")),
+        )
+        .limit(1)
+    )
+    return res.scalar_one_or_none() is not None
+
+
+async def claim_background_job(
+    db: AsyncSession,
+    job_id: int,
+) -> Optional[BackgroundJob]:
+    """
+    Atomically moves a queued job to running, so a job that was enqueued twice
+    (e.g. recovered on startup while still in memory) only runs once.
+    """
+    res = await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id, BackgroundJob.status == "queued")
+        .values(
+            status="running",
+            attempts=BackgroundJob.attempts + 1,
+            started_at=datetime.utcnow(),
+        )
+        .returning(BackgroundJob)
+    )
+    return res.scalar_one_or_none()
+
+
+async def finish_background_job(
+    db: AsyncSession,
+    job_id: int,
+    *,
+    status: str,
+    error: str | None = None,
+) -> None:
+    # By id: the handler may have rolled the session back, expiring the loaded job.
+    await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id)
+        .values(
+            status=status,
+            last_error=error,
+            finished_at=datetime.utcnow() if status in {"succeeded", "failed"} else None,
+        )
+    )
+
+
+async def list_recoverable_job_ids(
+    db: AsyncSession,
+    *,
+    stale_running_seconds: int,
+) -> List[int]:
+    """
+    Queued jobs plus jobs left 'running' by a process that died; the latter
+    are put back to queued first.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max(0, int(stale_running_seconds)))
+    await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.status == "running", BackgroundJob.started_at < cutoff)
+        .values(status="queued")
+    )
+    res = await db.execute(
+        select(BackgroundJob.id)
+        .where(BackgroundJob.status == "queued")
+        .order_by(BackgroundJob.id.asc())
+    )
+    return list(res.scalars().all())
+
+
+async def count_background_jobs_by_status(db: AsyncSession) -> Dict[str, int]:
+    res = await db.execute(
+        select(BackgroundJob.status, func.count(BackgroundJob.id)).group_by(BackgroundJob.status)
+    )
+    return {status: int(count) for status, count in res.all()}
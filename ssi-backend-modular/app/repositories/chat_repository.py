@@ -1,9 +1,11 @@
 # app/repositories/chat_repository.py
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import select
+from sqlalchemy import Select, select, tuple_, update
+from sqlalchemy.orm import undefer, with_expression
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import ChatSession, Message
@@ -44,8 +46,7 @@ async def create_chat_session(
         model_name=model_name,
     )
     db.add(chat)
-    await db.commit()
-    await db.refresh(chat)
+    await db.flush()
     return chat
 
 
@@ -56,31 +57,114 @@ async def update_chat_session_title(
     title: str,
 ) -> ChatSession:
     chat.title = title
-    await db.commit()
-    await db.refresh(chat)
+    await db.flush()
     return chat
 
 
+async def update_chat_session_summary(
+    db: AsyncSession,
+    chat: ChatSession,
+    *,
+    summary: str,
+    summary_message_id: int,
+    expected_summary_message_id: Optional[int],
+) -> bool:
+    """
+    Compare-and-set: writes only while the stored summary still covers
+    `expected_summary_message_id`, so a fold computed from a stale summary is
+    dropped instead of moving summary_message_id backwards. Returns whether it wrote.
+    """
+    res = await db.execute(
+        update(ChatSession)
+        .where(
+            ChatSession.id == chat.id,
+            ChatSession.summary_message_id.is_not_distinct_from(expected_summary_message_id),
+        )
+        .values(summary=summary, summary_message_id=summary_message_id)
+        .returning(ChatSession.id)
+        .execution_options(synchronize_session="fetch")
+    )
+    return res.scalar_one_or_none() is not None
+
+
 async def delete_chat_session(
     db: AsyncSession,
     chat: ChatSession,
 ) -> None:
     await db.delete(chat)
-    await db.commit()
+    await db.flush()
 
 
 # -------- messages --------
 
+def _message_select(include_evidence: bool) -> Select:
+    stmt = select(Message).options(
+        with_expression(Message.has_evidence, Message.evidence_source.is_not(None))
+    )
+    if include_evidence:
+        stmt = stmt.options(undefer(Message.evidence_source))
+    return stmt
+
+
 async def list_chat_messages(
     db: AsyncSession,
     chat_id: int,
+    *,
+    after_id: int | None = None,
+    include_evidence: bool = False,
 ) -> list[Message]:
+    stmt = _message_select(include_evidence).where(Message.chat_session_id == chat_id)
+    if after_id is not None:
+        stmt = stmt.where(Message.id > after_id)
+    res = await db.execute(stmt.order_by(Message.created_at.asc(), Message.id.asc()))
+    return list(res.scalars().all())
+
+
+async def get_message_position(
+    db: AsyncSession,
+    chat_id: int,
+    message_id: int,
+) -> Optional[tuple[datetime, int]]:
+    """(created_at, id) of a message in this chat, or None when it is not one of its messages."""
     res = await db.execute(
-        select(Message)
-        .where(Message.chat_session_id == chat_id)
-        .order_by(Message.created_at.asc())
+        select(Message.created_at).where(Message.id == message_id, Message.chat_session_id == chat_id)
     )
-    return list(res.scalars().all())
+    created_at = res.scalar_one_or_none()
+    return (created_at, message_id) if created_at is not None else None
+
+
+async def list_chat_messages_page(
+    db: AsyncSession,
+    chat_id: int,
+    *,
+    limit: int,
+    before: tuple[datetime, int] | None = None,
+    after: tuple[datetime, int] | None = None,
+    include_evidence: bool = False,
+) -> list[Message]:
+    """
+    Keyset page over (created_at, id), served by ix_messages_chat_session_created_id.
+    Cursors are positions from get_message_position. With `after` only, returns
+    the `limit` messages right after it; otherwise the newest `limit` messages
+    before `before` (or of the whole chat). Always in chronological order.
+    """
+    position = tuple_(Message.created_at, Message.id)
+    stmt = _message_select(include_evidence).where(Message.chat_session_id == chat_id)
+    if after is not None:
+        stmt = stmt.where(position > tuple_(*after))
+    if before is not None:
+        stmt = stmt.where(position < tuple_(*before))
+
+    if after is not None and before is None:
+        res = await db.execute(
+            stmt.order_by(Message.created_at.asc(), Message.id.asc()).limit(limit)
+        )
+        return list(res.scalars().all())
+
+    res = await db.execute(
+        stmt.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+    )
+    return list(reversed(res.scalars().all()))
 
 
 async def create_message(
@@ -91,6 +175,9 @@ async def create_message(
     content: str,
     model_name: str | None = None,
     evidence_source: str | None = None,
+    prompt_tokens: int | None = None,
+    cached_prompt_tokens: int | None = None,
+    completion_tokens: int | None = None,
 ) -> Message:
     msg = Message(
         chat_session_id=chat_id,
@@ -98,10 +185,12 @@ async def create_message(
         content=content,
         model_name=model_name,
         evidence_source=evidence_source,
+        prompt_tokens=prompt_tokens,
+        cached_prompt_tokens=cached_prompt_tokens,
+        completion_tokens=completion_tokens,
     )
     db.add(msg)
-    await db.commit()
-    await db.refresh(msg)
+    await db.flush()
     return msg
 
 
@@ -113,3 +202,17 @@ async def get_message_by_id(
         select(Message).where(Message.id == message_id)
     )
     return res.scalar_one_or_none()
+
+
+async def get_message_evidence_source(
+    db: AsyncSession,
+    message_id: int,
+) -> Optional[tuple[int, str | None]]:
+    """(owner user_id, evidence_source) of one message, without loading the rest of it."""
+    res = await db.execute(
+        select(ChatSession.user_id, Message.evidence_source)
+        .join(ChatSession, ChatSession.id == Message.chat_session_id)
+        .where(Message.id == message_id)
+    )
+    row = res.one_or_none()
+    return (row[0], row[1]) if row is not None else None
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, List, Mapping, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import EvidenceSnippet, Message, MessageEvidenceLink
+
+
+def snippet_content_hash(file_id: str | None, snippet: str) -> str:
+    return hashlib.sha256(f"{file_id or ''}\0{snippet}".encode("utf-8")).hexdigest()
+
+
+async def save_message_evidence(
+    db: AsyncSession,
+    *,
+    message_id: int,
+    sources: Sequence[Mapping[str, Any]],
+) -> int:
+    """
+    Stores each source's snippet once (content-addressed; existing hashes are
+    left untouched) and links it to the message with its rank, score and
+    verified_match. Two statements regardless of the number of sources.
+    """
+    snippets: Dict[str, Dict[str, Any]] = {}
+    links: List[Dict[str, Any]] = []
+    for rank, source in enumerate(sources, start=1):
+        text = str(source.get("snippet") or "")
+        file_id = source.get("file_id")
+        content_hash = snippet_content_hash(file_id, text)
+        snippets.setdefault(
+            content_hash,
+            {
+                "content_hash": content_hash,
+                "file_id": file_id,
+                "filename": source.get("filename"),
+                "snippet": text,
+            },
+        )
+        score = source.get("score")
+        links.append(
+            {
+                "message_id": message_id,
+                "rank": rank,
+                "content_hash": content_hash,
+                "score": float(score) if isinstance(score, (int, float)) else None,
+                "verified_match": bool(source.get("verified_match")),
+            }
+        )
+    if not links:
+        return 0
+
+    await db.execute(
+        pg_insert(EvidenceSnippet)
+        .values(list(snippets.values()))
+        .on_conflict_do_nothing(index_elements=[EvidenceSnippet.content_hash])
+    )
+    await db.execute(insert(MessageEvidenceLink), links)
+    return len(links)
+
+
+async def list_message_evidence_sources(
+    db: AsyncSession,
+    message_ids: Sequence[int],
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Linked sources per message id, in rank order, shaped like the legacy evidence payload."""
+    if not message_ids:
+        return {}
+    res = await db.execute(
+        select(
+            MessageEvidenceLink.message_id,
+            MessageEvidenceLink.score,
+            MessageEvidenceLink.verified_match,
+            EvidenceSnippet.file_id,
+            EvidenceSnippet.filename,
+            EvidenceSnippet.snippet,
+        )
+        .join(EvidenceSnippet, EvidenceSnippet.content_hash == MessageEvidenceLink.content_hash)
+        .where(MessageEvidenceLink.message_id.in_(list(message_ids)))
+        .order_by(MessageEvidenceLink.message_id, MessageEvidenceLink.rank)
+    )
+    by_message: Dict[int, List[Dict[str, Any]]] = {}
+    for message_id, score, verified_match, file_id, filename, snippet in res.all():
+        source: Dict[str, Any] = {
+            "file_id": file_id,
+            "filename": filename or file_id or "unknown",
+            "score": score,
+            "snippet": snippet,
+        }
+        if verified_match:
+            source["verified_match"] = True
+        by_message.setdefault(message_id, []).append(source)
+    return by_message
+
+
+async def list_messages_citing_file(
+    db: AsyncSession,
+    file_id: str,
+    *,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Newest assistant messages that cited any snippet of `file_id`."""
+    res = await db.execute(
+        select(
+            MessageEvidenceLink.message_id,
+            Message.chat_session_id,
+            Message.created_at,
+            MessageEvidenceLink.rank,
+            MessageEvidenceLink.score,
+            MessageEvidenceLink.verified_match,
+            MessageEvidenceLink.content_hash,
+        )
+        .join(EvidenceSnippet, EvidenceSnippet.content_hash == MessageEvidenceLink.content_hash)
+        .join(Message, Message.id == MessageEvidenceLink.message_id)
+        .where(EvidenceSnippet.file_id == file_id)
+        .order_by(MessageEvidenceLink.message_id.desc(), MessageEvidenceLink.rank)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in res.all()]
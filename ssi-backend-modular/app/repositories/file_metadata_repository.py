@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import OpenAIFileMetadata
+
+
+async def get_known_filenames(db: AsyncSession) -> dict[str, str]:
+    res = await db.execute(select(OpenAIFileMetadata.file_id, OpenAIFileMetadata.filename))
+    return {file_id: filename for file_id, filename in res.all()}
+
+
+async def save_file_filenames(
+    db: AsyncSession,
+    rows: Iterable[dict],
+) -> int:
+    """
+    Insert filename rows ({file_id, filename, purpose?}); existing file_ids are
+    left untouched because OpenAI filenames are immutable.
+    """
+    now = datetime.utcnow()
+    values = [
+        {
+            "file_id": str(row["file_id"]),
+            "filename": str(row["filename"]),
+            "purpose": row.get("purpose"),
+            "created_at": now,
+        }
+        for row in rows
+        if row.get("file_id") and row.get("filename")
+    ]
+    if not values:
+        return 0
+    stmt = pg_insert(OpenAIFileMetadata).values(values)
+    stmt = stmt.on_conflict_do_nothing(index_elements=[OpenAIFileMetadata.file_id])
+    await db.execute(stmt)
+    return len(values)
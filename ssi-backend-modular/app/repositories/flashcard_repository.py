@@ -1,9 +1,9 @@
 # app/repositories/flashcard_repository.py
 from __future__ import annotations
 
-from typing import Optional, List
+from typing import Any, List, Mapping, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Flashcard
@@ -55,11 +55,42 @@ async def create_flashcard(
         is_active=True,
     )
     db.add(card)
-    await db.commit()
-    await db.refresh(card)
+    await db.flush()
     return card
 
 
+async def create_flashcards_bulk(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    cards: Sequence[Mapping[str, Any]],
+) -> List[Flashcard]:
+    """
+    Inserts all cards with one multi-row INSERT ... RETURNING (batched by the
+    driver for very large decks) instead of one INSERT per card. Each mapping
+    needs question/answer and may carry chat_session_id/source_message_id.
+    Returned cards keep the input order.
+    """
+    if not cards:
+        return []
+    rows = [
+        {
+            "user_id": user_id,
+            "chat_session_id": card.get("chat_session_id"),
+            "source_message_id": card.get("source_message_id"),
+            "question": card["question"],
+            "answer": card["answer"],
+            "is_active": True,
+        }
+        for card in cards
+    ]
+    res = await db.execute(
+        insert(Flashcard).returning(Flashcard, sort_by_parameter_order=True),
+        rows,
+    )
+    return list(res.scalars().all())
+
+
 async def update_flashcard_content(
     db: AsyncSession,
     flashcard: Flashcard,
@@ -72,8 +103,7 @@ async def update_flashcard_content(
     if answer is not None:
         flashcard.answer = answer
 
-    await db.commit()
-    await db.refresh(flashcard)
+    await db.flush()
     return flashcard
 
 
@@ -83,8 +113,7 @@ async def set_flashcard_active_state(
     is_active: bool,
 ) -> Flashcard:
     flashcard.is_active = is_active
-    await db.commit()
-    await db.refresh(flashcard)
+    await db.flush()
     return flashcard
 
 
@@ -93,4 +122,4 @@ async def delete_flashcard(
     flashcard: Flashcard,
 ) -> None:
     await db.delete(flashcard)
-    await db.commit()
+    await db.flush()
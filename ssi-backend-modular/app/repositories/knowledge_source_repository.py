@@ -4,9 +4,10 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import KnowledgeSource, KnowledgeSourceAudit
+from app.models import KnowledgeSource, KnowledgeSourceAudit, KnowledgeSourcePolicyVersion
 
 
 async def list_knowledge_sources(db: AsyncSession) -> list[KnowledgeSource]:
@@ -32,6 +33,8 @@ async def create_knowledge_source(
     source_ref: str,
     enabled: bool = True,
     verified: bool = False,
+    index_status: str | None = None,
+    index_error: str | None = None,
 ) -> KnowledgeSource:
     now = datetime.utcnow()
     source = KnowledgeSource(
@@ -40,12 +43,13 @@ async def create_knowledge_source(
         source_ref=source_ref.strip(),
         enabled=enabled,
         verified=verified,
+        index_status=index_status,
+        index_error=index_error,
         created_at=now,
         updated_at=now,
     )
     db.add(source)
-    await db.commit()
-    await db.refresh(source)
+    await db.flush()
     return source
 
 
@@ -58,6 +62,9 @@ async def update_knowledge_source(
     source_ref: str | None = None,
     enabled: bool | None = None,
     verified: bool | None = None,
+    index_status: str | None = None,
+    index_error: str | None = None,
+    clear_index_error: bool = False,
 ) -> KnowledgeSource:
     if title is not None:
         source.title = title.strip()
@@ -69,10 +76,13 @@ async def update_knowledge_source(
         source.enabled = enabled
     if verified is not None:
         source.verified = verified
+    if index_status is not None:
+        source.index_status = index_status
+    if index_error is not None or clear_index_error:
+        source.index_error = index_error
     source.updated_at = datetime.utcnow()
     db.add(source)
-    await db.commit()
-    await db.refresh(source)
+    await db.flush()
     return source
 
 
@@ -81,7 +91,7 @@ async def delete_knowledge_source(
     source: KnowledgeSource,
 ) -> None:
     await db.delete(source)
-    await db.commit()
+    await db.flush()
 
 
 async def create_knowledge_source_audit(
@@ -97,8 +107,7 @@ async def create_knowledge_source_audit(
         source_id=source_id,
     )
     db.add(row)
-    await db.commit()
-    await db.refresh(row)
+    await db.flush()
     return row
 
 
@@ -115,3 +124,30 @@ async def get_knowledge_source_counts(db: AsyncSession) -> dict[str, int]:
         "enabled": int(enabled or 0),
         "verified": int(verified or 0),
     }
+
+
+_POLICY_VERSION_ROW_ID = 1
+
+
+async def get_knowledge_source_policy_version(db: AsyncSession) -> int:
+    res = await db.execute(
+        select(KnowledgeSourcePolicyVersion.version).where(
+            KnowledgeSourcePolicyVersion.id == _POLICY_VERSION_ROW_ID
+        )
+    )
+    return int(res.scalar_one_or_none() or 0)
+
+
+async def bump_knowledge_source_policy_version(db: AsyncSession) -> int:
+    now = datetime.utcnow()
+    stmt = pg_insert(KnowledgeSourcePolicyVersion).values(
+        id=_POLICY_VERSION_ROW_ID,
+        version=1,
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KnowledgeSourcePolicyVersion.id],
+        set_={"version": KnowledgeSourcePolicyVersion.version + 1, "updated_at": now},
+    ).returning(KnowledgeSourcePolicyVersion.version)
+    res = await db.execute(stmt)
+    return int(res.scalar_one())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import LLMResponseCacheEntry
+
+
+async def get_cached_llm_response(
+    db: AsyncSession,
+    cache_key: str,
+) -> Optional[str]:
+    res = await db.execute(
+        select(LLMResponseCacheEntry.payload).where(
+            LLMResponseCacheEntry.cache_key == cache_key,
+            LLMResponseCacheEntry.expires_at > datetime.utcnow(),
+        )
+    )
+    return res.scalar_one_or_none()
+
+
+async def upsert_cached_llm_response(
+    db: AsyncSession,
+    *,
+    cache_key: str,
+    kind: str,
+    model_name: str | None,
+    payload: str,
+    ttl_seconds: int,
+) -> None:
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=max(1, int(ttl_seconds)))
+    stmt = pg_insert(LLMResponseCacheEntry).values(
+        cache_key=cache_key,
+        kind=kind,
+        model_name=model_name,
+        payload=payload,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LLMResponseCacheEntry.cache_key],
+        set_={"payload": payload, "created_at": now, "expires_at": expires_at},
+    )
+    await db.execute(stmt)
+
+
+async def delete_expired_llm_responses(db: AsyncSession) -> int:
+    res = await db.execute(
+        delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.expires_at <= datetime.utcnow())
+    )
+    return int(res.rowcount or 0)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Optional, List
 
-from sqlalchemy import select, func, case
+from sqlalchemy import Numeric, case, cast, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Quiz, QuizQuestion, Flashcard
@@ -86,8 +86,7 @@ async def create_quiz_with_questions(
         db.add(q)
         questions.append(q)
 
-    await db.commit()
-    await db.refresh(quiz)
+    await db.flush()
     return quiz
 
 
@@ -120,8 +119,7 @@ async def save_question_answer(
 ) -> QuizQuestion:
     question.user_answer = user_answer
     question.is_correct = (user_answer.strip() == question.correct_answer.strip())
-    await db.commit()
-    await db.refresh(question)
+    await db.flush()
     return question
 
 
@@ -129,25 +127,32 @@ async def recompute_quiz_score(
     db: AsyncSession,
     quiz: Quiz,
 ) -> Quiz:
+    """
+    One UPDATE ... RETURNING: the totals are aggregated inside the statement and
+    the returned row refreshes `quiz` in the identity map.
+    """
+    total = (
+        select(func.count(QuizQuestion.id))
+        .where(QuizQuestion.quiz_id == quiz.id)
+        .scalar_subquery()
+    )
+    correct = (
+        select(func.count(QuizQuestion.id))
+        .where(QuizQuestion.quiz_id == quiz.id, QuizQuestion.is_correct.is_(True))
+        .scalar_subquery()
+    )
     res = await db.execute(
-        select(
-            func.count(QuizQuestion.id),
-            func.sum(
-                case(
-                    (QuizQuestion.is_correct.is_(True), 1),
-                    else_=0,
-                )
+        update(Quiz)
+        .where(Quiz.id == quiz.id)
+        .values(
+            total_questions=total,
+            correct_answers=correct,
+            score_percent=case(
+                (total > 0, cast(correct, Numeric) * 100 / total),
+                else_=0,
             ),
-        ).where(QuizQuestion.quiz_id == quiz.id)
+        )
+        .returning(Quiz)
+        .execution_options(synchronize_session=False, populate_existing=True)
     )
-    total, correct = res.one()
-    total = total or 0
-    correct = correct or 0
-
-    quiz.total_questions = total
-    quiz.correct_answers = correct
-    quiz.score_percent = float(correct) / total * 100 if total > 0 else 0.0
-
-    await db.commit()
-    await db.refresh(quiz)
-    return quiz
+    return res.scalar_one()
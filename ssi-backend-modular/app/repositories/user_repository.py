@@ -31,6 +31,5 @@ async def create_user(
 ) -> User:
     user = User(email=email, name=name, password_hash=password_hash)
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
     return user
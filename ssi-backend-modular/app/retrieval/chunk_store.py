@@ -0,0 +1,187 @@
+# app/retrieval/chunk_store.py
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Generic, List, Optional, Protocol, Sequence, Tuple, TypeVar
+
+from app.core.source_policy import SourceFilterPolicy
+from app.retrieval.chunking import Chunk
+
+# On-disk layout shared by the local indexes: a chunk table plus engine-specific
+# files, published as one directory so readers never see a half-written index.
+MANIFEST_FILE = "manifest.json"
+CHUNKS_FILE = "chunks.jsonl"
+CHUNK_OFFSETS_FILE = "chunk_offsets.bin"
+CHUNK_FILES_FILE = "chunk_files.bin"
+FILES_FILE = "files.json"
+
+
+class IndexFormatError(RuntimeError):
+    pass
+
+
+def write_array(path: Path, typecode: str, values: Sequence[int] | array) -> None:
+    data = values if isinstance(values, array) else array(typecode, values)
+    with path.open("wb") as fh:
+        data.tofile(fh)
+
+
+def write_chunk_table(directory: Path, chunks: Sequence[Chunk]) -> None:
+    files: List[Tuple[str, str]] = []
+    file_index: Dict[str, int] = {}
+    offsets = array("Q")
+    chunk_files = array("I")
+    with (directory / CHUNKS_FILE).open("wb") as fh:
+        for chunk in chunks:
+            if chunk.file_id not in file_index:
+                file_index[chunk.file_id] = len(files)
+                files.append((chunk.file_id, chunk.filename))
+            offsets.append(fh.tell())
+            chunk_files.append(file_index[chunk.file_id])
+            fh.write(json.dumps({"t": chunk.text}, ensure_ascii=False).encode("utf-8") + b"\n")
+        offsets.append(fh.tell())
+    write_array(directory / CHUNK_OFFSETS_FILE, "Q", offsets)
+    write_array(directory / CHUNK_FILES_FILE, "I", chunk_files)
+    (directory / FILES_FILE).write_text(json.dumps(files, ensure_ascii=False), encoding="utf-8")
+
+
+def write_manifest(directory: Path, *, kind: str, chunk_count: int, **extra: Any) -> None:
+    manifest = {
+        "kind": kind,
+        "format": 1,
+        "byteorder": sys.byteorder,
+        "chunk_count": int(chunk_count),
+        "built_at": int(time.time()),
+        **extra,
+    }
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def staging_directory(target: Path) -> Path:
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    return staging
+
+
+def publish_directory(staging: Path, target: Path) -> None:
+    """Swap a fully written staging directory into place; open readers keep their maps."""
+    retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def read_manifest(directory: Path, *, kind: str) -> Dict[str, Any]:
+    manifest = json.loads((directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+    if manifest.get("kind") != kind or manifest.get("format") != 1:
+        raise IndexFormatError(f"{directory} is not a {kind} index (format 1)")
+    if manifest.get("byteorder") != sys.byteorder:
+        raise IndexFormatError(f"{directory} was built on a {manifest.get('byteorder')}-endian host; rebuild it")
+    return manifest
+
+
+class MappedArray:
+    """A read-only typed view over a memory-mapped file; pages load on first touch."""
+
+    def __init__(self, path: Path, typecode: str) -> None:
+        self._map: Optional[mmap.mmap] = None
+        with path.open("rb") as fh:
+            if os.fstat(fh.fileno()).st_size:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._map if self._map is not None else b"").cast(typecode)
+
+    def close(self) -> None:
+        self.view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class ChunkTable:
+    def __init__(self, directory: Path) -> None:
+        self.files: List[Tuple[str, str]] = [
+            (str(file_id), str(filename))
+            for file_id, filename in json.loads((directory / FILES_FILE).read_text(encoding="utf-8"))
+        ]
+        self._offsets = MappedArray(directory / CHUNK_OFFSETS_FILE, "Q")
+        self._chunk_files = MappedArray(directory / CHUNK_FILES_FILE, "I")
+        self._text_fh = (directory / CHUNKS_FILE).open("rb")
+        self._text_map: Optional[mmap.mmap] = None
+        if os.fstat(self._text_fh.fileno()).st_size:
+            self._text_map = mmap.mmap(self._text_fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._allowed: Tuple[Optional[SourceFilterPolicy], FrozenSet[int]] = (None, frozenset())
+
+    def __len__(self) -> int:
+        return len(self._chunk_files.view)
+
+    def file_index(self, chunk_id: int) -> int:
+        return self._chunk_files.view[chunk_id]
+
+    def chunk(self, chunk_id: int) -> Chunk:
+        file_id, filename = self.files[self._chunk_files.view[chunk_id]]
+        start, end = self._offsets.view[chunk_id], self._offsets.view[chunk_id + 1]
+        raw = self._text_map[start:end] if self._text_map is not None else b"{}"
+        return Chunk(file_id=file_id, filename=filename, text=json.loads(raw).get("t", ""))
+
+    def allowed_files(self, policy: Optional[SourceFilterPolicy]) -> Optional[FrozenSet[int]]:
+        """File indexes the policy lets through, or None when nothing is filtered."""
+        if policy is None or not policy.has_registry_rows:
+            return None
+        cached_policy, cached = self._allowed
+        if cached_policy is not policy:
+            cached = frozenset(
+                idx for idx, (file_id, filename) in enumerate(self.files) if policy.allows(file_id, filename)
+            )
+            self._allowed = (policy, cached)
+        return cached
+
+    def close(self) -> None:
+        self._offsets.close()
+        self._chunk_files.close()
+        if self._text_map is not None:
+            self._text_map.close()
+            self._text_map = None
+        self._text_fh.close()
+
+
+class _ClosableIndex(Protocol):
+    def close(self) -> None: ...
+
+
+IndexT = TypeVar("IndexT", bound=_ClosableIndex)
+
+
+class IndexCache(Generic[IndexT]):
+    """
+    One open index per directory, reopened when its manifest changes: a rebuild
+    is picked up on the next lookup and the previous maps are released.
+    """
+
+    def __init__(self, opener: Callable[[Path], IndexT]) -> None:
+        self._opener = opener
+        self._open: Dict[str, Tuple[int, IndexT]] = {}
+
+    def get(self, directory: str | Path) -> Optional[IndexT]:
+        path = Path(directory)
+        try:
+            stamp = (path / MANIFEST_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        key = str(path.resolve())
+        cached = self._open.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        index = self._opener(path)
+        self._open[key] = (stamp, index)
+        if cached is not None:
+            cached[1].close()
+        return index
@@ -0,0 +1,114 @@
+# app/retrieval/chunking.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List
+
+# Chunks are sized like the snippets select_vector_store_context puts in the prompt.
+DEFAULT_CHUNK_CHARS = 1200
+DEFAULT_CHUNK_OVERLAP = 150
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can could did do does for from had has have how i if
+    in into is it its me my no not of on or our should so than that the their them then there
+    these they this those to was we were what when where which who why will with would you your
+    """.split()
+)
+
+
+@dataclass(frozen=True)
+class SourceDocument:
+    file_id: str
+    filename: str
+    text: str
+
+
+@dataclass(frozen=True)
+class Chunk:
+    file_id: str
+    filename: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased alphanumeric terms without stopwords. A trailing plural "s" is
+    dropped ("infections" -> "infection", "ssis" -> "ssi") so queries and
+    guideline text meet on the same term.
+    """
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+def _split_long_paragraph(paragraph: str, max_chars: int, overlap: int) -> Iterator[str]:
+    start = 0
+    while start < len(paragraph):
+        end = min(len(paragraph), start + max_chars)
+        if end < len(paragraph):
+            # Break on whitespace so terms are not cut in half.
+            space = paragraph.rfind(" ", start + max_chars // 2, end)
+            if space > start:
+                end = space
+        yield paragraph[start:end].strip()
+        if end >= len(paragraph):
+            break
+        start = max(end - overlap, start + 1)
+        space = paragraph.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+
+
+def chunk_text(
+    text: str,
+    *,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> List[str]:
+    """
+    Packs whole paragraphs into chunks of at most `max_chars`; only paragraphs
+    longer than that are split, with `overlap` characters carried over.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for raw in _PARAGRAPH_SPLIT_RE.split(text or ""):
+        paragraph = " ".join(raw.split())
+        if not paragraph:
+            continue
+        if len(paragraph) > max_chars:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_len = [], 0
+            chunks.extend(part for part in _split_long_paragraph(paragraph, max_chars, overlap) if part)
+            continue
+        if current and current_len + 2 + len(paragraph) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+        current.append(paragraph)
+        current_len += len(paragraph) + (2 if current_len else 0)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def chunk_documents(
+    documents: Iterable[SourceDocument],
+    *,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> List[Chunk]:
+    return [
+        Chunk(file_id=doc.file_id, filename=doc.filename, text=text)
+        for doc in documents
+        for text in chunk_text(doc.text, max_chars=max_chars, overlap=overlap)
+    ]
@@ -0,0 +1,257 @@
+# app/retrieval/dense_index.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only the dense index needs numpy.
+    np = None
+
+from app.core.source_policy import SourceFilterPolicy
+from app.retrieval.chunk_store import (
+    CHUNK_FILES_FILE,
+    ChunkTable,
+    IndexCache,
+    publish_directory,
+    read_manifest,
+    staging_directory,
+    write_chunk_table,
+    write_manifest,
+)
+from app.retrieval.chunking import Chunk
+
+INDEX_KIND = "dense"
+EMBEDDINGS_FILE = "embeddings.npy"
+SCALES_FILE = "scales.npy"
+CENTROIDS_FILE = "ivf_centroids.npy"
+LIST_OFFSETS_FILE = "ivf_offsets.npy"
+LIST_CHUNKS_FILE = "ivf_chunks.npy"
+
+STORAGE_DTYPES = ("float32", "int8")
+# Below this many chunks a full scan is cheaper than probing inverted lists.
+IVF_MIN_CHUNKS = 4096
+
+
+@dataclass(frozen=True)
+class DenseHit:
+    chunk_id: int
+    # Cosine similarity (vectors are L2-normalized at build time).
+    score: float
+    file_id: str
+    filename: str
+    text: str
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The dense index needs numpy; install it to use RETRIEVAL_MODE=dense_local")
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_int8(matrix: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Symmetric per-row int8 quantization: row ~= codes * scale (4x smaller than float32)."""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def train_ivf(
+    matrix: "np.ndarray",
+    n_lists: int,
+    *,
+    iterations: int = 12,
+    seed: int = 0,
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """Spherical k-means over the normalized rows; returns (centroids, list assignment per row)."""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), size=n_lists, replace=False)].copy()
+    assignments = np.zeros(len(matrix), dtype=np.int64)
+    for _ in range(max(1, iterations)):
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        for list_id in range(n_lists):
+            members = matrix[assignments == list_id]
+            if len(members):
+                centroids[list_id] = members.sum(axis=0)
+            else:
+                # Re-seed empty lists so every list stays useful.
+                centroids[list_id] = matrix[rng.integers(len(matrix))]
+        centroids = _normalize_rows(centroids)
+    return centroids.astype(np.float32), assignments
+
+
+def build_dense_index(
+    chunks: Sequence[Chunk],
+    vectors: Sequence[Sequence[float]] | "np.ndarray",
+    directory: str | Path,
+    *,
+    embedder: Dict[str, Any],
+    dtype: str = "float32",
+    n_lists: Optional[int] = None,
+    **manifest_extra: Any,
+) -> int:
+    """
+    Writes the chunk embeddings as a row-normalized matrix (float32, or int8 codes
+    plus per-row scales) with the chunk table, and swaps it into `directory`.
+    `n_lists` > 0 adds an IVF layer (k-means centroids plus chunk ids grouped by
+    list); None picks sqrt(chunks) for corpora of IVF_MIN_CHUNKS or more.
+    `embedder` ({"name", "dimensions", ...}) is recorded so queries are embedded
+    the same way. Returns the chunk count.
+    """
+    _require_numpy()
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"dtype must be one of {STORAGE_DTYPES}")
+    if not chunks:
+        raise ValueError("no chunks to index")
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or len(matrix) != len(chunks):
+        raise ValueError("vectors must be a (chunks, dimensions) matrix")
+    matrix = _normalize_rows(matrix)
+
+    if n_lists is None:
+        n_lists = int(np.sqrt(len(matrix))) if len(matrix) >= IVF_MIN_CHUNKS else 0
+    n_lists = min(int(n_lists), len(matrix))
+
+    target = Path(directory)
+    staging = staging_directory(target)
+    write_chunk_table(staging, chunks)
+    if dtype == "int8":
+        codes, scales = quantize_int8(matrix)
+        np.save(staging / EMBEDDINGS_FILE, codes)
+        np.save(staging / SCALES_FILE, scales)
+    else:
+        np.save(staging / EMBEDDINGS_FILE, matrix)
+
+    if n_lists > 0:
+        centroids, assignments = train_ivf(matrix, n_lists)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=offsets[1:])
+        np.save(staging / CENTROIDS_FILE, centroids)
+        np.save(staging / LIST_OFFSETS_FILE, offsets)
+        np.save(staging / LIST_CHUNKS_FILE, order.astype(np.uint32))
+
+    write_manifest(
+        staging,
+        kind=INDEX_KIND,
+        chunk_count=len(chunks),
+        dimensions=int(matrix.shape[1]),
+        dtype=dtype,
+        ivf_lists=n_lists,
+        embedder=embedder,
+        **manifest_extra,
+    )
+    publish_directory(staging, target)
+    return len(chunks)
+
+
+class DenseIndex:
+    def __init__(self, directory: str | Path) -> None:
+        _require_numpy()
+        self.directory = Path(directory)
+        self.manifest = read_manifest(self.directory, kind=INDEX_KIND)
+        self.chunk_count = int(self.manifest["chunk_count"])
+        self.dimensions = int(self.manifest["dimensions"])
+        self.embedder: Dict[str, Any] = dict(self.manifest.get("embedder") or {})
+        self.ivf_lists = int(self.manifest.get("ivf_lists") or 0)
+        # Memory-mapped: pages are read on first touch and shared between workers.
+        self._embeddings = np.load(self.directory / EMBEDDINGS_FILE, mmap_mode="r")
+        self._scales = (
+            np.load(self.directory / SCALES_FILE, mmap_mode="r") if self.manifest.get("dtype") == "int8" else None
+        )
+        self._chunk_files = np.memmap(self.directory / CHUNK_FILES_FILE, dtype=np.uint32, mode="r")
+        self._list_chunks = None
+        if self.ivf_lists:
+            self._centroids = np.load(self.directory / CENTROIDS_FILE)
+            self._list_offsets = np.load(self.directory / LIST_OFFSETS_FILE)
+            self._list_chunks = np.load(self.directory / LIST_CHUNKS_FILE, mmap_mode="r")
+        self.chunks = ChunkTable(self.directory)
+
+    def _score(self, candidates: Optional["np.ndarray"], query: "np.ndarray") -> "np.ndarray":
+        rows = self._embeddings if candidates is None else self._embeddings[candidates]
+        if self._scales is None:
+            return rows @ query
+        scales = self._scales if candidates is None else self._scales[candidates]
+        return (rows.astype(np.float32) @ query) * scales
+
+    def search(
+        self,
+        query_vector: Sequence[float] | "np.ndarray",
+        *,
+        limit: int = 6,
+        nprobe: int = 8,
+        exact: bool = False,
+        source_filter_policy: Optional[SourceFilterPolicy] = None,
+    ) -> List[DenseHit]:
+        """
+        Top-`limit` chunks by cosine similarity. With an IVF layer only the
+        `nprobe` closest lists are scanned; `exact` (or nprobe >= lists) scans all.
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"query has {query.shape[-1]} dimensions, index has {self.dimensions}")
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        query = query / norm
+
+        candidates: Optional[np.ndarray] = None
+        nprobe = max(1, int(nprobe))
+        if self.ivf_lists and not exact and nprobe < self.ivf_lists:
+            probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate(
+                [self._list_chunks[self._list_offsets[i] : self._list_offsets[i + 1]] for i in probe]
+            ).astype(np.int64)
+
+        allowed = self.chunks.allowed_files(source_filter_policy)
+        if allowed is not None:
+            if candidates is None:
+                candidates = np.arange(self.chunk_count)
+            allowed_ids = np.fromiter(allowed, dtype=np.uint32, count=len(allowed))
+            candidates = candidates[np.isin(self._chunk_files[candidates], allowed_ids)]
+
+        if candidates is not None and not len(candidates):
+            return []
+        scores = self._score(candidates, query)
+        k = min(max(1, int(limit)), len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits: List[DenseHit] = []
+        for position in top:
+            chunk_id = int(position if candidates is None else candidates[position])
+            chunk = self.chunks.chunk(chunk_id)
+            hits.append(
+                DenseHit(
+                    chunk_id=chunk_id,
+                    score=float(scores[position]),
+                    file_id=chunk.file_id,
+                    filename=chunk.filename,
+                    text=chunk.text,
+                )
+            )
+        return hits
+
+    def close(self) -> None:
+        # numpy releases a memmap once nothing references it.
+        self._embeddings = None
+        self._scales = None
+        self._chunk_files = None
+        self._list_chunks = None
+        self.chunks.close()
+
+
+_open_indexes: IndexCache[DenseIndex] = IndexCache(DenseIndex)
+
+
+def load_dense_index(directory: str | Path) -> Optional[DenseIndex]:
+    """The index at `directory` (reopened after a rebuild), or None when none has been built."""
+    return _open_indexes.get(directory)
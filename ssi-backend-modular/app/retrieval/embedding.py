@@ -0,0 +1,42 @@
+# app/retrieval/embedding.py
+from __future__ import annotations
+
+import math
+import zlib
+from typing import List, Sequence
+
+from app.retrieval.chunking import tokenize
+
+HASHING_EMBEDDER = "hashing"
+OPENAI_EMBEDDER = "openai"
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedding stand-in: signed feature hashing of terms and
+    term bigrams, L2-normalized. No model and no network, so the dense index can
+    be built, searched and benchmarked anywhere; the vectors only capture lexical
+    overlap, not meaning.
+    """
+
+    name = HASHING_EMBEDDER
+
+    def __init__(self, dimensions: int = 512) -> None:
+        self.dimensions = max(8, int(dimensions))
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        terms = tokenize(text)
+        features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+        for feature in features:
+            # crc32 is stable across processes, unlike hash().
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimensions] += sign
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+        return vector
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
@@ -0,0 +1,36 @@
+# app/retrieval/fusion.py
+from __future__ import annotations
+
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# The constant from the original RRF paper; it damps the weight of the very top ranks
+# so one engine's first hit cannot outvote agreement between engines.
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[T]],
+    *,
+    key: Callable[[T], Hashable],
+    k: int = DEFAULT_RRF_K,
+    limit: int | None = None,
+) -> List[Tuple[T, float]]:
+    """
+    Merges ranked lists by summing 1 / (k + rank) per item (rank starts at 1).
+    Items with the same `key` are one item; the first occurrence is kept. Only
+    ranks are used, so engines with incomparable scores fuse cleanly.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked, start=1):
+            item_key = key(item)
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(item_key, item)
+    # Python's sort is stable: ties keep first-seen order (the earlier list wins).
+    fused = sorted(scores, key=lambda item_key: scores[item_key], reverse=True)
+    if limit is not None:
+        fused = fused[: max(0, int(limit))]
+    return [(items[item_key], scores[item_key]) for item_key in fused]
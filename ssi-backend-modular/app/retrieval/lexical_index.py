@@ -0,0 +1,172 @@
+# app/retrieval/lexical_index.py
+from __future__ import annotations
+
+import heapq
+import json
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.source_policy import SourceFilterPolicy
+from app.retrieval.chunk_store import (
+    ChunkTable,
+    IndexCache,
+    MappedArray,
+    publish_directory,
+    read_manifest,
+    staging_directory,
+    write_array,
+    write_chunk_table,
+    write_manifest,
+)
+from app.retrieval.chunking import Chunk, tokenize
+
+INDEX_KIND = "bm25"
+LEXICON_FILE = "lexicon.json"
+POSTINGS_FILE = "postings.bin"
+LENGTHS_FILE = "lengths.bin"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass(frozen=True)
+class LexicalHit:
+    chunk_id: int
+    score: float
+    # Share of the query's IDF mass this chunk matched (0..1): the confidence signal.
+    coverage: float
+    file_id: str
+    filename: str
+    text: str
+
+
+def _idf(chunk_count: int, df: int) -> float:
+    return math.log(1.0 + (chunk_count - df + 0.5) / (df + 0.5))
+
+
+def build_lexical_index(chunks: Sequence[Chunk], directory: str | Path, **manifest_extra: object) -> int:
+    """
+    Writes a BM25 inverted index for `chunks` and swaps it into `directory`.
+    Postings are (chunk_id, term_frequency) uint32 pairs grouped by term, so a
+    query touches only the postings of its own terms. Returns the chunk count.
+    """
+    target = Path(directory)
+    staging = staging_directory(target)
+
+    term_postings: Dict[str, List[Tuple[int, int]]] = {}
+    lengths = array("I")
+    for chunk_id, chunk in enumerate(chunks):
+        terms = tokenize(chunk.text)
+        lengths.append(len(terms))
+        for term, tf in Counter(terms).items():
+            term_postings.setdefault(term, []).append((chunk_id, tf))
+
+    lexicon: Dict[str, Tuple[int, int]] = {}
+    postings = array("I")
+    for term in sorted(term_postings):
+        entries = term_postings[term]
+        lexicon[term] = (len(entries), len(postings) // 2)
+        for chunk_id, tf in entries:
+            postings.append(chunk_id)
+            postings.append(tf)
+
+    write_chunk_table(staging, chunks)
+    write_array(staging / POSTINGS_FILE, "I", postings)
+    write_array(staging / LENGTHS_FILE, "I", lengths)
+    (staging / LEXICON_FILE).write_text(json.dumps(lexicon, separators=(",", ":")), encoding="utf-8")
+    write_manifest(
+        staging,
+        kind=INDEX_KIND,
+        chunk_count=len(chunks),
+        term_count=len(lexicon),
+        avg_chunk_length=(sum(lengths) / len(lengths)) if lengths else 0.0,
+        k1=BM25_K1,
+        b=BM25_B,
+        **manifest_extra,
+    )
+    publish_directory(staging, target)
+    return len(chunks)
+
+
+class LexicalIndex:
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.manifest = read_manifest(self.directory, kind=INDEX_KIND)
+        self.chunk_count = int(self.manifest["chunk_count"])
+        self._avg_length = float(self.manifest.get("avg_chunk_length") or 0.0) or 1.0
+        self._k1 = float(self.manifest.get("k1", BM25_K1))
+        self._b = float(self.manifest.get("b", BM25_B))
+        self._lexicon: Dict[str, List[int]] = json.loads((self.directory / LEXICON_FILE).read_text(encoding="utf-8"))
+        self._postings = MappedArray(self.directory / POSTINGS_FILE, "I")
+        self._lengths = MappedArray(self.directory / LENGTHS_FILE, "I")
+        self.chunks = ChunkTable(self.directory)
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 6,
+        source_filter_policy: Optional[SourceFilterPolicy] = None,
+    ) -> List[LexicalHit]:
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or not self.chunk_count:
+            return []
+
+        # Terms the corpus never uses still count toward the query's IDF mass, so
+        # an off-topic question cannot reach full coverage.
+        total_idf = 0.0
+        scores: Dict[int, float] = {}
+        matched_idf: Dict[int, float] = {}
+        postings = self._postings.view
+        lengths = self._lengths.view
+        k1, b, avg_length = self._k1, self._b, self._avg_length
+        for term in query_terms:
+            entry = self._lexicon.get(term)
+            df = entry[0] if entry else 0
+            idf = _idf(self.chunk_count, df)
+            total_idf += idf
+            if not entry:
+                continue
+            start = entry[1] * 2
+            for pos in range(start, start + df * 2, 2):
+                chunk_id = postings[pos]
+                tf = postings[pos + 1]
+                norm = k1 * (1.0 - b + b * lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+                matched_idf[chunk_id] = matched_idf.get(chunk_id, 0.0) + idf
+
+        allowed = self.chunks.allowed_files(source_filter_policy)
+        if allowed is not None:
+            scores = {cid: s for cid, s in scores.items() if self.chunks.file_index(cid) in allowed}
+
+        hits: List[LexicalHit] = []
+        for chunk_id, score in heapq.nlargest(max(1, int(limit)), scores.items(), key=lambda item: item[1]):
+            chunk = self.chunks.chunk(chunk_id)
+            hits.append(
+                LexicalHit(
+                    chunk_id=chunk_id,
+                    score=score,
+                    coverage=matched_idf[chunk_id] / total_idf if total_idf else 0.0,
+                    file_id=chunk.file_id,
+                    filename=chunk.filename,
+                    text=chunk.text,
+                )
+            )
+        return hits
+
+    def close(self) -> None:
+        self._postings.close()
+        self._lengths.close()
+        self.chunks.close()
+
+
+_open_indexes: IndexCache[LexicalIndex] = IndexCache(LexicalIndex)
+
+
+def load_lexical_index(directory: str | Path) -> Optional[LexicalIndex]:
+    """The index at `directory` (reopened after a rebuild), or None when none has been built."""
+    return _open_indexes.get(directory)
@@ -12,10 +12,13 @@ from .chat_schema import (
     ChatSessionOut,
     MessageCreate,
     MessageOut,
+    MessageEvidenceOut,
     SendMessageOut,
+    SendMessageStreamFinal,
 )
 from .flashcard_schema import (
     FlashcardCreate,
+    FlashcardBulkCreate,
     FlashcardOut,
     AssistantReplyWithFlashcards,
     FlashcardCandidate,
@@ -39,6 +42,7 @@ from .knowledge_source_schema import (
     KnowledgeSourceUpdate,
     KnowledgeSourceOut,
     KnowledgeSourceReindexOut,
+    KnowledgeSourceCitationOut,
 )
 
 __all__ = [
@@ -53,9 +57,12 @@ __all__ = [
     "ChatSessionOut",
     "MessageCreate",
     "MessageOut",
+    "MessageEvidenceOut",
     "SendMessageOut",
+    "SendMessageStreamFinal",
     # flashcards
     "FlashcardCreate",
+    "FlashcardBulkCreate",
     "FlashcardOut",
     # quiz
     "QuizCreate",
@@ -74,4 +81,5 @@ __all__ = [
     "KnowledgeSourceUpdate",
     "KnowledgeSourceOut",
     "KnowledgeSourceReindexOut",
+    "KnowledgeSourceCitationOut",
 ]
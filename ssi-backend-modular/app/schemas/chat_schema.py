@@ -4,6 +4,8 @@ from typing import Optional, List
 
 from pydantic import BaseModel
 
+from .flashcard_schema import FlashcardCandidate
+
 
 # ============ CHAT SESSIONS ============
 
@@ -39,14 +41,33 @@ class MessageOut(BaseModel):
     sender_role: str
     content: str
     model_name: Optional[str] = None
+    # Only present when requested (include_evidence) or on a freshly sent message;
+    # otherwise fetch it from GET /users/{user_id}/messages/{id}/evidence.
     evidence_source: Optional[str] = None
+    has_evidence: Optional[bool] = None
+    prompt_tokens: Optional[int] = None
+    cached_prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class MessageEvidenceOut(BaseModel):
+    message_id: int
+    evidence: Optional[dict] = None
+
+
 class SendMessageOut(BaseModel):
     user_message: MessageOut
     assistant_message: MessageOut
 
-    
+
+class SendMessageStreamFinal(SendMessageOut):
+    """Payload of the final event on the streaming send-message endpoint."""
+    chat_title: Optional[str] = None
+    # The reply's card candidates. They are saved by a background job, so the stored
+    # flashcards (with ids) appear a little later; flashcards_pending says one is queued.
+    flashcards: List[FlashcardCandidate] = []
+    flashcards_pending: bool = False
+    evidence: Optional[dict] = None
@@ -14,6 +14,18 @@ class FlashcardCreate(BaseModel):
     source_message_id: Optional[int] = None
 
 
+FLASHCARD_BULK_MAX_CARDS = 1000
+
+
+class FlashcardBulkCreate(BaseModel):
+    flashcards: List[FlashcardCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=FLASHCARD_BULK_MAX_CARDS,
+        description="Deck to import; all cards are saved in one transaction.",
+    )
+
+
 class FlashcardOut(BaseModel):
     id: int
     question: str
@@ -40,6 +40,8 @@ class KnowledgeSourceOut(BaseModel):
     source_ref: str
     enabled: bool
     verified: bool
+    index_status: Optional[str] = None
+    index_error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -52,3 +54,14 @@ class KnowledgeSourceReindexOut(BaseModel):
     verified_sources: int
     strict_verified_only: bool
     applied_immediately: bool = True
+
+
+class KnowledgeSourceCitationOut(BaseModel):
+    """One assistant message that cited a snippet of the file."""
+    message_id: int
+    chat_session_id: int
+    created_at: datetime
+    rank: int
+    score: Optional[float] = None
+    verified_match: bool
+    content_hash: str
@@ -20,7 +20,7 @@ from app.repositories.analytics_repository import (
     get_flashcard_stats_raw,
 )
 from app.repositories.quiz_repository import get_question_by_id
-from app.core.openai_client import generate_chat_reply
+from app.core.openai_client import PRIORITY_EXPLANATION, generate_chat_reply
 
 
 async def ensure_user_exists(db: AsyncSession, user_id: int):
@@ -122,6 +122,7 @@ async def explain_question_service(
             {"role": "system", "content": "You are a friendly teacher."},
             {"role": "user", "content": prompt},
         ],
+        priority=PRIORITY_EXPLANATION,
     )
 
     return ExplanationOut(
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.job_runner import job_runner
+from app.repositories.background_job_repository import count_background_jobs_by_status
+
+
+async def get_background_job_stats(db: AsyncSession) -> dict[str, Any]:
+    """
+    In-process runner metrics (this worker) plus persisted job counts by
+    status (all workers).
+    """
+    return {
+        "runner": job_runner.stats(),
+        "jobs_by_status": await count_background_jobs_by_status(db),
+    }
@@ -0,0 +1,134 @@
+# app/services/chat_context_service.py
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.openai_client import PRIORITY_BACKGROUND, generate_chat_reply
+from app.core.tokens import count_message_tokens, count_messages_tokens
+from app.models import ChatSession, Message
+from app.repositories.chat_repository import update_chat_session_summary
+
+
+def summary_prompt(summary: str) -> str:
+    return (
+        "Summary of the earlier part of this conversation "
+        "(older turns are not shown verbatim):\n"
+        f"{summary}"
+    )
+
+
+def fit_history_to_budget(
+    fixed_messages: Sequence[dict],
+    history: Sequence[dict],
+    *,
+    model_name: str,
+    token_budget: int | None = None,
+) -> List[dict]:
+    """
+    Returns the newest suffix of `history` that fits next to `fixed_messages`
+    (system prompt, summary, RAG chunks) within the token budget. The newest
+    message, the current user turn, is always kept.
+    """
+    budget = token_budget if token_budget is not None else settings.CHAT_CONTEXT_TOKEN_BUDGET
+    remaining = budget - count_messages_tokens(fixed_messages, model_name)
+
+    kept: List[dict] = []
+    for message in reversed(history):
+        cost = count_message_tokens(message, model_name)
+        if kept and cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+    return kept
+
+
+def _transcript(messages: Sequence[Message]) -> str:
+    return "\n".join(f"{m.sender_role.upper()}: {m.content}" for m in messages)
+
+
+async def _summarize_chunk(previous_summary: str | None, chunk: Sequence[Message]) -> str:
+    prompt = (
+        "Update the running summary of a tutoring conversation about SSI prevention.\n"
+        "Keep the facts, questions and answers the student may refer back to; drop small talk.\n"
+        "Write at most 200 words of plain prose. Return only the updated summary.\n\n"
+        f"Current summary:\n{previous_summary or '(none yet)'}\n\n"
+        f"New messages:\n{_transcript(chunk)}\n"
+    )
+    summary = await generate_chat_reply(
+        messages_for_model=[
+            {"role": "system", "content": "You maintain concise conversation summaries."},
+            {"role": "user", "content": prompt},
+        ],
+        model_name="gpt-4o-mini",
+        temperature=0.2,
+        priority=PRIORITY_BACKGROUND,
+    )
+    return summary.strip()
+
+
+def _summary_trigger_tokens() -> int:
+    return int(settings.CHAT_CONTEXT_TOKEN_BUDGET * settings.CHAT_HISTORY_SUMMARY_TRIGGER)
+
+
+def history_needs_summary(contents: Sequence[str], *, model_name: str) -> bool:
+    """
+    The check fold_history_into_summary loops on: the unsummarized history has
+    outgrown the summary trigger and there is more than the latest exchange.
+    """
+    if len(contents) <= 2:
+        return False
+    tokens = sum(count_message_tokens({"content": content}, model_name) for content in contents)
+    return tokens > _summary_trigger_tokens()
+
+
+async def fold_history_into_summary(
+    db: AsyncSession,
+    chat: ChatSession,
+    history: Sequence[Message],
+    *,
+    model_name: str,
+) -> int:
+    """
+    Incrementally folds the oldest unsummarized messages into chat.summary
+    until the verbatim history is back under the summary trigger. Only the
+    new chunk is sent with the previous summary, so cost does not grow with
+    session length. Returns the number of messages folded (0 when a
+    concurrent fold got there first).
+    """
+    trigger = _summary_trigger_tokens()
+    chunk_size = max(1, settings.CHAT_SUMMARY_CHUNK_MESSAGES)
+    # The summary this fold builds on; the write is dropped if another fold moved it.
+    expected_summary_message_id = chat.summary_message_id
+
+    pending = list(history)
+    tokens = sum(count_message_tokens({"content": m.content}, model_name) for m in pending)
+    summary = chat.summary
+    folded: List[Message] = []
+
+    # Always leave the latest exchange verbatim.
+    while tokens > trigger and len(pending) > 2:
+        chunk = pending[: min(chunk_size, len(pending) - 2)]
+        try:
+            summary = await _summarize_chunk(summary, chunk)
+        except Exception:
+            # Keep whatever was folded so far; the rest is retried next turn.
+            break
+        folded.extend(chunk)
+        pending = pending[len(chunk):]
+        tokens -= sum(count_message_tokens({"content": m.content}, model_name) for m in chunk)
+
+    if folded and summary:
+        written = await update_chat_session_summary(
+            db,
+            chat,
+            summary=summary,
+            summary_message_id=folded[-1].id,
+            expected_summary_message_id=expected_summary_message_id,
+        )
+        if not written:
+            return 0
+    return len(folded)
@@ -1,20 +1,32 @@
 # app/services/chat_service.py
 from __future__ import annotations
 
+import asyncio
 import json
 import re
-from typing import List
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, List, TypeVar
 
 from fastapi import HTTPException
 from pydantic import BaseModel, Field, ConfigDict
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.job_runner import job_runner
+from app.core.llm_resilience import UpstreamUnavailableError
+from app.core.source_policy import SourceFilterPolicy
+from app.core.timing import StageTimings
+from app.db.unit_of_work import unit_of_work
 from app.core.openai_client import (
     generate_structured_text,
     generate_chat_reply,
-    build_vector_store_context,
+    search_knowledge_sources,
+    select_vector_store_context,
+    stream_structured_text,
+    PRIORITY_BACKGROUND,
 )
+from app.models import ChatSession, Message
 from app.repositories.user_repository import get_user_by_id
 from app.repositories.chat_repository import (
     create_chat_session,
@@ -23,10 +35,25 @@ from app.repositories.chat_repository import (
     update_chat_session_title,
     delete_chat_session,
     list_chat_messages,
+    list_chat_messages_page,
+    get_message_position,
     create_message,
+    get_message_evidence_source,
 )
-from app.repositories.flashcard_repository import create_flashcard
-from app.services.knowledge_source_service import get_knowledge_source_filter_policy
+from app.repositories.flashcard_repository import create_flashcards_bulk, list_user_flashcards
+from app.services.chat_context_service import (
+    fit_history_to_budget,
+    fold_history_into_summary,
+    history_needs_summary,
+    summary_prompt,
+)
+from app.services.evidence_service import (
+    compact_evidence_source,
+    expand_evidence_sources,
+    parse_evidence_source,
+    store_message_evidence,
+)
+from app.services.knowledge_source_service import get_source_filter_policy
 
 from app.schemas.chat_schema import (
     ChatSessionCreate,
@@ -34,10 +61,15 @@ from app.schemas.chat_schema import (
     ChatSessionOut,
     MessageCreate,
     MessageOut,
+    MessageEvidenceOut,
     SendMessageOut,
+    SendMessageStreamFinal,
 )
 
 
+T = TypeVar("T")
+
+
 # -----------------------------
 # Structured Output Schema
 # -----------------------------
@@ -63,6 +95,20 @@ class AssistantStructuredResponse(BaseModel):
     )
 
 
+class AssistantStructuredResponseWithTitle(AssistantStructuredResponse):
+    """
+    First-turn variant: the chat title comes back with the answer instead of
+    from a second, serial model call.
+    """
+    suggested_title: str = Field(
+        ...,
+        description=(
+            "Concise chat title (3-7 words, sentence case, no quotes, no trailing punctuation) "
+            "summarizing the topic of the user's question."
+        ),
+    )
+
+
 def _system_prompt() -> str:
     return (
         "You are a medical-surgical nursing tutor focused ONLY on surgical site infection (SSI) prevention.\n"
@@ -159,6 +205,7 @@ async def _generate_chat_title(user_messages: List[str], assistant_text: str | N
         ],
         model_name="gpt-4o-mini",
         temperature=0.2,
+        priority=PRIORITY_BACKGROUND,
     )
 
     return _clean_title(title)
@@ -194,12 +241,13 @@ async def create_chat_session_for_user(
     await ensure_user_exists(db, user_id)
 
     model_name = payload.model_name or "gpt-4o-mini"
-    chat = await create_chat_session(
-        db,
-        user_id=user_id,
-        title=payload.title,
-        model_name=model_name,
-    )
+    async with unit_of_work(db):
+        chat = await create_chat_session(
+            db,
+            user_id=user_id,
+            title=payload.title,
+            model_name=model_name,
+        )
     return ChatSessionOut.model_validate(chat, from_attributes=True)
 
 
@@ -233,7 +281,8 @@ async def rename_chat_session_for_user(
         raise HTTPException(status_code=403, detail="Not allowed to edit this chat session")
 
     title = _sanitize_manual_chat_title(payload.title)
-    updated = await update_chat_session_title(db, chat, title=title)
+    async with unit_of_work(db):
+        updated = await update_chat_session_title(db, chat, title=title)
     return ChatSessionOut.model_validate(updated, from_attributes=True)
 
 
@@ -247,84 +296,235 @@ async def delete_chat_session_for_user(
     if chat.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed to delete this chat session")
 
-    await delete_chat_session(db, chat)
+    async with unit_of_work(db):
+        await delete_chat_session(db, chat)
 
 
 # -----------------------------
 # Message services
 # -----------------------------
 
+def _message_out(message: Message, evidence: dict | None = None) -> MessageOut:
+    # evidence_source is deferred; reading it when the query skipped it would lazy-load
+    # (and fail on an AsyncSession), so only loaded attributes are serialized.
+    unloaded = sa_inspect(message).unloaded
+    data = {name: getattr(message, name) for name in MessageOut.model_fields if name not in unloaded}
+    if evidence is not None:
+        # The stored column is compact (sources are linked rows); serve the full payload.
+        data["evidence_source"] = json.dumps(evidence, ensure_ascii=True)
+    if data.get("has_evidence") is None and "evidence_source" in data:
+        data["has_evidence"] = data["evidence_source"] is not None
+    return MessageOut.model_validate(data)
+
+
+async def _cursor_position(
+    db: AsyncSession,
+    chat_id: int,
+    message_id: int | None,
+    param: str,
+) -> tuple | None:
+    # An unknown cursor would otherwise match nothing and read as the end of the history.
+    if message_id is None:
+        return None
+    position = await get_message_position(db, chat_id, message_id)
+    if position is None:
+        raise HTTPException(status_code=400, detail=f"{param} is not a message in this chat session")
+    return position
+
+
 async def list_messages_in_chat(
     db: AsyncSession,
     user_id: int,
     chat_id: int,
+    *,
+    before_id: int | None = None,
+    after_id: int | None = None,
+    limit: int | None = None,
+    include_evidence: bool = False,
 ) -> List[MessageOut]:
+    """
+    Without any paging argument returns the full history (legacy clients). With
+    limit and/or a cursor returns one keyset page; see list_chat_messages_page.
+    A cursor that is not a message of this chat is rejected with 400.
+    Evidence payloads are left out unless include_evidence is set.
+    """
     await ensure_user_exists(db, user_id)
     chat = await ensure_chat_session_exists(db, chat_id)
     if chat.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed to access this chat session")
 
-    msgs = await list_chat_messages(db, chat_id)
-    return [MessageOut.model_validate(m, from_attributes=True) for m in msgs]
+    if before_id is None and after_id is None and limit is None:
+        msgs = await list_chat_messages(db, chat_id, include_evidence=include_evidence)
+    else:
+        msgs = await list_chat_messages_page(
+            db,
+            chat_id,
+            limit=limit or settings.CHAT_MESSAGES_PAGE_SIZE,
+            before=await _cursor_position(db, chat_id, before_id, "before_id"),
+            after=await _cursor_position(db, chat_id, after_id, "after_id"),
+            include_evidence=include_evidence,
+        )
+    if not include_evidence:
+        return [_message_out(m) for m in msgs]
+
+    evidence_by_message = await expand_evidence_sources(
+        db,
+        {
+            m.id: parsed
+            for m in msgs
+            if (parsed := parse_evidence_source(m.evidence_source)) is not None
+        },
+    )
+    return [_message_out(m, evidence_by_message.get(m.id)) for m in msgs]
 
 
-async def send_message_and_get_reply(
+async def get_message_evidence_for_user(
     db: AsyncSession,
     user_id: int,
-    chat_id: int,
-    payload: MessageCreate,   # <-- NO SendMessageIn in your schemas
-) -> SendMessageOut:
-    """
-    Flow:
-    1) Save user message
-    2) Build conversation history
-    3) Call LLM ONCE with Structured Outputs => {assistant_text, flashcards[]}
-    4) Save assistant message
-    5) Save up to 5 flashcards linked to assistant message
-    6) Return both messages
-    """
+    message_id: int,
+) -> MessageEvidenceOut:
     await ensure_user_exists(db, user_id)
-    chat = await ensure_chat_session_exists(db, chat_id)
+    row = await get_message_evidence_source(db, message_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    owner_id, evidence_source = row
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to access this message")
+
+    evidence = parse_evidence_source(evidence_source)
+    if evidence is not None:
+        evidence = (await expand_evidence_sources(db, {message_id: evidence}))[message_id]
+    return MessageEvidenceOut(message_id=message_id, evidence=evidence)
+
+
+@dataclass
+class _ChatTurn:
+    chat: ChatSession
+    user_msg: Message
+    history: List[Message]
+    messages_for_model: List[dict]
+    vector_store_id: str | None
+    evidence_payload: dict | None
+    # Only asks the model for a title while the chat still has a default one.
+    response_model: type[AssistantStructuredResponse] = AssistantStructuredResponse
+    # Filled by the gateway with prompt/cached/completion token counts.
+    usage: dict = field(default_factory=dict)
+
+
+async def _load_source_filter_policy() -> SourceFilterPolicy:
+    # Compiled and cached process-wide; on a version check it uses its own session, since
+    # AsyncSession does not allow concurrent statements and this runs alongside the
+    # history query on the request session.
+    return await get_source_filter_policy()
+
+
+async def _timed(timings: StageTimings, name: str, awaitable: Awaitable[T]) -> T:
+    with timings.stage(name):
+        return await awaitable
+
+
+async def _noop() -> None:
+    return None
+
+
+async def _prepare_chat_turn(
+    db: AsyncSession,
+    user_id: int,
+    chat_id: int,
+    payload: MessageCreate,
+    timings: StageTimings | None = None,
+) -> _ChatTurn:
+    timings = timings or StageTimings()
+    with timings.stage("validate"):
+        await ensure_user_exists(db, user_id)
+        chat = await ensure_chat_session_exists(db, chat_id)
     if chat.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed to use this chat session")
 
-    # 1) Save user message (repository signature: no payload=)
-    user_msg = await create_message(
-        db,
-        chat_id=chat_id,
-        sender_role="user",
-        content=payload.content,
-        model_name=None,
-        evidence_source=None,
-    )
+    model_name = chat.model_name or "gpt-4o-mini"
+    vector_store_id = settings.OPENAI_VECTOR_STORE_ID
+    run_search = bool(vector_store_id) and bool(payload.content and payload.content.strip())
+
+    async def _save_user_message_and_load_history() -> tuple[Message, List[Message]]:
+        # 1) Save user message (repository signature: no payload=). Committed before the
+        # model call so the turn survives an upstream failure.
+        async with unit_of_work(db):
+            user_msg = await create_message(
+                db,
+                chat_id=chat_id,
+                sender_role="user",
+                content=payload.content,
+                model_name=None,
+                evidence_source=None,
+            )
+        # 2) History for model: only turns not yet folded into the rolling summary
+        history = await list_chat_messages(db, chat_id, after_id=chat.summary_message_id)
+        return user_msg, history
+
+    async def _load_policy_and_search() -> tuple[SourceFilterPolicy, dict]:
+        # The compiled policy is an in-memory hit between version checks, so it is resolved
+        # first: the local index and the store's attribute filters both search with it.
+        policy = await _timed(timings, "policy", _load_source_filter_policy())
+        raw_search = await _timed(
+            timings,
+            "search",
+            search_knowledge_sources(
+                query=payload.content,
+                vector_store_id=vector_store_id,
+                max_results=6,
+                source_filter_policy=policy,
+            ),
+        )
+        return policy, raw_search
+
+    # The history (request session) and the policy + vector search (own session / network)
+    # are independent; run them concurrently. return_exceptions keeps every task awaited
+    # before we raise, so nothing is left running on the request session.
+    with timings.stage("pre_llm"):
+        history_result, retrieval_result = await asyncio.gather(
+            _timed(timings, "history", _save_user_message_and_load_history()),
+            _load_policy_and_search() if run_search else _noop(),
+            return_exceptions=True,
+        )
+    if isinstance(history_result, BaseException):
+        raise history_result
+    user_msg, history = history_result
 
-    # 2) History for model
-    history = await list_chat_messages(db, chat_id)
-    messages_for_model = [{"role": "system", "content": _system_prompt()}]
+    prefix_messages = [{"role": "system", "content": _system_prompt()}]
+    if chat.summary:
+        prefix_messages.append({"role": "system", "content": summary_prompt(chat.summary)})
 
-    vector_store_id = settings.OPENAI_VECTOR_STORE_ID
     rag_context_chunks: List[str] = []
+    rag_messages: List[dict] = []
     evidence_payload: dict | None = None
     if vector_store_id:
         try:
-            source_filter_policy = await get_knowledge_source_filter_policy(db)
-            rag_context_chunks, evidence_payload = build_vector_store_context(
-                query=payload.content,
-                vector_store_id=vector_store_id,
-                max_results=6,
-                source_filter_policy=source_filter_policy,
-            )
+            if isinstance(retrieval_result, BaseException):
+                raise retrieval_result
+            if run_search:
+                policy_result, search_result = retrieval_result
+                with timings.stage("select"):
+                    rag_context_chunks, evidence_payload = select_vector_store_context(
+                        search_result,
+                        query=payload.content,
+                        vector_store_id=vector_store_id,
+                        max_chars_per_result=1200,
+                        source_filter_policy=policy_result,
+                    )
+        except UpstreamUnavailableError:
+            # Circuit open: surfaced as 503 + Retry-After by the app-level handler.
+            raise
         except Exception as exc:
             raise HTTPException(status_code=500, detail="Vector store search failed") from exc
 
         if rag_context_chunks:
-            messages_for_model.append({"role": "system", "content": _rag_context_intro_prompt()})
+            rag_messages.append({"role": "system", "content": _rag_context_intro_prompt()})
             for chunk in rag_context_chunks:
-                messages_for_model.append({"role": "system", "content": _rag_context_prompt(chunk)})
+                rag_messages.append({"role": "system", "content": _rag_context_prompt(chunk)})
         else:
-            messages_for_model.append({"role": "system", "content": _rag_no_context_prompt()})
+            rag_messages.append({"role": "system", "content": _rag_no_context_prompt()})
     else:
-        messages_for_model.append(
+        rag_messages.append(
             {
                 "role": "system",
                 "content": (
@@ -334,66 +534,293 @@ async def send_message_and_get_reply(
             }
         )
 
-    for m in history:
-        messages_for_model.append({"role": m.sender_role, "content": m.content})
-
-    # 3) Structured Outputs call (single call)
-    structured = await generate_structured_text(
+    history_for_model = fit_history_to_budget(
+        [*prefix_messages, *rag_messages],
+        [{"role": m.sender_role, "content": m.content} for m in history],
+        model_name=model_name,
+    )
+    if settings.CHAT_PROMPT_LAYOUT == "legacy":
+        messages_for_model = [*prefix_messages, *rag_messages, *history_for_model]
+    else:
+        # Stable prefix (system, summary, prior turns) so consecutive turns share a cacheable
+        # prompt prefix; the per-query context and the new question go last.
+        messages_for_model = [
+            *prefix_messages,
+            *history_for_model[:-1],
+            *rag_messages,
+            *history_for_model[-1:],
+        ]
+
+    if vector_store_id and evidence_payload is None:
+        evidence_payload = {
+            "vector_store_id": vector_store_id,
+            "query": payload.content,
+            "sources": [],
+        }
+
+    return _ChatTurn(
+        chat=chat,
+        user_msg=user_msg,
+        history=history,
         messages_for_model=messages_for_model,
-        response_model=AssistantStructuredResponse,
-        model_name=chat.model_name or "gpt-4o-mini",
+        vector_store_id=vector_store_id,
+        evidence_payload=evidence_payload,
+        response_model=(
+            AssistantStructuredResponseWithTitle
+            if _is_default_title(chat.title)
+            else AssistantStructuredResponse
+        ),
     )
 
+
+async def _finalize_chat_turn(
+    db: AsyncSession,
+    user_id: int,
+    turn: _ChatTurn,
+    structured: AssistantStructuredResponse,
+) -> tuple[Message, List[FlashcardCandidate]]:
+    chat = turn.chat
     assistant_text = (structured.assistant_text or "").strip()
     flashcards = _clip_flashcards(structured.flashcards, max_cards=5)
 
-    # 4) Save assistant message
+    # 4) Save assistant message; its snippets are stored once and linked (evidence_service)
     evidence_source = None
-    if vector_store_id:
-        if evidence_payload is None:
-            evidence_payload = {
-                "vector_store_id": vector_store_id,
-                "query": payload.content,
-                "sources": [],
-            }
-        evidence_source = json.dumps(evidence_payload, ensure_ascii=True)
+    if turn.evidence_payload is not None:
+        evidence_source = compact_evidence_source(turn.evidence_payload)
 
-    assistant_msg = await create_message(
-        db,
-        chat_id=chat_id,
-        sender_role="assistant",
-        content=assistant_text,
-        model_name=chat.model_name or "gpt-4o-mini",
-        evidence_source=evidence_source,
-    )
+    # The assistant message, the inline title and the job rows commit together; the jobs
+    # are dispatched only after that commit.
+    async with unit_of_work(db):
+        assistant_msg = await create_message(
+            db,
+            chat_id=chat.id,
+            sender_role="assistant",
+            content=assistant_text,
+            model_name=chat.model_name or "gpt-4o-mini",
+            evidence_source=evidence_source,
+            prompt_tokens=turn.usage.get("prompt_tokens"),
+            cached_prompt_tokens=turn.usage.get("cached_prompt_tokens"),
+            completion_tokens=turn.usage.get("completion_tokens"),
+        )
+        if turn.evidence_payload is not None:
+            await store_message_evidence(db, message_id=assistant_msg.id, evidence=turn.evidence_payload)
+
+        # Everything below is non-critical and runs on the background job runner, so the
+        # reply is returned as soon as the assistant message is stored. The best-effort
+        # writes each run in a savepoint: a failed flush is rolled back to it and leaves
+        # the turn's transaction usable, so the reply still commits.
+
+        # 4b) Auto-title chat after first exchange (if still default). The title normally
+        # arrives with the answer; only the fallback title call is deferred.
+        if _is_default_title(chat.title):
+            try:
+                async with db.begin_nested():
+                    new_title = _clean_title(getattr(structured, "suggested_title", "") or "")
+                    if new_title:
+                        await update_chat_session_title(db, chat, title=new_title)
+                    else:
+                        await job_runner.enqueue(
+                            db,
+                            JOB_CHAT_TITLE,
+                            {
+                                "chat_id": chat.id,
+                                "user_messages": [m.content for m in turn.history if m.sender_role == "user"],
+                                "assistant_text": assistant_text,
+                            },
+                        )
+            except Exception:
+                # Title generation should never block the main chat response. The savepoint
+                # rollback expired the title, so reload it before the final event reads it.
+                await db.refresh(chat, attribute_names=["title"])
+
+        # 4c) Fold the oldest turns into the rolling summary once history outgrows its share
+        # of the prompt budget, so the next turn starts small. Most turns stay under the
+        # trigger and need no job row at all.
+        if history_needs_summary(
+            [m.content for m in turn.history] + [assistant_text],
+            model_name=chat.model_name or "gpt-4o-mini",
+        ):
+            try:
+                async with db.begin_nested():
+                    # One fold per chat at a time; while one is queued or running the
+                    # turn skips it, and the next turn re-checks the trigger.
+                    await job_runner.enqueue(db, JOB_CHAT_SUMMARY, {"chat_id": chat.id}, unique=True)
+            except Exception:
+                pass
+
+        # 5) Save flashcards linked to assistant message
+        if flashcards:
+            await job_runner.enqueue(
+                db,
+                JOB_CHAT_FLASHCARDS,
+                {
+                    "user_id": user_id,
+                    "chat_id": chat.id,
+                    "message_id": assistant_msg.id,
+                    "cards": [{"question": fc.question, "answer": fc.answer} for fc in flashcards],
+                },
+            )
 
-    # 4b) Auto-title chat after first exchange (if still default)
-    if _is_default_title(chat.title):
-        try:
-            user_messages = [m.content for m in history if m.sender_role == "user"]
-            new_title = await _generate_chat_title(user_messages, assistant_text)
-            if new_title:
-                chat.title = new_title
-                db.add(chat)
-                await db.commit()
-                await db.refresh(chat)
-        except Exception:
-            # Title generation should never block the main chat response
-            pass
+    return assistant_msg, flashcards
 
-    # 5) Save flashcards linked to assistant message
-    for fc in flashcards:
-        await create_flashcard(
-            db,
-            user_id=user_id,
-            question=fc.question,
-            answer=fc.answer,
-            chat_session_id=chat_id,
-            source_message_id=assistant_msg.id,
+
+async def send_message_and_get_reply(
+    db: AsyncSession,
+    user_id: int,
+    chat_id: int,
+    payload: MessageCreate,   # <-- NO SendMessageIn in your schemas
+    timings: StageTimings | None = None,
+) -> SendMessageOut:
+    """
+    Flow:
+    1) Save user message
+    2) Build conversation history (concurrently with policy load + vector search)
+    3) Call LLM ONCE with Structured Outputs => {assistant_text, flashcards[]}
+    4) Save assistant message
+    5) Queue up to 5 flashcards linked to assistant message (background job)
+    6) Return both messages
+
+    Pass `timings` to collect a per-stage breakdown (Server-Timing).
+    """
+    timings = timings or StageTimings()
+    turn = await _prepare_chat_turn(db, user_id, chat_id, payload, timings)
+
+    # 3) Structured Outputs call (single call)
+    with timings.stage("llm"):
+        structured = await generate_structured_text(
+            messages_for_model=turn.messages_for_model,
+            response_model=turn.response_model,
+            model_name=turn.chat.model_name or "gpt-4o-mini",
+            usage_out=turn.usage,
         )
 
+    with timings.stage("finalize"):
+        assistant_msg, _ = await _finalize_chat_turn(db, user_id, turn, structured)
+
     # 6) Return response
     return SendMessageOut(
-        user_message=MessageOut.model_validate(user_msg, from_attributes=True),
-        assistant_message=MessageOut.model_validate(assistant_msg, from_attributes=True),
+        user_message=_message_out(turn.user_msg),
+        assistant_message=_message_out(assistant_msg, turn.evidence_payload),
+    )
+
+
+async def stream_message_and_get_reply(
+    db: AsyncSession,
+    user_id: int,
+    chat_id: int,
+    payload: MessageCreate,
+    timings: StageTimings | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Streaming variant of send_message_and_get_reply.
+
+    Validation, the user-message insert and retrieval run before this returns, so
+    404/403/500 still surface as normal HTTP errors, and `timings` covers those
+    pre-LLM stages by the time the response headers are sent. The returned iterator yields:
+      {"event": "delta", "data": {"text": ...}}   assistant_text tokens as parsed
+      {"event": "final", "data": SendMessageStreamFinal}
+      {"event": "error", "data": {"detail": ...}} if generation fails mid-stream
+    """
+    turn = await _prepare_chat_turn(db, user_id, chat_id, payload, timings)
+
+    async def _events() -> AsyncIterator[dict]:
+        structured: AssistantStructuredResponse | None = None
+        try:
+            async for kind, value in stream_structured_text(
+                messages_for_model=turn.messages_for_model,
+                response_model=turn.response_model,
+                stream_field="assistant_text",
+                model_name=turn.chat.model_name or "gpt-4o-mini",
+                usage_out=turn.usage,
+            ):
+                if kind == "delta":
+                    yield {"event": "delta", "data": {"text": value}}
+                elif kind == "final":
+                    structured = value
+            if structured is None:
+                raise RuntimeError("Stream ended without a structured response.")
+
+            assistant_msg, flashcards = await _finalize_chat_turn(db, user_id, turn, structured)
+        except UpstreamUnavailableError as exc:
+            yield {
+                "event": "error",
+                "data": {
+                    "detail": "Assistant is temporarily unavailable",
+                    "retry_after_seconds": round(exc.retry_after_seconds, 1),
+                },
+            }
+            return
+        except Exception:
+            yield {"event": "error", "data": {"detail": "Assistant reply generation failed"}}
+            return
+
+        final = SendMessageStreamFinal(
+            user_message=_message_out(turn.user_msg),
+            assistant_message=_message_out(assistant_msg, turn.evidence_payload),
+            chat_title=turn.chat.title,
+            flashcards=[fc.model_dump() for fc in flashcards],
+            flashcards_pending=bool(flashcards),
+            evidence=turn.evidence_payload,
+        )
+        yield {"event": "final", "data": final.model_dump(mode="json")}
+
+    return _events()
+
+
+# -----------------------------
+# Background jobs (post-response side effects)
+# -----------------------------
+
+JOB_CHAT_TITLE = "chat.title"
+JOB_CHAT_SUMMARY = "chat.summary"
+JOB_CHAT_FLASHCARDS = "chat.flashcards"
+
+
+async def _run_chat_title_job(db: AsyncSession, payload: dict) -> None:
+    chat = await get_chat_session_by_id(db, payload["chat_id"])
+    if chat is None or not _is_default_title(chat.title):
+        return
+    title = await _generate_chat_title(payload.get("user_messages") or [], payload.get("assistant_text"))
+    if title:
+        await update_chat_session_title(db, chat, title=title)
+
+
+async def _run_chat_summary_job(db: AsyncSession, payload: dict) -> None:
+    chat = await get_chat_session_by_id(db, payload["chat_id"])
+    if chat is None:
+        return
+    history = await list_chat_messages(db, chat.id, after_id=chat.summary_message_id)
+    await fold_history_into_summary(
+        db,
+        chat,
+        history,
+        model_name=chat.model_name or "gpt-4o-mini",
+    )
+
+
+async def _run_chat_flashcards_job(db: AsyncSession, payload: dict) -> None:
+    # Idempotent across retries: cards already saved for this message are skipped.
+    existing = await list_user_flashcards(
+        db,
+        payload["user_id"],
+        source_message_id=payload["message_id"],
     )
+    saved_questions = {card.question for card in existing}
+    await create_flashcards_bulk(
+        db,
+        user_id=payload["user_id"],
+        cards=[
+            {
+                "question": card["question"],
+                "answer": card["answer"],
+                "chat_session_id": payload["chat_id"],
+                "source_message_id": payload["message_id"],
+            }
+            for card in payload.get("cards") or []
+            if card["question"] not in saved_questions
+        ],
+    )
+
+job_runner.register(JOB_CHAT_TITLE, _run_chat_title_job)
+job_runner.register(JOB_CHAT_SUMMARY, _run_chat_summary_job)
+job_runner.register(JOB_CHAT_FLASHCARDS, _run_chat_flashcards_job)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.evidence_repository import (
+    list_message_evidence_sources,
+    list_messages_citing_file,
+    save_message_evidence,
+)
+from app.schemas import KnowledgeSourceCitationOut
+
+# Marker in Message.evidence_source: the sources live in message_evidence_links.
+LINKED_SOURCES_MARKER = "message_evidence_links"
+
+
+def parse_evidence_source(raw: str | None) -> Dict[str, Any] | None:
+    if not raw:
+        return None
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+async def store_message_evidence(
+    db: AsyncSession,
+    *,
+    message_id: int,
+    evidence: Dict[str, Any],
+) -> None:
+    """Writes the snippets and links for a freshly created assistant message."""
+    await save_message_evidence(db, message_id=message_id, sources=evidence.get("sources") or [])
+
+
+def compact_evidence_source(evidence: Dict[str, Any]) -> str:
+    """
+    The evidence JSON kept on the message row: query and filter stats only. The
+    snippets are stored once in evidence_snippets and linked per message.
+    """
+    compact = {key: value for key, value in evidence.items() if key != "sources"}
+    compact["sources_ref"] = LINKED_SOURCES_MARKER
+    compact["source_count"] = len(evidence.get("sources") or [])
+    return json.dumps(compact, ensure_ascii=True)
+
+
+async def expand_evidence_sources(
+    db: AsyncSession,
+    evidence_by_message: Dict[int, Dict[str, Any]],
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Restores `sources` on compact payloads with one query for all messages;
+    legacy payloads that still embed their sources are returned unchanged.
+    """
+    linked_ids = [
+        message_id
+        for message_id, evidence in evidence_by_message.items()
+        if "sources" not in evidence and evidence.get("sources_ref") == LINKED_SOURCES_MARKER
+    ]
+    sources_by_message = await list_message_evidence_sources(db, linked_ids)
+
+    expanded: Dict[int, Dict[str, Any]] = {}
+    for message_id, evidence in evidence_by_message.items():
+        if message_id not in linked_ids:
+            expanded[message_id] = evidence
+            continue
+        restored = {
+            key: value for key, value in evidence.items() if key not in {"sources_ref", "source_count"}
+        }
+        restored["sources"] = sources_by_message.get(message_id, [])
+        expanded[message_id] = restored
+    return expanded
+
+
+async def list_source_citations(
+    db: AsyncSession,
+    *,
+    file_id: str,
+    limit: int,
+) -> List[KnowledgeSourceCitationOut]:
+    rows = await list_messages_citing_file(db, file_id.strip(), limit=limit)
+    return [KnowledgeSourceCitationOut.model_validate(row) for row in rows]
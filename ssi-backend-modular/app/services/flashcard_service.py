@@ -7,12 +7,15 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.openai_client import generate_structured_output
-from app.schemas import FlashcardCreate, FlashcardOut
+from app.db.unit_of_work import unit_of_work
+from app.schemas import FlashcardBulkCreate, FlashcardCreate, FlashcardOut
+from app.schemas.flashcard_schema import AssistantToFlashcardsLLMOutput
 from app.repositories.user_repository import get_user_by_id
 from app.repositories.flashcard_repository import (
     get_flashcard_by_id,
     list_user_flashcards,
     create_flashcard,
+    create_flashcards_bulk,
     update_flashcard_content,
     set_flashcard_active_state,
     delete_flashcard,
@@ -45,17 +48,34 @@ async def create_flashcard_for_user(
 ) -> FlashcardOut:
     await ensure_user_exists(db, user_id)
 
-    card = await create_flashcard(
-        db,
-        user_id=user_id,
-        question=payload.question,
-        answer=payload.answer,
-        chat_session_id=payload.chat_session_id,
-        source_message_id=payload.source_message_id,
-    )
+    async with unit_of_work(db):
+        card = await create_flashcard(
+            db,
+            user_id=user_id,
+            question=payload.question,
+            answer=payload.answer,
+            chat_session_id=payload.chat_session_id,
+            source_message_id=payload.source_message_id,
+        )
     return FlashcardOut.model_validate(card)
 
 
+async def create_flashcards_bulk_for_user(
+    db: AsyncSession,
+    user_id: int,
+    payload: FlashcardBulkCreate,
+) -> List[FlashcardOut]:
+    await ensure_user_exists(db, user_id)
+
+    async with unit_of_work(db):
+        cards = await create_flashcards_bulk(
+            db,
+            user_id=user_id,
+            cards=[card.model_dump() for card in payload.flashcards],
+        )
+    return [FlashcardOut.model_validate(c) for c in cards]
+
+
 async def list_flashcards_for_user_service(
     db: AsyncSession,
     user_id: int,
@@ -87,7 +107,8 @@ async def update_flashcard_service(
     if card.user_id != user_id:
         raise HTTPException(403, "Not allowed to modify this flashcard")
 
-    card = await update_flashcard_content(db, card, question=question, answer=answer)
+    async with unit_of_work(db):
+        card = await update_flashcard_content(db, card, question=question, answer=answer)
     return FlashcardOut.model_validate(card)
 
 
@@ -102,7 +123,8 @@ async def set_flashcard_active_service(
     if card.user_id != user_id:
         raise HTTPException(403, "Not allowed to modify this flashcard")
 
-    card = await set_flashcard_active_state(db, card, is_active)
+    async with unit_of_work(db):
+        card = await set_flashcard_active_state(db, card, is_active)
     return FlashcardOut.model_validate(card)
 
 
@@ -116,43 +138,14 @@ async def delete_flashcard_service(
     if card.user_id != user_id:
         raise HTTPException(403, "Not allowed to delete this flashcard")
 
-    await delete_flashcard(db, card)
+    async with unit_of_work(db):
+        await delete_flashcard(db, card)
 
 
 # ============================================================
 # NEW: auto-generate from ASSISTANT message (Structured Outputs)
 # ============================================================
 
-_ASSISTANT_TO_FLASHCARDS_SCHEMA: dict = {
-    "type": "object",
-    "properties": {
-        "full_response": {
-            "type": "string",
-            "description": "A single assistant message suitable for display (explain briefly what was answered and what flashcards were made).",
-        },
-        "flashcards": {
-            "type": "array",
-            "maxItems": 5,
-            "items": {
-                "type": "object",
-                "properties": {
-                    "question": {"type": "string"},
-                    "answer": {"type": "string"},
-                },
-                "required": ["question", "answer"],
-                "additionalProperties": False,
-            },
-        },
-        "warnings": {
-            "type": "array",
-            "items": {"type": "string"},
-        },
-    },
-    "required": ["full_response", "flashcards", "warnings"],
-    "additionalProperties": False,
-}
-
-
 async def auto_generate_flashcards_from_assistant_message(
     db: AsyncSession,
     *,
@@ -201,22 +194,24 @@ async def auto_generate_flashcards_from_assistant_message(
     data = await generate_structured_output(
         model_name=model_name,
         messages_for_model=messages,
-        schema_name="assistant_to_flashcards",
-        json_schema=_ASSISTANT_TO_FLASHCARDS_SCHEMA,
+        response_model=AssistantToFlashcardsLLMOutput,
         temperature=0.2,
     )
 
     # Save flashcards
-    created_cards: List[FlashcardOut] = []
-    for fc in data["flashcards"]:
-        card = await create_flashcard(
+    async with unit_of_work(db):
+        cards = await create_flashcards_bulk(
             db,
             user_id=user_id,
-            question=fc["question"],
-            answer=fc["answer"],
-            chat_session_id=msg.chat_session_id,
-            source_message_id=msg.id,
+            cards=[
+                {
+                    "question": fc.question,
+                    "answer": fc.answer,
+                    "chat_session_id": msg.chat_session_id,
+                    "source_message_id": msg.id,
+                }
+                for fc in data.flashcards
+            ],
         )
-        created_cards.append(FlashcardOut.model_validate(card))
 
-    return created_cards
+    return [FlashcardOut.model_validate(card) for card in cards]
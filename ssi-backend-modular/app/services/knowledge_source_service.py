@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any
 
 from fastapi import HTTPException
@@ -8,15 +10,31 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.openai_client import (
     attach_files_to_vector_store,
+    get_vector_store_file_attributes,
+    invalidate_vector_store_search_cache,
     list_processed_account_files,
     list_vector_store_files,
+    update_vector_store_file_attributes,
+)
+from app.core.source_policy import (
+    SourceFilterPolicy,
+    normalize_source_key,
+    source_file_attributes,
+)
+from app.db.session import AsyncSessionLocal
+from app.db.unit_of_work import run_after_commit, unit_of_work
+from app.repositories.file_metadata_repository import (
+    get_known_filenames,
+    save_file_filenames,
 )
 from app.repositories.knowledge_source_repository import (
+    bump_knowledge_source_policy_version,
     create_knowledge_source,
     create_knowledge_source_audit,
     delete_knowledge_source,
     get_knowledge_source_by_id,
     get_knowledge_source_counts,
+    get_knowledge_source_policy_version,
     list_knowledge_sources,
     update_knowledge_source,
 )
@@ -37,8 +55,14 @@ def _clean_required(value: str, field_name: str) -> str:
     return cleaned
 
 
-def _normalize_source_ref(value: str) -> str:
-    return (value or "").strip().lower()
+def _format_index_error(last_error: Any) -> str | None:
+    if not isinstance(last_error, dict):
+        return None
+    code = str(last_error.get("code") or "").strip()
+    message = str(last_error.get("message") or "").strip()
+    if code and message:
+        return f"{code}: {message}"
+    return code or message or None
 
 
 async def list_knowledge_sources_service(db: AsyncSession) -> list[KnowledgeSourceOut]:
@@ -56,7 +80,20 @@ async def _sync_knowledge_sources_from_vector_store(
             detail="OPENAI_VECTOR_STORE_ID is not configured",
         )
 
-    vector_files = list_vector_store_files(vector_store_id=vector_store_id)
+    # Processed account files already carry their filenames; together with the
+    # persistent metadata cache this avoids a files.retrieve per vector-store file.
+    processed_user_data = await list_processed_account_files(purpose="user_data")
+    persisted_filenames = await get_known_filenames(db)
+    known_filenames = dict(persisted_filenames)
+    for item in processed_user_data:
+        file_id = str(item.get("file_id") or "").strip()
+        if file_id and item.get("filename"):
+            known_filenames.setdefault(file_id, str(item["filename"]))
+
+    vector_files = await list_vector_store_files(
+        vector_store_id=vector_store_id,
+        known_filenames=known_filenames,
+    )
     attached_file_ids = {
         str(item.get("file_id") or "").strip()
         for item in vector_files
@@ -65,73 +102,138 @@ async def _sync_knowledge_sources_from_vector_store(
 
     # Auto-attach processed user_data files so newly uploaded dashboard files
     # become visible and controllable without manual API attachment.
-    processed_user_data = list_processed_account_files(purpose="user_data")
     missing_user_data_ids = [
         str(item.get("file_id") or "").strip()
         for item in processed_user_data
         if str(item.get("file_id") or "").strip() and str(item.get("file_id") or "").strip() not in attached_file_ids
     ]
     auto_attached = 0
+    auto_attach_failed = 0
     if missing_user_data_ids:
-        auto_attached = attach_files_to_vector_store(
+        # One file-batch per 500 files, polled concurrently; the per-file results are
+        # merged into the listing instead of paginating the whole store again.
+        attach_statuses = await attach_files_to_vector_store(
             vector_store_id=vector_store_id,
             file_ids=missing_user_data_ids,
         )
-        if auto_attached:
-            vector_files = list_vector_store_files(vector_store_id=vector_store_id)
-    current_rows = await list_knowledge_sources(db)
-
-    existing_vector_rows = [
-        row for row in current_rows if (row.source_type or "").strip().lower() == VECTOR_STORE_FILE_SOURCE_TYPE
-    ]
-    existing_by_ref = {str(row.source_ref).strip(): row for row in existing_vector_rows}
-    current_file_ids = {
-        str(item.get("file_id") or "").strip()
-        for item in vector_files
-        if str(item.get("file_id") or "").strip()
-    }
-
-    created = 0
-    updated = 0
-    removed = 0
-
-    for item in vector_files:
-        file_id = str(item.get("file_id") or "").strip()
-        if not file_id:
-            continue
-        filename = str(item.get("filename") or file_id).strip() or file_id
-
-        existing = existing_by_ref.get(file_id)
-        if existing is None:
-            await create_knowledge_source(
-                db,
-                title=filename,
-                source_type=VECTOR_STORE_FILE_SOURCE_TYPE,
-                source_ref=file_id,
-                enabled=True,
-                verified=False,
+        for file_id, attach_status in attach_statuses.items():
+            attach_state = str(attach_status.get("status") or "").lower()
+            # Files still in progress are neither; a later sync reports their outcome.
+            if attach_state == "completed":
+                auto_attached += 1
+            elif attach_state in {"failed", "cancelled"}:
+                auto_attach_failed += 1
+            vector_files.append(
+                {
+                    "file_id": file_id,
+                    "vector_store_file_id": file_id,
+                    "filename": known_filenames.get(file_id) or file_id,
+                    "status": attach_status.get("status"),
+                    "usage_bytes": None,
+                    "created_at": None,
+                    "last_error": attach_status.get("last_error"),
+                    "attributes": {},
+                }
             )
-            created += 1
-            continue
 
-        needs_update = (
-            (existing.title or "") != filename
-            or (existing.source_type or "").strip().lower() != VECTOR_STORE_FILE_SOURCE_TYPE
+    # Row reconciliation commits as one transaction, after the remote listing calls.
+    async with unit_of_work(db):
+        # Remember newly resolved filenames (the listing falls back to the file_id when unknown).
+        await save_file_filenames(
+            db,
+            [
+                {"file_id": str(item["file_id"]), "filename": item["filename"]}
+                for item in vector_files
+                if item.get("file_id")
+                and str(item["file_id"]) not in persisted_filenames
+                and item.get("filename") != item.get("file_id")
+            ],
         )
-        if needs_update:
-            await update_knowledge_source(
-                db,
-                existing,
-                title=filename,
-                source_type=VECTOR_STORE_FILE_SOURCE_TYPE,
+
+        current_rows = await list_knowledge_sources(db)
+
+        existing_vector_rows = [
+            row for row in current_rows if (row.source_type or "").strip().lower() == VECTOR_STORE_FILE_SOURCE_TYPE
+        ]
+        existing_by_ref = {str(row.source_ref).strip(): row for row in existing_vector_rows}
+        current_file_ids = {
+            str(item.get("file_id") or "").strip()
+            for item in vector_files
+            if str(item.get("file_id") or "").strip()
+        }
+
+        created = 0
+        updated = 0
+        removed = 0
+        # Registry flags each listed file should carry as vector-store attributes.
+        flags_by_file_id: dict[str, tuple[bool, bool]] = {}
+
+        for item in vector_files:
+            file_id = str(item.get("file_id") or "").strip()
+            if not file_id:
+                continue
+            filename = str(item.get("filename") or file_id).strip() or file_id
+            index_status = str(item.get("status") or "").strip().lower() or None
+            index_error = _format_index_error(item.get("last_error"))
+
+            existing = existing_by_ref.get(file_id)
+            if existing is None:
+                await create_knowledge_source(
+                    db,
+                    title=filename,
+                    source_type=VECTOR_STORE_FILE_SOURCE_TYPE,
+                    source_ref=file_id,
+                    enabled=True,
+                    verified=False,
+                    index_status=index_status,
+                    index_error=index_error,
+                )
+                flags_by_file_id[file_id] = (True, False)
+                created += 1
+                continue
+
+            flags_by_file_id[file_id] = (bool(existing.enabled), bool(existing.verified))
+
+            needs_update = (
+                (existing.title or "") != filename
+                or (existing.source_type or "").strip().lower() != VECTOR_STORE_FILE_SOURCE_TYPE
+                or existing.index_status != index_status
+                or existing.index_error != index_error
             )
-            updated += 1
+            if needs_update:
+                await update_knowledge_source(
+                    db,
+                    existing,
+                    title=filename,
+                    source_type=VECTOR_STORE_FILE_SOURCE_TYPE,
+                    index_status=index_status,
+                    index_error=index_error,
+                    clear_index_error=index_error is None,
+                )
+                updated += 1
+
+        for row in existing_vector_rows:
+            row_ref = str(row.source_ref or "").strip()
+            if row_ref and row_ref not in current_file_ids:
+                await delete_knowledge_source(db, row)
+                removed += 1
+
+        if created or updated or removed:
+            await _mark_registry_changed(db)
+
+    attributes_updated = await _push_vector_file_attributes(
+        vector_store_id,
+        vector_files,
+        flags_by_file_id,
+    )
 
-    for row in existing_vector_rows:
-        row_ref = str(row.source_ref or "").strip()
-        if row_ref and row_ref not in current_file_ids:
-            await delete_knowledge_source(db, row)
-            removed += 1
+    previous_file_ids = {str(row.source_ref or "").strip() for row in existing_vector_rows}
+    previous_file_ids.discard("")
+    if auto_attached or previous_file_ids != current_file_ids:
+        # The store's file set changed: cached raw search results may be stale.
+        invalidate_vector_store_search_cache(vector_store_id)
+    elif attributes_updated:
+        _invalidate_filtered_search_cache(vector_store_id)
 
     return {
         "discovered": len(current_file_ids),
@@ -139,9 +241,64 @@ async def _sync_knowledge_sources_from_vector_store(
         "updated": updated,
         "removed": removed,
         "auto_attached": auto_attached,
+        "auto_attach_failed": auto_attach_failed,
+        "attributes_updated": attributes_updated,
     }
 
 
+async def _push_vector_file_attributes(
+    vector_store_id: str,
+    vector_files: list[dict[str, Any]],
+    flags_by_file_id: dict[str, tuple[bool, bool]],
+) -> int:
+    # Only files whose attributes drift from the registry are written; other attributes
+    # on the file are kept because the update replaces the whole set.
+    pending: dict[str, dict[str, Any]] = {}
+    for item in vector_files:
+        file_id = str(item.get("file_id") or "").strip()
+        flags = flags_by_file_id.get(file_id)
+        if flags is None:
+            continue
+        current = dict(item.get("attributes") or {})
+        desired = {**current, **source_file_attributes(enabled=flags[0], verified=flags[1])}
+        if desired != current:
+            pending[file_id] = desired
+    if not pending:
+        return 0
+    results = await update_vector_store_file_attributes(
+        vector_store_id=vector_store_id,
+        attributes_by_file_id=pending,
+    )
+    return sum(1 for ok in results.values() if ok)
+
+
+def _invalidate_filtered_search_cache(vector_store_id: str) -> None:
+    # Only attribute-filtered searches depend on file attributes. Unfiltered results are
+    # filtered by the policy after the cache, so enable/verify toggles must not evict them.
+    if settings.VECTOR_SEARCH_ATTRIBUTE_FILTERS:
+        invalidate_vector_store_search_cache(vector_store_id)
+
+
+async def _push_source_attributes_after_update(source: Any) -> None:
+    vector_store_id = settings.OPENAI_VECTOR_STORE_ID
+    file_id = str(source.source_ref or "").strip()
+    if not vector_store_id or not file_id:
+        return
+    try:
+        current = await get_vector_store_file_attributes(vector_store_id=vector_store_id, file_id=file_id)
+        pushed = await _push_vector_file_attributes(
+            vector_store_id,
+            [{"file_id": file_id, "attributes": current}],
+            {file_id: (bool(source.enabled), bool(source.verified))},
+        )
+    except Exception:
+        # The registry change is committed either way; the next sync retries the push
+        # and the client-side policy check still applies meanwhile.
+        return
+    if pushed:
+        _invalidate_filtered_search_cache(vector_store_id)
+
+
 async def list_vector_store_knowledge_sources_service(
     db: AsyncSession,
     *,
@@ -179,20 +336,22 @@ async def create_knowledge_source_service(
     admin_user_id: int,
     payload: KnowledgeSourceCreate,
 ) -> KnowledgeSourceOut:
-    source = await create_knowledge_source(
-        db,
-        title=_clean_required(payload.title, "title"),
-        source_type=_clean_required(payload.source_type, "source_type"),
-        source_ref=_clean_required(payload.source_ref, "source_ref"),
-        enabled=bool(payload.enabled),
-        verified=bool(payload.verified),
-    )
-    await create_knowledge_source_audit(
-        db,
-        admin_user_id=admin_user_id,
-        action="add",
-        source_id=source.id,
-    )
+    async with unit_of_work(db):
+        source = await create_knowledge_source(
+            db,
+            title=_clean_required(payload.title, "title"),
+            source_type=_clean_required(payload.source_type, "source_type"),
+            source_ref=_clean_required(payload.source_ref, "source_ref"),
+            enabled=bool(payload.enabled),
+            verified=bool(payload.verified),
+        )
+        await create_knowledge_source_audit(
+            db,
+            admin_user_id=admin_user_id,
+            action="add",
+            source_id=source.id,
+        )
+        await _mark_registry_changed(db)
     return KnowledgeSourceOut.model_validate(source)
 
 
@@ -213,46 +372,53 @@ async def update_knowledge_source_service(
     old_type = source.source_type
     old_ref = source.source_ref
 
-    updated = await update_knowledge_source(
-        db,
-        source,
-        title=_clean_required(payload.title, "title") if payload.title is not None else None,
-        source_type=(
-            _clean_required(payload.source_type, "source_type")
-            if payload.source_type is not None
-            else None
-        ),
-        source_ref=(
-            _clean_required(payload.source_ref, "source_ref")
-            if payload.source_ref is not None
-            else None
-        ),
-        enabled=payload.enabled,
-        verified=payload.verified,
-    )
-
-    audit_actions: list[str] = []
-    if payload.enabled is not None and old_enabled != bool(updated.enabled):
-        audit_actions.append("enable" if updated.enabled else "disable")
-    if payload.verified is not None and old_verified != bool(updated.verified):
-        audit_actions.append("verify" if updated.verified else "unverify")
-    if (
-        (payload.title is not None and old_title != updated.title)
-        or (payload.source_type is not None and old_type != updated.source_type)
-        or (payload.source_ref is not None and old_ref != updated.source_ref)
-    ):
-        audit_actions.append("update")
-    if not audit_actions:
-        audit_actions.append("update")
-
-    for action in audit_actions:
-        await create_knowledge_source_audit(
+    # The change and its audit rows commit together.
+    async with unit_of_work(db):
+        updated = await update_knowledge_source(
             db,
-            admin_user_id=admin_user_id,
-            action=action,
-            source_id=updated.id,
+            source,
+            title=_clean_required(payload.title, "title") if payload.title is not None else None,
+            source_type=(
+                _clean_required(payload.source_type, "source_type")
+                if payload.source_type is not None
+                else None
+            ),
+            source_ref=(
+                _clean_required(payload.source_ref, "source_ref")
+                if payload.source_ref is not None
+                else None
+            ),
+            enabled=payload.enabled,
+            verified=payload.verified,
         )
 
+        audit_actions: list[str] = []
+        if payload.enabled is not None and old_enabled != bool(updated.enabled):
+            audit_actions.append("enable" if updated.enabled else "disable")
+        if payload.verified is not None and old_verified != bool(updated.verified):
+            audit_actions.append("verify" if updated.verified else "unverify")
+        if (
+            (payload.title is not None and old_title != updated.title)
+            or (payload.source_type is not None and old_type != updated.source_type)
+            or (payload.source_ref is not None and old_ref != updated.source_ref)
+        ):
+            audit_actions.append("update")
+        if not audit_actions:
+            audit_actions.append("update")
+
+        for action in audit_actions:
+            await create_knowledge_source_audit(
+                db,
+                admin_user_id=admin_user_id,
+                action=action,
+                source_id=updated.id,
+            )
+        await _mark_registry_changed(db)
+
+    flags_changed = old_enabled != bool(updated.enabled) or old_verified != bool(updated.verified)
+    if flags_changed and (updated.source_type or "").strip().lower() == VECTOR_STORE_FILE_SOURCE_TYPE:
+        await _push_source_attributes_after_update(updated)
+
     return KnowledgeSourceOut.model_validate(updated)
 
 
@@ -266,14 +432,16 @@ async def delete_knowledge_source_service(
     if not source:
         raise HTTPException(status_code=404, detail="Knowledge source not found")
 
-    # Record action before deletion.
-    await create_knowledge_source_audit(
-        db,
-        admin_user_id=admin_user_id,
-        action="remove",
-        source_id=source.id,
-    )
-    await delete_knowledge_source(db, source)
+    async with unit_of_work(db):
+        # Record action before deletion.
+        await create_knowledge_source_audit(
+            db,
+            admin_user_id=admin_user_id,
+            action="remove",
+            source_id=source.id,
+        )
+        await delete_knowledge_source(db, source)
+        await _mark_registry_changed(db)
 
 
 async def reindex_knowledge_sources_service(
@@ -282,20 +450,25 @@ async def reindex_knowledge_sources_service(
     admin_user_id: int,
 ) -> KnowledgeSourceReindexOut:
     sync_stats = await _sync_knowledge_sources_from_vector_store(db)
-    counts = await get_knowledge_source_counts(db)
-    await create_knowledge_source_audit(
-        db,
-        admin_user_id=admin_user_id,
-        action="reindex",
-        source_id=None,
-    )
+    # Reindex is the explicit "start fresh" action: always drop cached search results.
+    invalidate_vector_store_search_cache(settings.OPENAI_VECTOR_STORE_ID)
+    async with unit_of_work(db):
+        counts = await get_knowledge_source_counts(db)
+        await create_knowledge_source_audit(
+            db,
+            admin_user_id=admin_user_id,
+            action="reindex",
+            source_id=None,
+        )
     return KnowledgeSourceReindexOut(
         ok=True,
         message=(
             f"Synced vector store ({settings.OPENAI_VECTOR_STORE_ID}) files into knowledge source controls "
             f"(discovered={sync_stats['discovered']}, created={sync_stats['created']}, "
             f"updated={sync_stats['updated']}, removed={sync_stats['removed']}, "
-            f"auto_attached={sync_stats['auto_attached']}). "
+            f"auto_attached={sync_stats['auto_attached']}, "
+            f"auto_attach_failed={sync_stats['auto_attach_failed']}, "
+            f"attributes_updated={sync_stats['attributes_updated']}). "
             "No local embedding pipeline exists in this repo; filter changes apply immediately."
         ),
         total_sources=counts["total"],
@@ -306,8 +479,7 @@ async def reindex_knowledge_sources_service(
     )
 
 
-async def get_knowledge_source_filter_policy(db: AsyncSession) -> dict[str, Any]:
-    rows = await list_knowledge_sources(db)
+def compile_source_filter_policy(rows: list[Any], *, version: int) -> SourceFilterPolicy:
     vector_store_rows = [
         row for row in rows if (row.source_type or "").strip().lower() == VECTOR_STORE_FILE_SOURCE_TYPE
     ]
@@ -317,7 +489,7 @@ async def get_knowledge_source_filter_policy(db: AsyncSession) -> dict[str, Any]
     enabled_refs: set[str] = set()
     verified_refs: set[str] = set()
     for row in rows_for_policy:
-        normalized_ref = _normalize_source_ref(row.source_ref)
+        normalized_ref = normalize_source_key(row.source_ref)
         if not normalized_ref:
             continue
         if row.enabled:
@@ -325,12 +497,88 @@ async def get_knowledge_source_filter_policy(db: AsyncSession) -> dict[str, Any]
             if row.verified:
                 verified_refs.add(normalized_ref)
 
-    return {
-        "has_registry_rows": bool(rows_for_policy),
-        "enabled_refs": enabled_refs,
-        "verified_refs": verified_refs,
-        "strict_verified_only": bool(settings.STRICT_VERIFIED_ONLY),
-        "source_scope": (
+    return SourceFilterPolicy(
+        version=version,
+        has_registry_rows=bool(rows_for_policy),
+        enabled_refs=frozenset(enabled_refs),
+        verified_refs=frozenset(verified_refs),
+        strict_verified_only=bool(settings.STRICT_VERIFIED_ONLY),
+        source_scope=(
             "vector_store_file_only" if vector_store_rows else "all_knowledge_sources"
         ),
+    )
+
+
+class _SourcePolicyCache:
+    """
+    Process-wide compiled policy. Within SOURCE_POLICY_VERSION_CHECK_SECONDS it is
+    returned without touching the database; after that one primary-key lookup of
+    the version row decides whether the registry has to be reloaded.
+    """
+
+    def __init__(self) -> None:
+        self.policy: SourceFilterPolicy | None = None
+        self.checked_at = float("-inf")
+        self.lock = asyncio.Lock()
+        self.metrics = {"hits": 0, "version_checks": 0, "rebuilds": 0}
+
+    def fresh(self) -> SourceFilterPolicy | None:
+        if self.policy is None:
+            return None
+        if time.monotonic() - self.checked_at >= settings.SOURCE_POLICY_VERSION_CHECK_SECONDS:
+            return None
+        return self.policy
+
+    def invalidate(self) -> None:
+        self.checked_at = float("-inf")
+
+
+_source_policy_cache = _SourcePolicyCache()
+
+
+def invalidate_source_filter_policy() -> None:
+    """Forces a version check on the next lookup (the change itself bumps the version row)."""
+    _source_policy_cache.invalidate()
+
+
+async def get_source_filter_policy() -> SourceFilterPolicy:
+    cache = _source_policy_cache
+    policy = cache.fresh()
+    if policy is not None:
+        cache.metrics["hits"] += 1
+        return policy
+
+    async with cache.lock:
+        policy = cache.fresh()
+        if policy is not None:
+            cache.metrics["hits"] += 1
+            return policy
+        # Own session: this runs alongside other queries on the request session.
+        async with AsyncSessionLocal() as db:
+            cache.metrics["version_checks"] += 1
+            # Version first: a change committed between the two reads only causes an
+            # extra rebuild on the next check, never a stale policy under a new version.
+            version = await get_knowledge_source_policy_version(db)
+            if cache.policy is None or cache.policy.version != version:
+                rows = await list_knowledge_sources(db)
+                cache.policy = compile_source_filter_policy(rows, version=version)
+                cache.metrics["rebuilds"] += 1
+        cache.checked_at = time.monotonic()
+        return cache.policy
+
+
+def get_source_filter_policy_stats() -> dict[str, Any]:
+    policy = _source_policy_cache.policy
+    return {
+        **_source_policy_cache.metrics,
+        "version": policy.version if policy is not None else None,
+        "enabled_refs": len(policy.enabled_refs) if policy is not None else 0,
+        "verified_refs": len(policy.verified_refs) if policy is not None else 0,
+        "check_interval_seconds": settings.SOURCE_POLICY_VERSION_CHECK_SECONDS,
     }
+
+
+async def _mark_registry_changed(db: AsyncSession) -> None:
+    # Same transaction as the change; this worker drops its policy once it commits.
+    await bump_knowledge_source_policy_version(db)
+    await run_after_commit(db, invalidate_source_filter_policy)
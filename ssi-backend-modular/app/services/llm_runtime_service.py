@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.core.openai_client import (
+    get_resilience_stats,
+    get_response_cache_stats,
+    get_retrieval_stats,
+    get_scheduler_stats,
+    get_search_cache_stats,
+    get_single_flight_stats,
+    get_token_usage_stats,
+)
+from app.services.knowledge_source_service import get_source_filter_policy_stats
+
+
+def get_llm_runtime_stats() -> dict[str, Any]:
+    return {
+        "scheduler": get_scheduler_stats(),
+        "resilience": get_resilience_stats(),
+        "response_cache": get_response_cache_stats(),
+        "vector_search_cache": get_search_cache_stats(),
+        "retrieval": get_retrieval_stats(),
+        "single_flight": get_single_flight_stats(),
+        "token_usage": get_token_usage_stats(),
+        "source_filter_policy": get_source_filter_policy_stats(),
+    }
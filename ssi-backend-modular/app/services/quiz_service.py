@@ -10,7 +10,8 @@ from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.openai_client import generate_structured_text
+from app.core.openai_client import PRIORITY_QUIZ, generate_structured_text
+from app.db.unit_of_work import unit_of_work
 from app.models import Flashcard
 from app.schemas import (
     QuizCreate,
@@ -202,13 +203,14 @@ async def create_quiz_for_user(
 ) -> QuizOut:
     await ensure_user_exists(db, user_id)
     try:
-        quiz = await create_quiz_with_questions(
-            db,
-            user_id=user_id,
-            title=payload.title,
-            flashcard_ids=payload.flashcard_ids,
-            source_type="flashcards",
-        )
+        async with unit_of_work(db):
+            quiz = await create_quiz_with_questions(
+                db,
+                user_id=user_id,
+                title=payload.title,
+                flashcard_ids=payload.flashcard_ids,
+                source_type="flashcards",
+            )
     except ValueError as e:
         raise HTTPException(400, str(e))
 
@@ -248,6 +250,10 @@ async def create_auto_mcq_quiz_for_user(
             messages_for_model=_build_mcq_prompt(flashcards_for_model),
             response_model=MCQQuizPlan,
             model_name="gpt-4o-mini",
+            # Low temperature makes the plan deterministic, so re-quizzing the same
+            # flashcard set is served from the response cache.
+            temperature=0.2,
+            priority=PRIORITY_QUIZ,
         )
     except Exception as exc:
         raise HTTPException(502, "Failed to generate MCQ quiz") from exc
@@ -255,37 +261,36 @@ async def create_auto_mcq_quiz_for_user(
     _validate_mcq_plan(plan, requested_ids)
     plan_by_flashcard_id = {q.flashcard_id: q for q in plan.questions}
 
-    quiz = await create_quiz_with_questions(
-        db,
-        user_id=user_id,
-        title=payload.title or (plan.title or "MCQ Quiz"),
-        flashcard_ids=requested_ids,
-        source_type="mcq_from_flashcards",
-    )
+    # Quiz rows and the MCQ options commit together; a mapping error leaves no half-built quiz.
+    async with unit_of_work(db):
+        quiz = await create_quiz_with_questions(
+            db,
+            user_id=user_id,
+            title=payload.title or (plan.title or "MCQ Quiz"),
+            flashcard_ids=requested_ids,
+            source_type="mcq_from_flashcards",
+        )
 
-    questions = await list_questions_for_quiz(db, quiz.id)
-    for db_question in questions:
-        card = card_by_id[db_question.flashcard_id]
-        plan_question = plan_by_flashcard_id.get(db_question.flashcard_id)
-        if plan_question is None:
-            raise HTTPException(502, "MCQ generation failed: question mapping missing")
+        questions = await list_questions_for_quiz(db, quiz.id)
+        for db_question in questions:
+            card = card_by_id[db_question.flashcard_id]
+            plan_question = plan_by_flashcard_id.get(db_question.flashcard_id)
+            if plan_question is None:
+                raise HTTPException(502, "MCQ generation failed: question mapping missing")
 
-        # Keep the exact flashcard answer as source of truth.
-        options_payload = _build_randomized_options(plan_question, card.answer)
+            # Keep the exact flashcard answer as source of truth.
+            options_payload = _build_randomized_options(plan_question, card.answer)
 
-        option_texts = [opt["text"].strip().lower() for opt in options_payload["options"]]
-        if len(option_texts) != len(set(option_texts)) or len(option_texts) < 4:
-            raise HTTPException(502, "MCQ generation failed: options must be 4 unique values")
+            option_texts = [opt["text"].strip().lower() for opt in options_payload["options"]]
+            if len(option_texts) != len(set(option_texts)) or len(option_texts) < 4:
+                raise HTTPException(502, "MCQ generation failed: options must be 4 unique values")
 
-        db_question.question_text = card.question
-        db_question.correct_answer = card.answer
-        db_question.mcq_options = options_payload
-        db.add(db_question)
+            db_question.question_text = card.question
+            db_question.correct_answer = card.answer
+            db_question.mcq_options = options_payload
+            db.add(db_question)
 
-    await db.commit()
-    for db_question in questions:
-        await db.refresh(db_question)
-    await db.refresh(quiz)
+        await db.flush()
 
     return QuizDetailOut(
         quiz=QuizOut.model_validate(quiz),
@@ -339,7 +344,8 @@ async def answer_quiz_question_service(
     if question.quiz_id != quiz.id:
         raise HTTPException(400, "Question does not belong to this quiz")
 
-    question = await save_question_answer(db, question, payload.user_answer)
-    await recompute_quiz_score(db, quiz)
+    async with unit_of_work(db):
+        question = await save_question_answer(db, question, payload.user_answer)
+        await recompute_quiz_score(db, quiz)
 
     return QuizQuestionOut.model_validate(question)
@@ -12,6 +12,7 @@ from app.repositories.user_repository import (
     create_user,
 )
 from app.core.security import hash_password, verify_password
+from app.db.unit_of_work import unit_of_work
 
 
 async def get_user_or_404(db: AsyncSession, user_id: int):
@@ -36,12 +37,13 @@ async def register_user(db: AsyncSession, payload: UserCreate) -> UserOut:
         raise HTTPException(status_code=400, detail="Email already registered.")
 
     pw_hash = hash_password(payload.password)
-    user = await create_user(
-        db,
-        email=normalized_email,
-        name=payload.name,
-        password_hash=pw_hash,
-    )
+    async with unit_of_work(db):
+        user = await create_user(
+            db,
+            email=normalized_email,
+            name=payload.name,
+            password_hash=pw_hash,
+        )
     return UserOut.model_validate(user)
 
 
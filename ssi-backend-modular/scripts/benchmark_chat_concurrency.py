@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import app.core.openai_client as openai_client
+from app.db.session import AsyncSessionLocal
+from app.schemas.chat_schema import ChatSessionCreate, MessageCreate
+from app.services.chat_service import create_chat_session_for_user, send_message_and_get_reply
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Send N overlapping chat messages through send_message_and_get_reply against a fake "
+            "OpenAI client with fixed latency, and check that they finish in about the time of one."
+        )
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        required=True,
+        help="Existing user id that owns the benchmark chat sessions.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of overlapping send_message calls.",
+    )
+    parser.add_argument(
+        "--fake-latency-seconds",
+        type=float,
+        default=1.0,
+        help="Simulated upstream latency for each model/search call.",
+    )
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=2.0,
+        help="Fail if concurrent wall time exceeds this multiple of a single call.",
+    )
+    return parser.parse_args()
+
+
+class _FakeResponses:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+        self.calls = 0
+
+    async def parse(self, *, model: str, input: Any, text_format: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        fields: dict[str, Any] = {"assistant_text": "Benchmark reply.", "flashcards": []}
+        if "suggested_title" in text_format.model_fields:
+            fields["suggested_title"] = "Benchmark chat title"
+        parsed = text_format(**fields)
+        return SimpleNamespace(output_parsed=parsed)
+
+
+class _FakeChatCompletions:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+        self.calls = 0
+
+    async def create(self, *, model: str, messages: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        message = SimpleNamespace(content="Benchmark chat title")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class _FakeVectorStores:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+        self.calls = 0
+
+    async def search(self, *, vector_store_id: str, query: str, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        return SimpleNamespace(data=[], search_query=query)
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, latency: float) -> None:
+        self.responses = _FakeResponses(latency)
+        self.chat = SimpleNamespace(completions=_FakeChatCompletions(latency))
+        self.vector_stores = _FakeVectorStores(latency)
+
+
+async def _send_once(user_id: int, chat_id: int, content: str) -> float:
+    # Each concurrent request gets its own session, exactly like separate HTTP requests.
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await send_message_and_get_reply(
+            db,
+            user_id=user_id,
+            chat_id=chat_id,
+            payload=MessageCreate(content=content),
+        )
+        return time.perf_counter() - started
+
+
+async def _create_chat(user_id: int, title: str) -> int:
+    async with AsyncSessionLocal() as db:
+        # Non-default title so the auto-title round-trip does not skew the timing.
+        chat = await create_chat_session_for_user(
+            db,
+            user_id=user_id,
+            payload=ChatSessionCreate(title=title),
+        )
+        return chat.id
+
+
+async def _async_main() -> int:
+    args = _parse_args()
+    if args.concurrency <= 0:
+        raise ValueError("--concurrency must be greater than zero.")
+
+    openai_client.client = _FakeAsyncOpenAI(args.fake_latency_seconds)
+
+    chat_ids = [
+        await _create_chat(args.user_id, f"Concurrency benchmark #{idx}")
+        for idx in range(args.concurrency + 1)
+    ]
+
+    single_seconds = await _send_once(args.user_id, chat_ids[0], "Single baseline question")
+
+    started = time.perf_counter()
+    per_call = await asyncio.gather(
+        *[
+            _send_once(args.user_id, chat_id, f"Concurrent question #{idx}")
+            for idx, chat_id in enumerate(chat_ids[1:], start=1)
+        ]
+    )
+    wall_seconds = time.perf_counter() - started
+    ratio = wall_seconds / single_seconds if single_seconds > 0 else float("inf")
+
+    print(f"Single call:          {single_seconds:.3f}s")
+    print(f"{args.concurrency} overlapping calls: {wall_seconds:.3f}s wall")
+    print(f"Slowest overlapping:  {max(per_call):.3f}s")
+    print(f"Wall / single ratio:  {ratio:.2f} (limit {args.max_ratio:.2f})")
+
+    if ratio > args.max_ratio:
+        print("FAIL: overlapping calls were serialized; the event loop is being blocked.")
+        return 1
+    print("OK: overlapping calls ran concurrently.")
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(_async_main())
+    except Exception as exc:
+        print(f"Benchmark failed: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.retrieval.chunking import Chunk
+from app.retrieval.dense_index import EMBEDDINGS_FILE, DenseIndex, build_dense_index
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Recall@k and latency of the local dense index (IVF probes, float32 vs int8) against "
+            "an exact float32 brute-force scan. Uses a synthetic clustered corpus unless --index "
+            "points at a built index, in which case that index's exact scan is the baseline."
+        )
+    )
+    parser.add_argument("--index", type=Path, default=None, help="Benchmark an existing dense index directory.")
+    parser.add_argument("--chunks", type=int, default=20000, help="Synthetic corpus size.")
+    parser.add_argument("--dimensions", type=int, default=256, help="Synthetic vector dimensions.")
+    parser.add_argument("--clusters", type=int, default=64, help="Topics in the synthetic corpus.")
+    parser.add_argument("--ivf-lists", type=int, default=None, help="Inverted lists (default: sqrt(chunks)).")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated probe counts to measure.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10, help="Results per query (the k in recall@k).")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def _synthetic_corpus(args: argparse.Namespace, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.normal(size=(args.clusters, args.dimensions))
+    labels = rng.integers(args.clusters, size=args.chunks)
+    matrix = centers[labels] + 0.6 * rng.normal(size=(args.chunks, args.dimensions))
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _queries_near(matrix: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    # Paraphrase-like queries: a corpus vector plus noise of comparable magnitude.
+    rows = matrix[rng.integers(len(matrix), size=count)].astype(np.float32)
+    noise = rng.normal(size=rows.shape).astype(np.float32)
+    noise *= 0.8 * np.linalg.norm(rows, axis=1, keepdims=True) / np.linalg.norm(noise, axis=1, keepdims=True)
+    return rows + noise
+
+
+def _exact_top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> List[set[int]]:
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = normalized @ matrix.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(int(i) for i in row) for row in top]
+
+
+def _measure(
+    index: DenseIndex,
+    queries: np.ndarray,
+    truth: Sequence[set[int]],
+    *,
+    k: int,
+    nprobe: int,
+    exact: bool,
+) -> Tuple[float, float, float]:
+    latencies: List[float] = []
+    found = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = index.search(query, limit=k, nprobe=nprobe, exact=exact)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        found += len(expected & {hit.chunk_id for hit in hits})
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return found / (k * len(truth)), statistics.median(latencies), p95
+
+
+def _print_rows(rows: List[Tuple[str, str, float, float, float, Optional[int]]]) -> None:
+    print(f"{'index':<12} {'scan':<12} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'vectors MB':>11}")
+    for name, scan, recall, p50, p95, size in rows:
+        size_text = f"{size / 1e6:.1f}" if size is not None else "-"
+        print(f"{name:<12} {scan:<12} {recall:>9.3f} {p50:>8.2f} {p95:>8.2f} {size_text:>11}")
+
+
+def _benchmark_existing(args: argparse.Namespace, rng: np.random.Generator, probes: List[int]) -> None:
+    index = DenseIndex(args.index)
+    stored = np.load(args.index / EMBEDDINGS_FILE, mmap_mode="r")
+    queries = _queries_near(np.asarray(stored, dtype=np.float32), args.queries, rng)
+    truth = [{hit.chunk_id for hit in index.search(query, limit=args.k, exact=True)} for query in queries]
+    size = (args.index / EMBEDDINGS_FILE).stat().st_size
+    name = str(index.manifest.get("dtype"))
+    rows = [(name, "exact", *_measure(index, queries, truth, k=args.k, nprobe=1, exact=True), size)]
+    if index.ivf_lists:
+        for nprobe in probes:
+            rows.append(
+                (name, f"ivf/{nprobe}", *_measure(index, queries, truth, k=args.k, nprobe=nprobe, exact=False), size)
+            )
+    print(f"{args.index}: {index.chunk_count} chunks, {index.dimensions} dims, {index.ivf_lists} lists")
+    _print_rows(rows)
+
+
+def main() -> int:
+    args = _parse_args()
+    rng = np.random.default_rng(args.seed)
+    probes = [int(value) for value in args.nprobe.split(",") if value.strip()]
+    if args.index is not None:
+        _benchmark_existing(args, rng, probes)
+        return 0
+
+    matrix = _synthetic_corpus(args, rng)
+    queries = _queries_near(matrix, args.queries, rng)
+    truth = _exact_top_k(matrix, queries, args.k)
+    chunks = [Chunk(file_id=f"file-{i % 50}", filename=f"file-{i % 50}.pdf", text=f"chunk {i}") for i in range(len(matrix))]
+    n_lists = args.ivf_lists if args.ivf_lists is not None else int(np.sqrt(len(matrix)))
+    print(f"Synthetic corpus: {len(matrix)} chunks, {args.dimensions} dims, {n_lists} lists, {args.queries} queries")
+
+    rows: List[Tuple[str, str, float, float, float, Optional[int]]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for dtype in ("float32", "int8"):
+            directory = Path(workdir) / dtype
+            started = time.perf_counter()
+            build_dense_index(
+                chunks,
+                matrix,
+                directory,
+                embedder={"name": "synthetic", "dimensions": args.dimensions},
+                dtype=dtype,
+                n_lists=n_lists,
+            )
+            print(f"built {dtype} index in {time.perf_counter() - started:.1f}s")
+            index = DenseIndex(directory)
+            size = (directory / EMBEDDINGS_FILE).stat().st_size
+            rows.append((dtype, "exact", *_measure(index, queries, truth, k=args.k, nprobe=1, exact=True), size))
+            for nprobe in probes:
+                if nprobe >= n_lists:
+                    continue
+                rows.append(
+                    (dtype, f"ivf/{nprobe}", *_measure(index, queries, truth, k=args.k, nprobe=nprobe, exact=False), size)
+                )
+            index.close()
+    _print_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
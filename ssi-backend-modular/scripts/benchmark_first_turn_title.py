@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, List
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import app.core.openai_client as openai_client
+from app.services.chat_service import (
+    AssistantStructuredResponse,
+    AssistantStructuredResponseWithTitle,
+    _generate_chat_title,
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare first-turn model latency with a separate title call (answer, then title) "
+            "against the folded structured response that returns suggested_title with the answer."
+        )
+    )
+    parser.add_argument("--iterations", type=int, default=10, help="First turns to simulate per variant.")
+    parser.add_argument(
+        "--answer-latency-ms",
+        type=float,
+        default=1500.0,
+        help="Simulated latency of the structured answer call.",
+    )
+    parser.add_argument(
+        "--title-latency-ms",
+        type=float,
+        default=600.0,
+        help="Simulated latency of the separate title call.",
+    )
+    parser.add_argument(
+        "--title-overhead-ms",
+        type=float,
+        default=40.0,
+        help="Extra latency charged to the folded call for generating the title tokens.",
+    )
+    return parser.parse_args()
+
+
+class _FakeResponses:
+    def __init__(self, latency: float, title_overhead: float) -> None:
+        self._latency = latency
+        self._title_overhead = title_overhead
+        self.calls = 0
+
+    async def parse(self, *, model: str, input: Any, text_format: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        fields: dict[str, Any] = {"assistant_text": "Benchmark reply.", "flashcards": []}
+        latency = self._latency
+        if "suggested_title" in text_format.model_fields:
+            fields["suggested_title"] = "Benchmark chat title"
+            latency += self._title_overhead
+        await asyncio.sleep(latency)
+        return SimpleNamespace(output_parsed=text_format(**fields))
+
+
+class _FakeChatCompletions:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+        self.calls = 0
+
+    async def create(self, *, model: str, messages: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        message = SimpleNamespace(content="Benchmark chat title")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, answer_latency: float, title_latency: float, title_overhead: float) -> None:
+        self.responses = _FakeResponses(answer_latency, title_overhead)
+        self.chat = SimpleNamespace(completions=_FakeChatCompletions(title_latency))
+
+
+def _messages(idx: int) -> List[dict]:
+    return [
+        {"role": "system", "content": "Benchmark system prompt."},
+        {"role": "user", "content": f"First question #{idx} about skin antisepsis"},
+    ]
+
+
+async def _separate_title_turn(idx: int) -> str:
+    structured = await openai_client.generate_structured_text(
+        messages_for_model=_messages(idx),
+        response_model=AssistantStructuredResponse,
+    )
+    return await _generate_chat_title([f"First question #{idx} about skin antisepsis"], structured.assistant_text)
+
+
+async def _folded_title_turn(idx: int) -> str:
+    structured = await openai_client.generate_structured_text(
+        messages_for_model=_messages(idx),
+        response_model=AssistantStructuredResponseWithTitle,
+    )
+    return structured.suggested_title
+
+
+async def _measure(label: str, iterations: int, turn: Callable[[int], Awaitable[str]], fake: _FakeAsyncOpenAI) -> float:
+    fake.responses.calls = 0
+    fake.chat.completions.calls = 0
+    timings: List[float] = []
+    for idx in range(iterations):
+        # Every turn is a distinct conversation; never answer from the response cache.
+        openai_client.clear_response_cache()
+        started = time.perf_counter()
+        title = await turn(idx)
+        timings.append(time.perf_counter() - started)
+        if not title:
+            raise RuntimeError(f"{label}: no title produced")
+
+    median = statistics.median(timings)
+    print(label)
+    print(f"  model calls: {fake.responses.calls + fake.chat.completions.calls}")
+    print(f"  median first-turn latency: {median * 1000:.0f} ms")
+    print(f"  max first-turn latency:    {max(timings) * 1000:.0f} ms")
+    return median
+
+
+async def _async_main() -> int:
+    args = _parse_args()
+    if args.iterations <= 0:
+        raise ValueError("--iterations must be greater than zero.")
+
+    fake = _FakeAsyncOpenAI(
+        args.answer_latency_ms / 1000.0,
+        args.title_latency_ms / 1000.0,
+        args.title_overhead_ms / 1000.0,
+    )
+    openai_client.client = fake
+
+    separate = await _measure("Answer + separate title call", args.iterations, _separate_title_turn, fake)
+    folded = await _measure("Answer with suggested_title", args.iterations, _folded_title_turn, fake)
+
+    saved = separate - folded
+    print(f"First-turn latency saved: {saved * 1000:.0f} ms ({saved / separate * 100:.0f}%)")
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(_async_main())
+    except Exception as exc:
+        print(f"Benchmark failed: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
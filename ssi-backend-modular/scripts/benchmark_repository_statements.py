@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import event, func, select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import engine
+from app.models import Quiz, QuizQuestion
+from app.repositories.background_job_repository import create_background_job
+from app.repositories.chat_repository import (
+    create_chat_session,
+    create_message,
+    update_chat_session_title,
+)
+from app.repositories.flashcard_repository import (
+    create_flashcard,
+    set_flashcard_active_state,
+    update_flashcard_content,
+)
+from app.repositories.knowledge_source_repository import (
+    create_knowledge_source,
+    create_knowledge_source_audit,
+    update_knowledge_source,
+)
+from app.repositories.quiz_repository import (
+    create_quiz_with_questions,
+    list_questions_for_quiz,
+    recompute_quiz_score,
+    save_question_answer,
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Count the SQL statements each repository write issues, next to the count of the "
+            "old commit-then-refresh pattern. Everything runs in one transaction that is rolled "
+            "back at the end, so the database is left untouched."
+        )
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        required=True,
+        help="Existing user id that owns the temporary rows (also used as the audit admin id).",
+    )
+    return parser.parse_args()
+
+
+class _StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        self.count += 1
+
+
+async def _legacy_recompute_quiz_score(db: AsyncSession, quiz: Quiz) -> None:
+    # The previous implementation: aggregate SELECT, then UPDATE, then refresh().
+    res = await db.execute(
+        select(
+            func.count(QuizQuestion.id),
+            func.sum(case((QuizQuestion.is_correct.is_(True), 1), else_=0)),
+        ).where(QuizQuestion.quiz_id == quiz.id)
+    )
+    total, correct = res.one()
+    total = total or 0
+    correct = correct or 0
+    quiz.total_questions = total
+    quiz.correct_answers = correct
+    quiz.score_percent = float(correct) / total * 100 if total > 0 else 0.0
+    await db.flush()
+    await db.refresh(quiz)
+
+
+async def _measure(
+    db: AsyncSession,
+    counter: _StatementCounter,
+    operation: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, int]:
+    await db.flush()
+    before = counter.count
+    result = await operation()
+    await db.flush()
+    return result, counter.count - before
+
+
+async def _run(user_id: int) -> List[Tuple[str, int, int]]:
+    counter = _StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    rows: List[Tuple[str, int, int]] = []
+
+    async def record(name: str, operation: Callable[[], Awaitable[Any]]) -> Any:
+        result, current = await _measure(db, counter, operation)
+        # The old pattern issued the same write followed by a refresh() SELECT.
+        _, refresh = await _measure(db, counter, lambda: db.refresh(result))
+        rows.append((name, current, current + refresh))
+        return result
+
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            db = AsyncSession(bind=conn, expire_on_commit=False)
+            try:
+                chat = await record(
+                    "create_chat_session",
+                    lambda: create_chat_session(db, user_id=user_id, title="Statement benchmark", model_name="gpt-4o-mini"),
+                )
+                await record(
+                    "update_chat_session_title",
+                    lambda: update_chat_session_title(db, chat, title="Statement benchmark (renamed)"),
+                )
+                message = await record(
+                    "create_message",
+                    lambda: create_message(db, chat_id=chat.id, sender_role="user", content="Benchmark question"),
+                )
+                card = await record(
+                    "create_flashcard",
+                    lambda: create_flashcard(
+                        db,
+                        user_id=user_id,
+                        question="Benchmark question?",
+                        answer="Benchmark answer.",
+                        chat_session_id=chat.id,
+                        source_message_id=message.id,
+                    ),
+                )
+                await record(
+                    "update_flashcard_content",
+                    lambda: update_flashcard_content(db, card, answer="Benchmark answer (edited)."),
+                )
+                await record("set_flashcard_active_state", lambda: set_flashcard_active_state(db, card, False))
+                source = await record(
+                    "create_knowledge_source",
+                    lambda: create_knowledge_source(
+                        db,
+                        title="Statement benchmark source",
+                        source_type="manual",
+                        source_ref="statement-benchmark",
+                    ),
+                )
+                await record("update_knowledge_source", lambda: update_knowledge_source(db, source, verified=True))
+                await record(
+                    "create_knowledge_source_audit",
+                    lambda: create_knowledge_source_audit(db, admin_user_id=user_id, action="update", source_id=source.id),
+                )
+                await record(
+                    "create_background_job",
+                    lambda: create_background_job(db, kind="benchmark", payload="{}", max_attempts=1),
+                )
+                quiz = await record(
+                    "create_quiz_with_questions",
+                    lambda: create_quiz_with_questions(db, user_id=user_id, title="Benchmark", flashcard_ids=[card.id]),
+                )
+                question = (await list_questions_for_quiz(db, quiz.id))[0]
+                await record("save_question_answer", lambda: save_question_answer(db, question, "Benchmark answer."))
+
+                _, current = await _measure(db, counter, lambda: recompute_quiz_score(db, quiz))
+                _, legacy = await _measure(db, counter, lambda: _legacy_recompute_quiz_score(db, quiz))
+                rows.append(("recompute_quiz_score", current, legacy))
+            finally:
+                await db.close()
+                await trans.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+    return rows
+
+
+async def _async_main() -> int:
+    args = _parse_args()
+    rows = await _run(args.user_id)
+
+    width = max(len(name) for name, _, _ in rows)
+    print(f"{'operation'.ljust(width)}  statements  commit+refresh")
+    for name, current, legacy in rows:
+        print(f"{name.ljust(width)}  {current:>10}  {legacy:>14}")
+    total_current = sum(current for _, current, _ in rows)
+    total_legacy = sum(legacy for _, _, legacy in rows)
+    print(f"{'total'.ljust(width)}  {total_current:>10}  {total_legacy:>14}")
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(_async_main())
+    except Exception as exc:
+        print(f"Benchmark failed: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import app.core.openai_client as openai_client
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the legacy five-pass vector-store listing (files.retrieve per file per pass) "
+            "with the single-pass listing, against a fake client that counts upstream calls."
+        )
+    )
+    parser.add_argument("--files", type=int, default=300, help="Number of files in the fake vector store.")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=20.0,
+        help="Simulated latency of every upstream call.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Bounded parallelism for filename lookups in the new listing.",
+    )
+    return parser.parse_args()
+
+
+class _FakeVectorStoreFiles:
+    def __init__(self, owner: "_FakeAsyncOpenAI") -> None:
+        self._owner = owner
+
+    async def list(
+        self,
+        *,
+        vector_store_id: str,
+        limit: int = 100,
+        order: str = "desc",
+        after: Optional[str] = None,
+        filter: Optional[str] = None,
+    ) -> Any:
+        await self._owner.call("vector_stores.files.list")
+        rows = [
+            row for row in self._owner.vector_store_rows if filter is None or row.status == filter
+        ]
+        start = 0
+        if after:
+            ids = [row.id for row in rows]
+            start = ids.index(after) + 1 if after in ids else len(rows)
+        return SimpleNamespace(data=rows[start : start + limit])
+
+
+class _FakeFiles:
+    def __init__(self, owner: "_FakeAsyncOpenAI") -> None:
+        self._owner = owner
+
+    async def retrieve(self, file_id: str) -> Any:
+        await self._owner.call("files.retrieve")
+        return SimpleNamespace(id=file_id, filename=f"guideline-{file_id}.pdf")
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, *, file_count: int, latency_seconds: float) -> None:
+        self.latency_seconds = latency_seconds
+        self.calls: Counter[str] = Counter()
+        statuses = ["completed"] * 8 + ["in_progress", "failed"]
+        self.vector_store_rows = [
+            SimpleNamespace(
+                id=f"vsf_{idx:05d}",
+                file_id=f"file_{idx:05d}",
+                status=statuses[idx % len(statuses)],
+                last_error=None,
+                usage_bytes=1024,
+                created_at=1_700_000_000 + idx,
+            )
+            for idx in range(file_count)
+        ]
+        self.vector_stores = SimpleNamespace(files=_FakeVectorStoreFiles(self))
+        self.files = _FakeFiles(self)
+
+    async def call(self, name: str) -> None:
+        self.calls[name] += 1
+        await asyncio.sleep(self.latency_seconds)
+
+
+async def _legacy_list_vector_store_files(client: Any, vector_store_id: str) -> List[Dict[str, Any]]:
+    """The pre-optimization algorithm: one pass per status filter, sequential retrieve per file."""
+    collected: Dict[str, Dict[str, Any]] = {}
+    for status_filter in [None, "in_progress", "completed", "failed", "cancelled"]:
+        after_cursor: Optional[str] = None
+        while True:
+            kwargs: Dict[str, Any] = {"vector_store_id": vector_store_id, "limit": 100, "order": "desc"}
+            if status_filter is not None:
+                kwargs["filter"] = status_filter
+            if after_cursor:
+                kwargs["after"] = after_cursor
+            page = await client.vector_stores.files.list(**kwargs)
+            items = list(page.data or [])
+            if not items:
+                break
+            for item in items:
+                file_obj = await client.files.retrieve(item.file_id)
+                collected[item.file_id] = {"file_id": item.file_id, "filename": file_obj.filename}
+            if len(items) < 100:
+                break
+            after_cursor = items[-1].id
+    return list(collected.values())
+
+
+async def _run(label: str, coro_factory, fake: _FakeAsyncOpenAI) -> int:
+    fake.calls.clear()
+    started = time.perf_counter()
+    files = await coro_factory()
+    elapsed = time.perf_counter() - started
+    total_calls = sum(fake.calls.values())
+    print(f"{label}")
+    print(f"  files listed: {len(files)}")
+    for name, count in sorted(fake.calls.items()):
+        print(f"  {name}: {count}")
+    print(f"  total upstream calls: {total_calls}")
+    print(f"  wall time: {elapsed:.2f}s")
+    return total_calls
+
+
+async def _async_main() -> int:
+    args = _parse_args()
+    fake = _FakeAsyncOpenAI(file_count=args.files, latency_seconds=args.latency_ms / 1000.0)
+    openai_client.client = fake
+    openai_client._filename_cache.clear()
+
+    legacy_calls = await _run(
+        "Legacy five-pass listing",
+        lambda: _legacy_list_vector_store_files(fake, "vs_benchmark"),
+        fake,
+    )
+    cold_calls = await _run(
+        "Single-pass listing (cold filename cache)",
+        lambda: openai_client.list_vector_store_files(
+            vector_store_id="vs_benchmark",
+            max_concurrency=args.max_concurrency,
+        ),
+        fake,
+    )
+    warm_calls = await _run(
+        "Single-pass listing (warm filename cache)",
+        lambda: openai_client.list_vector_store_files(
+            vector_store_id="vs_benchmark",
+            max_concurrency=args.max_concurrency,
+        ),
+        fake,
+    )
+
+    print(
+        f"Upstream calls: legacy={legacy_calls}, cold={cold_calls}, warm={warm_calls} "
+        f"({legacy_calls / max(1, warm_calls):.0f}x fewer when warm)"
+    )
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(_async_main())
+    except Exception as exc:
+        print(f"Benchmark failed: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.config import settings
+from app.core.openai_client import embed_texts, list_vector_store_files, read_vector_store_file_text
+from app.retrieval.chunking import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_OVERLAP,
+    Chunk,
+    SourceDocument,
+    chunk_documents,
+)
+from app.retrieval.dense_index import STORAGE_DTYPES, build_dense_index
+from app.retrieval.embedding import HASHING_EMBEDDER, OPENAI_EMBEDDER, HashingEmbedder
+from app.retrieval.lexical_index import build_lexical_index
+
+SOURCE_DIR_SUFFIXES = {".txt", ".md"}
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Build the local retrieval indexes (BM25 for RETRIEVAL_MODE=lexical_first, dense vectors "
+            "for dense_local). Documents come from the vector store's parsed file contents (default) "
+            "or from a directory of text files."
+        )
+    )
+    parser.add_argument(
+        "--vector-store-id",
+        default=settings.OPENAI_VECTOR_STORE_ID,
+        help="Vector store to read (default: OPENAI_VECTOR_STORE_ID).",
+    )
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        default=None,
+        help="Index .txt/.md files from this directory instead; the file name is used as file_id.",
+    )
+    parser.add_argument(
+        "--kind",
+        choices=["lexical", "dense", "all"],
+        default="lexical",
+        help="Which index to build.",
+    )
+    parser.add_argument(
+        "--lexical-output",
+        type=Path,
+        default=Path(settings.LEXICAL_INDEX_PATH),
+        help="BM25 index directory (default: LEXICAL_INDEX_PATH). Replaced atomically.",
+    )
+    parser.add_argument(
+        "--dense-output",
+        type=Path,
+        default=Path(settings.DENSE_INDEX_PATH),
+        help="Dense index directory (default: DENSE_INDEX_PATH). Replaced atomically.",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=[HASHING_EMBEDDER, OPENAI_EMBEDDER],
+        default=OPENAI_EMBEDDER,
+        help="openai embeds chunks and queries with --embedding-model; hashing is a local, "
+        "deterministic stand-in that needs no network at query time.",
+    )
+    parser.add_argument("--embedding-model", default="text-embedding-3-small")
+    parser.add_argument("--dimensions", type=int, default=512, help="Embedding dimensions.")
+    parser.add_argument("--dtype", choices=list(STORAGE_DTYPES), default="float32", help="Stored vector type.")
+    parser.add_argument(
+        "--ivf-lists",
+        type=int,
+        default=None,
+        help="Inverted lists for the dense index (0 = exact scan; default: sqrt(chunks) for large corpora).",
+    )
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Parallel file-content downloads.")
+    return parser.parse_args()
+
+
+def _documents_from_directory(source_dir: Path) -> List[SourceDocument]:
+    return [
+        SourceDocument(file_id=path.name, filename=path.name, text=path.read_text(encoding="utf-8", errors="replace"))
+        for path in sorted(source_dir.rglob("*"))
+        if path.is_file() and path.suffix.lower() in SOURCE_DIR_SUFFIXES
+    ]
+
+
+async def _documents_from_vector_store(vector_store_id: str, max_concurrency: int) -> List[SourceDocument]:
+    files = await list_vector_store_files(vector_store_id=vector_store_id)
+    completed = [item for item in files if str(item.get("status") or "").lower() == "completed"]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _read(item: dict) -> SourceDocument | None:
+        file_id = str(item["file_id"])
+        async with semaphore:
+            try:
+                text = await read_vector_store_file_text(vector_store_id=vector_store_id, file_id=file_id)
+            except Exception as exc:
+                print(f"  skipped {file_id}: {exc}")
+                return None
+        return SourceDocument(file_id=file_id, filename=str(item.get("filename") or file_id), text=text)
+
+    documents = await asyncio.gather(*[_read(item) for item in completed])
+    print(f"Read {len(completed)} of {len(files)} vector store files (only completed files are indexed).")
+    return [doc for doc in documents if doc is not None and doc.text.strip()]
+
+
+async def _embed_chunks(chunks: List[Chunk], args: argparse.Namespace) -> List[List[float]]:
+    texts = [chunk.text for chunk in chunks]
+    if args.embedder == HASHING_EMBEDDER:
+        return HashingEmbedder(args.dimensions).embed(texts)
+    return await embed_texts(texts, model=args.embedding_model, dimensions=args.dimensions)
+
+
+async def _async_main() -> int:
+    args = _parse_args()
+    started = time.perf_counter()
+    if args.source_dir is not None:
+        documents = _documents_from_directory(args.source_dir)
+        source = str(args.source_dir)
+    else:
+        if not args.vector_store_id:
+            print("No vector store configured; pass --vector-store-id or --source-dir.")
+            return 1
+        documents = await _documents_from_vector_store(args.vector_store_id, args.max_concurrency)
+        source = args.vector_store_id
+
+    chunks = chunk_documents(documents, max_chars=args.chunk_chars, overlap=args.chunk_overlap)
+    if not chunks:
+        print("No document text to index.")
+        return 1
+    outputs: List[Path] = []
+    if args.kind in {"lexical", "all"}:
+        build_lexical_index(chunks, args.lexical_output, source=source, document_count=len(documents))
+        outputs.append(args.lexical_output)
+    if args.kind in {"dense", "all"}:
+        embedder = {"name": args.embedder, "dimensions": args.dimensions}
+        if args.embedder == OPENAI_EMBEDDER:
+            embedder["model"] = args.embedding_model
+        vectors = await _embed_chunks(chunks, args)
+        build_dense_index(
+            chunks,
+            vectors,
+            args.dense_output,
+            embedder=embedder,
+            dtype=args.dtype,
+            n_lists=args.ivf_lists,
+            source=source,
+            document_count=len(documents),
+        )
+        outputs.append(args.dense_output)
+    print(
+        f"Indexed {len(documents)} documents as {len(chunks)} chunks into "
+        f"{', '.join(str(path) for path in outputs)} in {time.perf_counter() - started:.1f}s."
+    )
+    return 0
+
+
+def main() -> int:
+    try:
+        return asyncio.run(_async_main())
+    except Exception as exc:
+        print(f"Index build failed: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
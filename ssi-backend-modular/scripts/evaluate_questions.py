@@ -20,6 +20,7 @@ load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from app.core.llm_resilience import UpstreamUnavailableError
 from app.db.session import AsyncSessionLocal
 from app.repositories.flashcard_repository import list_user_flashcards
 from app.schemas.chat_schema import ChatSessionCreate, MessageCreate
@@ -85,8 +86,11 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--retrieval-retries",
         type=int,
-        default=2,
-        help="Number of retry attempts for vector-store retrieval failures per question.",
+        default=0,
+        help=(
+            "Number of extra retry attempts for vector-store retrieval failures per question. "
+            "The OpenAI gateway already retries transient errors with backoff, so this is off by default."
+        ),
     )
     parser.add_argument(
         "--retry-backoff-seconds",
@@ -309,7 +313,11 @@ def _extract_retrieved_chunks(evidence: dict[str, Any]) -> list[dict[str, Any]]:
 
 
 def _is_retriable_retrieval_failure(exc: Exception) -> bool:
+    if isinstance(exc, UpstreamUnavailableError):
+        return True
     if isinstance(exc, HTTPException):
+        if exc.status_code == 503:
+            return True
         if exc.status_code == 500 and "Vector store search failed" in str(exc.detail):
             return True
     message = str(exc)
@@ -391,6 +399,9 @@ async def _run_evaluation(
 
                         if retriable and attempt < max_attempts:
                             backoff_seconds = retry_backoff_seconds * (2 ** (attempt - 1))
+                            if isinstance(exc, UpstreamUnavailableError):
+                                # Waiting less than the open-circuit window would just be rejected again.
+                                backoff_seconds = max(backoff_seconds, exc.retry_after_seconds)
                             event["backoff_seconds"] = backoff_seconds
                             retry_events.append(event)
                             await asyncio.sleep(backoff_seconds)
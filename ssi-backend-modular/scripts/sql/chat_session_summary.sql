@@ -0,0 +1,8 @@
+-- Rolling conversation summary on chat sessions (PostgreSQL)
+-- Safe to run multiple times.
+
+ALTER TABLE chat_sessions
+ADD COLUMN IF NOT EXISTS summary TEXT;
+
+ALTER TABLE chat_sessions
+ADD COLUMN IF NOT EXISTS summary_message_id INTEGER;
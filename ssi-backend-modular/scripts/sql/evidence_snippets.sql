@@ -0,0 +1,65 @@
+-- Content-addressed retrieval evidence (PostgreSQL)
+-- Safe to run multiple times.
+
+CREATE TABLE IF NOT EXISTS evidence_snippets (
+    content_hash VARCHAR(64) PRIMARY KEY,
+    file_id VARCHAR(255),
+    filename TEXT,
+    snippet TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS ix_evidence_snippets_file_id ON evidence_snippets (file_id);
+
+CREATE TABLE IF NOT EXISTS message_evidence_links (
+    message_id INTEGER NOT NULL REFERENCES messages(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    content_hash VARCHAR(64) NOT NULL REFERENCES evidence_snippets(content_hash),
+    score DOUBLE PRECISION,
+    verified_match BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (message_id, rank)
+);
+
+CREATE INDEX IF NOT EXISTS ix_message_evidence_links_content_hash
+ON message_evidence_links (content_hash);
+
+-- Optional backfill of messages written before this change. Their evidence_source
+-- JSON keeps its embedded sources and stays readable; the links make them visible
+-- to the citations query. The hash matches snippet_content_hash():
+-- sha256(file_id || NUL || snippet).
+CREATE TEMP TABLE legacy_message_evidence AS
+SELECT
+    legacy.*,
+    encode(
+        sha256(
+            convert_to(COALESCE(file_id, ''), 'UTF8') || '\x00'::bytea || convert_to(snippet, 'UTF8')
+        ),
+        'hex'
+    ) AS content_hash
+FROM (
+    SELECT
+        m.id AS message_id,
+        s.ordinality::integer AS rank,
+        s.value->>'file_id' AS file_id,
+        s.value->>'filename' AS filename,
+        COALESCE(s.value->>'snippet', '') AS snippet,
+        (s.value->>'score')::double precision AS score,
+        COALESCE((s.value->>'verified_match')::boolean, FALSE) AS verified_match
+    FROM messages m
+    CROSS JOIN LATERAL jsonb_array_elements(m.evidence_source::jsonb->'sources')
+        WITH ORDINALITY AS s(value, ordinality)
+    WHERE m.evidence_source IS NOT NULL
+      AND m.evidence_source::jsonb ? 'sources'
+) AS legacy;
+
+INSERT INTO evidence_snippets (content_hash, file_id, filename, snippet)
+SELECT DISTINCT ON (content_hash) content_hash, file_id, filename, snippet
+FROM legacy_message_evidence
+ON CONFLICT (content_hash) DO NOTHING;
+
+INSERT INTO message_evidence_links (message_id, rank, content_hash, score, verified_match)
+SELECT message_id, rank, content_hash, score, verified_match
+FROM legacy_message_evidence
+ON CONFLICT (message_id, rank) DO NOTHING;
+
+DROP TABLE legacy_message_evidence;
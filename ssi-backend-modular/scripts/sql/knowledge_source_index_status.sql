@@ -0,0 +1,8 @@
+-- Vector-store ingestion status on knowledge sources (PostgreSQL)
+-- Safe to run multiple times.
+
+ALTER TABLE knowledge_sources
+ADD COLUMN IF NOT EXISTS index_status VARCHAR(20);
+
+ALTER TABLE knowledge_sources
+ADD COLUMN IF NOT EXISTS index_error TEXT;
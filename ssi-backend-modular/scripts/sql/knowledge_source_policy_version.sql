@@ -0,0 +1,15 @@
+-- Version row for the compiled knowledge-source filter policy (PostgreSQL)
+-- Safe to run multiple times.
+
+CREATE TABLE IF NOT EXISTS knowledge_source_policy_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc')
+);
+
+INSERT INTO knowledge_source_policy_version (id, version)
+VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+
+-- Force every worker to recompile after editing knowledge_sources by hand:
+-- UPDATE knowledge_source_policy_version SET version = version + 1, updated_at = NOW() AT TIME ZONE 'utc' WHERE id = 1;
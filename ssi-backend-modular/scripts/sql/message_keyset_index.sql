@@ -0,0 +1,13 @@
+-- Keyset pagination index for chat history (PostgreSQL)
+-- Safe to run multiple times. CONCURRENTLY avoids locking writes on large tables;
+-- run it outside a transaction block.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_chat_session_created_id
+ON messages (chat_session_id, created_at, id);
+
+-- Last page of a chat (what GET .../messages?limit=50 runs):
+-- EXPLAIN ANALYZE
+-- SELECT * FROM messages
+-- WHERE chat_session_id = 1
+-- ORDER BY created_at DESC, id DESC
+-- LIMIT 50;
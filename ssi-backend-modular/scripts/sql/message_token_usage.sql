@@ -0,0 +1,18 @@
+-- Per-turn upstream token usage on messages (PostgreSQL)
+-- Safe to run multiple times.
+
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS prompt_tokens INTEGER;
+
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS cached_prompt_tokens INTEGER;
+
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS completion_tokens INTEGER;
+
+-- Prefix-cache hit rate per day for assistant turns:
+-- SELECT date_trunc('day', created_at) AS day,
+--        SUM(cached_prompt_tokens)::float / NULLIF(SUM(prompt_tokens), 0) AS cached_ratio
+-- FROM messages
+-- WHERE sender_role = 'assistant' AND prompt_tokens IS NOT NULL
+-- GROUP BY 1 ORDER BY 1;
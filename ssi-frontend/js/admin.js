@@ -74,12 +74,16 @@ function renderSources() {
     const verifiedBadge = source.verified
       ? '<span class="badge text-bg-primary">Verified</span>'
       : '<span class="badge text-bg-warning text-dark">Unverified</span>';
+    const indexStatus = source.index_status || "";
+    const indexBadge = indexStatus && indexStatus !== "completed"
+      ? `<span class="badge ${indexStatus === "in_progress" ? "text-bg-info" : "text-bg-danger"}" title="${escapeHtml(source.index_error || "")}">${escapeHtml(indexStatus)}</span>`
+      : "";
 
     tr.innerHTML = `
       <td class="small text-muted">${index + 1}</td>
       <td>
         <div class="fw-semibold">${escapeHtml(source.title)}</div>
-        <div class="small text-muted">${enabledBadge} ${verifiedBadge}</div>
+        <div class="small text-muted">${enabledBadge} ${verifiedBadge} ${indexBadge}</div>
       </td>
       <td><code>${escapeHtml(source.source_type)}</code></td>
       <td class="admin-source-ref-cell"><code>${escapeHtml(source.source_ref)}</code></td>
@@ -65,3 +65,67 @@ async function apiRequest(path, method = "GET", body = null) {
 
   return null;
 }
+
+// POST to a Server-Sent Events endpoint and call onEvent(eventName, data) per event.
+async function apiStream(path, body, onEvent) {
+  const headers = { "Content-Type": "application/json", Accept: "text/event-stream" };
+  try {
+    const currentUserId =
+      typeof getUserId === "function" ? getUserId() : (typeof window !== "undefined" && typeof window.getUserId === "function" ? window.getUserId() : null);
+    if (currentUserId) headers["X-User-Id"] = String(currentUserId);
+  } catch (_) {
+    // Ignore header injection issues on public pages.
+  }
+
+  let res;
+  try {
+    res = await fetch(`${API_BASE}${path}`, {
+      method: "POST",
+      headers,
+      cache: "no-store",
+      body: JSON.stringify(body),
+    });
+  } catch (_) {
+    throw new Error(
+      `Cannot reach backend at ${API_BASE}. Start FastAPI and try again.`
+    );
+  }
+
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    let detail = text;
+    try {
+      const payload = JSON.parse(text);
+      detail = payload.detail || payload.message || text;
+    } catch {
+      // Keep raw text.
+    }
+    throw new Error(`Request failed (${res.status}). ${detail || ""}`.trim());
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let eventName = "message";
+      const dataLines = [];
+      rawEvent.split("\n").forEach(line => {
+        if (line.startsWith("event:")) eventName = line.slice(6).trim();
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+      });
+      if (!dataLines.length) continue;
+      onEvent(eventName, JSON.parse(dataLines.join("\n")));
+    }
+  }
+}
@@ -4,6 +4,14 @@ if (!userId) window.location.href = "login.html";
 document.getElementById("logoutBtn").onclick = logout;
 
 let activeChatId = null;
+// Saved flashcards are polled for with growing gaps that outlast the job's retries (~30s).
+const FLASHCARD_POLL_DELAYS_MS = [1000, 2000, 4000, 8000, 16000];
+// History is loaded newest page first; older pages on demand (keyset by message id).
+const MESSAGES_PAGE_SIZE = 50;
+let oldestLoadedMessageId = null;
+const evidenceByMessageId = new Map();
+// Card candidates from the stream, shown until the background job has saved them.
+const pendingFlashcardsByMessageId = new Map();
 let latestFlashcards = [];
 let chatSessionFlashcards = [];
 let panelFlashcards = [];
@@ -936,7 +944,88 @@ function goToNextQuizStep() {
   renderQuizQuestion();
 }
 
-function renderMessage(m, messageFlashcards = []) {
+function renderSourcesSection(container, evidence, answerText) {
+  const sources = Array.isArray(evidence?.sources) ? evidence.sources : [];
+  if (!sources.length) return false;
+
+  const sourcesSection = document.createElement("div");
+  sourcesSection.className = "mt-3 pt-2 border-top";
+
+  const sourcesLabel = document.createElement("div");
+  sourcesLabel.className = "small fw-semibold text-muted mb-2";
+  sourcesLabel.textContent = "Sources";
+
+  const bubbles = document.createElement("div");
+  bubbles.className = "source-bubbles";
+
+  const detail = document.createElement("div");
+  detail.className = "source-detail d-none";
+
+  const buttons = [];
+
+  sources.forEach((source, idx) => {
+    const btn = document.createElement("button");
+    btn.type = "button";
+    btn.className = "source-bubble";
+    const label = source?.filename || source?.file_id || `Source ${idx + 1}`;
+    btn.textContent = label.length > 42 ? `${label.slice(0, 39)}...` : label;
+    btn.onclick = () => {
+      const isActive = btn.classList.contains("active");
+      buttons.forEach(b => b.classList.remove("active"));
+      if (isActive) {
+        detail.classList.add("d-none");
+        return;
+      }
+      btn.classList.add("active");
+      renderSourceDetail(detail, source, answerText);
+    };
+    buttons.push(btn);
+    bubbles.appendChild(btn);
+  });
+
+  sourcesSection.appendChild(sourcesLabel);
+  sourcesSection.appendChild(bubbles);
+  sourcesSection.appendChild(detail);
+  container.appendChild(sourcesSection);
+  return true;
+}
+
+// Evidence is not part of message listings; it is fetched per message on demand.
+async function fetchMessageEvidence(messageId) {
+  if (evidenceByMessageId.has(messageId)) return evidenceByMessageId.get(messageId);
+  const res = await apiRequest(`/users/${userId}/messages/${messageId}/evidence`);
+  const evidence = res?.evidence ?? null;
+  evidenceByMessageId.set(messageId, evidence);
+  return evidence;
+}
+
+function renderLazySources(bubble, m) {
+  const holder = document.createElement("div");
+  holder.className = "mt-2";
+  const btn = document.createElement("button");
+  btn.type = "button";
+  btn.className = "btn btn-sm btn-link p-0 text-muted";
+  btn.textContent = "Show sources";
+  btn.onclick = async () => {
+    btn.disabled = true;
+    btn.textContent = "Loading sources...";
+    try {
+      const evidence = await fetchMessageEvidence(m.id);
+      holder.innerHTML = "";
+      if (!renderSourcesSection(holder, evidence, m.content ?? "")) {
+        holder.textContent = "No sources for this reply.";
+        holder.className = "mt-2 small text-muted";
+      }
+    } catch (err) {
+      btn.disabled = false;
+      btn.textContent = `Show sources (${err.message})`;
+    }
+  };
+  holder.appendChild(btn);
+  bubble.appendChild(holder);
+}
+
+function renderMessage(m, messageFlashcards = [], { before = null } = {}) {
   const wrap = document.createElement("div");
   wrap.className = `mb-3 d-flex ${m.sender_role === "user" ? "justify-content-end" : "justify-content-start"}`;
 
@@ -1001,57 +1090,67 @@ function renderMessage(m, messageFlashcards = []) {
   }
 
   if (m.sender_role === "assistant") {
-    const evidence = parseEvidenceSource(m.evidence_source);
-    const sources = Array.isArray(evidence?.sources) ? evidence.sources : [];
-    if (sources.length) {
-      const sourcesSection = document.createElement("div");
-      sourcesSection.className = "mt-3 pt-2 border-top";
-
-      const sourcesLabel = document.createElement("div");
-      sourcesLabel.className = "small fw-semibold text-muted mb-2";
-      sourcesLabel.textContent = "Sources";
-
-      const bubbles = document.createElement("div");
-      bubbles.className = "source-bubbles";
-
-      const detail = document.createElement("div");
-      detail.className = "source-detail d-none";
-
-      const buttons = [];
-      const answerText = m.content ?? "";
-
-      sources.forEach((source, idx) => {
-        const btn = document.createElement("button");
-        btn.type = "button";
-        btn.className = "source-bubble";
-        const label = source?.filename || source?.file_id || `Source ${idx + 1}`;
-        btn.textContent = label.length > 42 ? `${label.slice(0, 39)}...` : label;
-        btn.onclick = () => {
-          const isActive = btn.classList.contains("active");
-          buttons.forEach(b => b.classList.remove("active"));
-          if (isActive) {
-            detail.classList.add("d-none");
-            return;
-          }
-          btn.classList.add("active");
-          renderSourceDetail(detail, source, answerText);
-        };
-        buttons.push(btn);
-        bubbles.appendChild(btn);
-      });
-
-      sourcesSection.appendChild(sourcesLabel);
-      sourcesSection.appendChild(bubbles);
-      sourcesSection.appendChild(detail);
-      bubble.appendChild(sourcesSection);
+    const inlineEvidence = parseEvidenceSource(m.evidence_source);
+    const evidence = inlineEvidence ?? (m.id != null ? evidenceByMessageId.get(m.id) : null);
+    if (evidence) {
+      renderSourcesSection(bubble, evidence, m.content ?? "");
+    } else if (m.id != null && m.has_evidence) {
+      renderLazySources(bubble, m);
     }
   }
 
   wrap.appendChild(bubble);
+  if (before) {
+    messagesDiv.insertBefore(wrap, before);
+    return;
+  }
   messagesDiv.appendChild(wrap);
   messagesDiv.scrollTop = messagesDiv.scrollHeight;
 }
 
+function messagesPagePath(chatId, beforeId = null) {
+  const params = new URLSearchParams({ limit: String(MESSAGES_PAGE_SIZE) });
+  if (beforeId !== null) params.set("before_id", String(beforeId));
+  return `/users/${userId}/chat-sessions/${chatId}/messages?${params.toString()}`;
+}
+
+function renderLoadEarlierButton(chatId, page) {
+  messagesDiv.querySelector(".load-earlier-messages")?.remove();
+  // A short page means the start of the chat has been reached.
+  if (page.length < MESSAGES_PAGE_SIZE) return;
+
+  const btn = document.createElement("button");
+  btn.type = "button";
+  btn.className = "btn btn-sm btn-outline-secondary d-block mx-auto mb-3 load-earlier-messages";
+  btn.textContent = "Load earlier messages";
+  btn.onclick = () => loadEarlierMessages(chatId, btn);
+  messagesDiv.insertBefore(btn, messagesDiv.firstChild);
+}
+
+async function loadEarlierMessages(chatId, btn) {
+  if (oldestLoadedMessageId === null) return;
+  btn.disabled = true;
+  try {
+    const page = await apiRequest(messagesPagePath(chatId, oldestLoadedMessageId));
+    if (activeChatId !== chatId) return;
+    const msgs = Array.isArray(page) ? page : [];
+    const grouped = groupFlashcardsByMessage(chatSessionFlashcards);
+    const anchor = btn.nextSibling;
+    const previousHeight = messagesDiv.scrollHeight;
+    msgs.forEach(m => {
+      const messageFlashcards = m.sender_role === "assistant" ? (grouped.get(m.id) || []) : [];
+      renderMessage(m, messageFlashcards, { before: anchor });
+    });
+    if (msgs.length) oldestLoadedMessageId = msgs[0].id;
+    // Keep the message the user was reading in place.
+    messagesDiv.scrollTop += messagesDiv.scrollHeight - previousHeight;
+    renderLoadEarlierButton(chatId, msgs);
+  } catch (err) {
+    btn.disabled = false;
+    btn.textContent = `Load earlier messages (${err.message})`;
+  }
+}
+
 async function fetchFlashcardsForChat(chatId) {
   const params = new URLSearchParams({
     chat_session_id: String(chatId),
@@ -1105,6 +1204,26 @@ function groupFlashcardsByMessage(flashcards) {
   return grouped;
 }
 
+async function pollSavedFlashcards(chatId, messageId) {
+  for (const delay of FLASHCARD_POLL_DELAYS_MS) {
+    await new Promise(resolve => setTimeout(resolve, delay));
+    if (activeChatId !== chatId) return;
+    try {
+      const cards = await fetchFlashcardsForChat(chatId);
+      if ((Array.isArray(cards) ? cards : []).some(fc => fc.source_message_id === messageId)) {
+        pendingFlashcardsByMessageId.delete(messageId);
+        await loadMessages(chatId);
+        return;
+      }
+    } catch (_) {
+      // Keep polling; a transient error should not end the wait early.
+    }
+  }
+  if (activeChatId === chatId) {
+    flashcardStatusEl.textContent = "Flashcards could not be saved for the latest reply.";
+  }
+}
+
 function applyLatestFlashcardState(messages, grouped) {
   const latestAssistant = [...messages].reverse().find(m => m.sender_role === "assistant");
   if (!latestAssistant) {
@@ -1262,7 +1381,7 @@ async function loadMessages(chatId) {
 
   try {
     const [msgs, cards] = await Promise.all([
-      apiRequest(`/users/${userId}/chat-sessions/${chatId}/messages`),
+      apiRequest(messagesPagePath(chatId)),
       fetchFlashcardsForChat(chatId),
     ]);
 
@@ -1272,9 +1391,13 @@ async function loadMessages(chatId) {
 
     messagesDiv.innerHTML = "";
     msgs.forEach(m => {
-      const messageFlashcards = m.sender_role === "assistant" ? (grouped.get(m.id) || []) : [];
+      const messageFlashcards = m.sender_role === "assistant"
+        ? (grouped.get(m.id) || pendingFlashcardsByMessageId.get(m.id) || [])
+        : [];
       renderMessage(m, messageFlashcards);
     });
+    oldestLoadedMessageId = msgs.length ? msgs[0].id : null;
+    renderLoadEarlierButton(chatId, msgs);
 
     applyLatestFlashcardState(msgs, grouped);
   } catch (err) {
@@ -1312,16 +1435,48 @@ chatForm.onsubmit = async (e) => {
   const typingBubble = messagesDiv.lastChild;
 
   try {
-    await apiRequest(
-      `/users/${userId}/chat-sessions/${activeChatId}/messages`,
-      "POST",
-      { content }
+    const typingContentEl = typingBubble.querySelector("[data-i18n-skip]");
+    let streamedText = "";
+    let streamError = null;
+    let flashcardsPending = false;
+    let assistantId = null;
+
+    await apiStream(
+      `/users/${userId}/chat-sessions/${activeChatId}/messages/stream`,
+      { content },
+      (eventName, data) => {
+        if (eventName === "delta") {
+          streamedText += data?.text ?? "";
+          if (typingContentEl) typingContentEl.textContent = streamedText;
+          messagesDiv.scrollTop = messagesDiv.scrollHeight;
+        } else if (eventName === "final") {
+          // The reply's evidence and card candidates arrive with the stream; no fetch needed
+          // after the reload.
+          assistantId = data?.assistant_message?.id ?? null;
+          if (assistantId != null && data?.evidence) evidenceByMessageId.set(assistantId, data.evidence);
+          const candidates = Array.isArray(data?.flashcards) ? data.flashcards : [];
+          flashcardsPending = Boolean(data?.flashcards_pending) && assistantId != null;
+          if (flashcardsPending && candidates.length) pendingFlashcardsByMessageId.set(assistantId, candidates);
+        } else if (eventName === "error") {
+          streamError = data?.detail || "Assistant reply generation failed";
+        }
+      }
     );
+    if (streamError) throw new Error(streamError);
 
     // remove typing
     typingBubble.remove();
 
-    await loadMessages(activeChatId);
+    const sentChatId = activeChatId;
+    await loadMessages(sentChatId);
+
+    // Flashcards are saved in the background after the reply; the candidates are shown
+    // meanwhile and replaced once the saved cards (with ids) can be fetched.
+    if (flashcardsPending) {
+      const candidates = pendingFlashcardsByMessageId.get(assistantId) || [];
+      setLatestFlashcards(candidates, `Saving ${candidates.length} flashcards for latest reply...`);
+      pollSavedFlashcards(sentChatId, assistantId);
+    }
   } catch (err) {
     typingBubble.remove();
     renderMessage({ sender_role: "assistant", content: `Error: ${err.message}` });